@@ -0,0 +1,92 @@
+"""
+Reproducible performance benchmark for the Bird Tracking System
+"""
+
+import yaml
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from src.benchmark_suite import (BENCHMARKS, compare_to_baseline, generate_synthetic_video,
+                                 run_benchmarks, save_report, synthetic_bird_boxes)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Run the benchmarks, write the JSON report and check for regressions
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark detection, tracking and the capture pipeline with a simulated PTZ'
+    )
+    parser.add_argument('--config', type=str, default='config.yaml',
+                        help='Path to configuration file (default: config.yaml)')
+    parser.add_argument('--video', type=str,
+                        help='Recorded video to replay, ideally with real birds '
+                             '(default: generate a synthetic clip)')
+    parser.add_argument('--frames', type=int, default=300,
+                        help='Frames per benchmark (default: 300)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic clip (default: 0)')
+    parser.add_argument('--model-detections', action='store_true',
+                        help="Track the model's detections on the synthetic clip instead of its "
+                             "known bird boxes (a COCO model finds no birds in it)")
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS),
+                        help='Benchmarks to run (default: all)')
+    parser.add_argument('--output', type=str, default='benchmark_report.json',
+                        help='Where to write the JSON report (default: benchmark_report.json)')
+    parser.add_argument('--baseline', type=str,
+                        help='Earlier report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed relative regression vs. the baseline (default: 0.10)')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    video_path = args.video
+    ground_truth = None
+    if video_path is None:
+        video_path = str(Path(tempfile.gettempdir()) / f'bird_benchmark_seed{args.seed}.avi')
+        logger.info(f"Generating synthetic video: {video_path}")
+        generate_synthetic_video(video_path, num_frames=args.frames, seed=args.seed)
+        if not args.model_detections:
+            # The tracking benchmarks get the drawn birds as detections
+            ground_truth = synthetic_bird_boxes(num_frames=args.frames, seed=args.seed)
+    
+    report = run_benchmarks(config, video_path, names=args.benchmarks, max_frames=args.frames,
+                            ground_truth=ground_truth)
+    save_report(report, args.output)
+    
+    print("\n" + "=" * 60)
+    print(f"{'Benchmark':<12}{'FPS':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("=" * 60)
+    for name, result in report['benchmarks'].items():
+        latency = result['latency']
+        print(f"{name:<12}{result['fps']:>8.1f}{latency.get('p50_ms', 0):>10.1f}"
+              f"{latency.get('p95_ms', 0):>10.1f}{latency.get('p99_ms', 0):>10.1f}")
+    print(f"Peak RSS: {report['peak_rss_mb']:.1f} MiB")
+    print(f"Report written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs. {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions vs. {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
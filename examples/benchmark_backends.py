@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Compare YOLO11 inference latency across backends
+Exports (and caches) the model for each backend, then times dummy frames
+"""
+
+import sys
+import yaml
+from src.inference_backends import benchmark_backends
+
+def main():
+    # Load configuration
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    
+    backends = sys.argv[1:] or None
+    print("Benchmarking inference backends...")
+    report = benchmark_backends(config, backends=backends)
+    
+    print("\n" + "=" * 60)
+    print(f"{'Backend':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    print("=" * 60)
+    for backend, stats in report.items():
+        if 'error' in stats:
+            print(f"{backend:<14}  unavailable: {stats['error']}")
+        else:
+            print(f"{backend:<14}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+    
+    available = {b: s for b, s in report.items() if 'error' not in s}
+    if available:
+        fastest = min(available, key=lambda b: available[b]['mean_ms'])
+        print(f"\nFastest backend on this machine: {fastest}")
+        print(f"Set 'yolo.backend: {fastest}' in config.yaml to use it")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Measure ONVIF startup time and per-command CPU cost
+Compares request templates against building each request, with the camera held still
+"""
+
+import copy
+import sys
+import time
+import yaml
+from src.ptz_controller import PTZController
+
+def connect(config, templates):
+    config = copy.deepcopy(config)
+    config['camera'].setdefault('ptz', {})['async_commands'] = False
+    config['camera'].setdefault('onvif', {})['use_request_templates'] = templates
+    return PTZController(config)
+
+def command_cpu(ptz, runs):
+    # Zero-velocity moves followed by stops: full SOAP round-trips, no motion
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    for _ in range(runs):
+        ptz._send_continuous_move(0.0, 0.0)
+        ptz._send_stop()
+    commands = 2 * runs
+    return ((time.thread_time() - cpu_start) / commands * 1000.0,
+            (time.perf_counter() - wall_start) / commands * 1000.0)
+
+def main():
+    # Load configuration
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"Camera: {config['camera']['ip']}:{config['camera']['port']}")
+    
+    print("\n" + "=" * 60)
+    print(f"{'Mode':<22}{'connect s':>12}{'cpu ms/cmd':>13}{'wall ms/cmd':>13}")
+    print("=" * 60)
+    for label, templates in (('create_type per call', False), ('request templates', True)):
+        ptz = connect(config, templates)
+        cpu_ms, wall_ms = command_cpu(ptz, runs)
+        print(f"{label:<22}{ptz.connect_time:>12.2f}{cpu_ms:>13.2f}{wall_ms:>13.1f}")
+        ptz.close()
+    
+    print("\nThe first connect of a run fills the WSDL cache "
+          f"({config['camera'].get('onvif', {}).get('wsdl_cache', '.onvif_cache/zeep.sqlite')});")
+    print("run this script twice to see the warm-cache startup time.")
+
+if __name__ == '__main__':
+    main()
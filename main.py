@@ -11,6 +11,14 @@ import time
 from pathlib import Path
 from dotenv import load_dotenv
 from src.bird_tracker import BirdTracker
+from src.frame_grabber import FrameGrabber
+from src.multi_camera import MultiCameraTracker
+from src.metrics import METRICS, MetricsServer
+from src.frame_renderer import RenderWorker
+from src.video_recorder import VideoRecorder
+from src.clip_recorder import ClipRecorder
+from src.frame_scheduler import FrameScheduler
+from src.event_store import EventStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,10 +47,69 @@ def load_config(config_path: str) -> dict:
         sys.exit(1)
 
 
+def run_multi_camera(config: dict):
+    """
+    Run every camera of the ``cameras`` list around one shared detector
+    
+    Args:
+        config: Configuration dictionary
+    """
+    logger.info("Initializing multi-camera tracking system...")
+    try:
+        orchestrator = MultiCameraTracker(config)
+    except Exception as e:
+        logger.error(f"Failed to initialize multi-camera tracker: {e}")
+        sys.exit(1)
+    
+    display = config.get('video', {}).get('display', True)
+    metrics_server = MetricsServer(config).start()
+    orchestrator.start()
+    logger.info(f"Tracking {len(orchestrator.cameras)} cameras")
+    
+    try:
+        while True:
+            if not display:
+                time.sleep(0.5)
+                continue
+            
+            # Windows must be driven from the main thread
+            for name, context in orchestrator.cameras.items():
+                annotated_frame = context.get_annotated_frame()
+                if annotated_frame is not None:
+                    cv2.imshow(f'Bird Tracking System - {name}', annotated_frame)
+            
+            key = cv2.waitKey(30) & 0xFF
+            if key == ord('q'):
+                logger.info("Quit requested by user")
+                break
+            elif key == ord('h'):
+                logger.info("Returning all cameras to home position")
+                orchestrator.go_home()
+            elif key == ord('s'):
+                logger.info("Stopping PTZ movement on all cameras")
+                orchestrator.stop_ptz()
+            elif key == ord('r'):
+                logger.info("Resetting tracking state")
+                orchestrator.reset_tracking()
+    
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+    
+    finally:
+        logger.info("Cleaning up...")
+        orchestrator.stop()
+        metrics_server.stop()
+        logger.info(f"Statistics: {orchestrator.get_statistics()}")
+        logger.info(f"Stage timings: {METRICS.summary_line()}")
+        cv2.destroyAllWindows()
+        logger.info("Shutdown complete")
+
+
 def main():
     """
     Main application loop
     """
+    startup_start = time.perf_counter()
     parser = argparse.ArgumentParser(
         description='Bird Tracking System with YOLO11 and ONVIF PTZ Control'
     )
@@ -67,6 +134,11 @@ def main():
         type=str,
         help='Save output video to specified path'
     )
+    parser.add_argument(
+        '--check-config',
+        action='store_true',
+        help='Load the configuration, print the effective settings and exit'
+    )
     
     args = parser.parse_args()
     
@@ -85,6 +157,16 @@ def main():
         config['video']['save_video'] = True
         config['video']['output_path'] = args.save_video
     
+    if args.check_config:
+        # Nothing heavy (torch, ONVIF) is imported on this path
+        print(yaml.safe_dump(config, sort_keys=False))
+        return
+    
+    # A non-empty camera list switches to multi-camera mode
+    if config.get('cameras') and not args.source:
+        run_multi_camera(config)
+        return
+    
     # Initialize video source
     # Priority: source from config, fallback to rtsp_url if source is camera index 0
     video_source = config['video'].get('source', 0)
@@ -94,57 +176,104 @@ def main():
         video_source = config['video']['rtsp_url']
         logger.info(f"Using RTSP source: {video_source}")
     
-    logger.info(f"Opening video source: {video_source}")
-    cap = cv2.VideoCapture(video_source)
-    
-    if not cap.isOpened():
-        logger.error(f"Failed to open video source: {video_source}")
+    try:
+        grabber = FrameGrabber(video_source, config)
+    except RuntimeError as e:
+        logger.error(str(e))
         sys.exit(1)
     
     # Get video properties
-    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    if fps <= 0:
-        fps = 30
+    frame_width = grabber.width
+    frame_height = grabber.height
+    fps = grabber.fps
     
     logger.info(f"Video properties: {frame_width}x{frame_height} @ {fps} FPS")
     
-    # Initialize video writer if saving
-    video_writer = None
-    if config['video'].get('save_video', False):
-        output_path = config['video'].get('output_path', 'output.mp4')
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(output_path, fourcc, fps,
-                                      (frame_width, frame_height))
-        logger.info(f"Saving output to: {output_path}")
+    # Detections and finished tracks are persisted by a background writer
+    event_store = EventStore(config)
     
     # Initialize bird tracker
     logger.info("Initializing bird tracking system...")
     try:
-        tracker = BirdTracker(config)
+        tracker = BirdTracker(config, frame_size=(frame_width, frame_height),
+                              event_store=event_store, camera_name=event_store.camera)
     except Exception as e:
         logger.error(f"Failed to initialize tracker: {e}")
-        cap.release()
+        grabber.stop()
+        event_store.close()
         sys.exit(1)
     
+    # Initialize video writer if saving (renders and encodes on its own thread / ffmpeg process)
+    video_writer = None
+    if config['video'].get('save_video', False):
+        output_path = config['video'].get('output_path', 'output.mp4')
+        try:
+            video_writer = VideoRecorder(output_path, frame_width, frame_height, fps, config,
+                                         render_fn=tracker.render)
+        except (RuntimeError, ValueError) as e:
+            logger.error(f"Recording disabled: {e}")
+        else:
+            logger.info(f"Saving output to: {output_path}")
+    
     logger.info("Bird tracking system ready!")
     logger.info("Press 'q' to quit, 'h' for home position, 's' to stop PTZ")
     
+    metrics_server = MetricsServer(config).start()
+    
+    # Event clips (raw frames with pre-roll) while a bird is tracked
+    clip_recorder = ClipRecorder(config, fps)
+    clip_scale = clip_recorder.scale
+    
+    # Overlays for the display are drawn on a latest-only render thread; the
+    # recording renders every frame on its own worker
+    display = config['video'].get('display', True)
+    renderer = None
+    if display:
+        renderer = RenderWorker(tracker.render)
+    elif not video_writer:
+        logger.info("Headless mode: rendering disabled")
+    
+    # Per-frame latency budget; sheds display annotation, recording, then detection rate
+    # (levels for work that is not running are skipped)
+    idle = set()
+    if renderer is None:
+        idle.add('annotation')
+    if not clip_recorder.enabled and video_writer is None:
+        idle.add('recording')
+    scheduler = FrameScheduler(config, fps, idle=idle)
+    
+    # Start decoding on the background thread only once the tracker is ready,
+    # so the first frame processed is a current one
+    grabber.start()
+    
     # Main processing loop
     try:
         frame_time = time.time()
         display_fps = 0
+        first_frame_tracked = False
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                logger.warning("Failed to read frame, retrying...")
-                time.sleep(0.1)
+            wait_start = time.perf_counter()
+            packet = grabber.read(timeout=1.0)
+            METRICS.observe('capture_wait', time.perf_counter() - wait_start)
+            if packet is None:
+                if grabber.finished:
+                    logger.info("End of video")
+                    break
+                logger.warning("No new frame from video source, waiting...")
                 continue
+            frame = packet.frame
             
-            # Process frame
-            annotated_frame, tracking_active = tracker.process_frame(frame)
+            # Detect and control PTZ (no drawing on this thread)
+            with scheduler.stage('track'):
+                result = tracker.track(frame, packet.timestamp)
+            if not first_frame_tracked:
+                first_frame_tracked = True
+                time_to_first_frame = time.perf_counter() - startup_start
+                METRICS.set_gauge('time_to_first_frame', time_to_first_frame)
+                logger.info(f"Time to first tracked frame: {time_to_first_frame:.2f}s")
+            with scheduler.stage('clips'):
+                clip_recorder.update(frame, packet.timestamp, result.target is not None)
             
             # Calculate and display FPS
             current_time = time.time()
@@ -152,18 +281,21 @@ def main():
             if elapsed > 0:
                 display_fps = 0.9 * display_fps + 0.1 * (1.0 / elapsed)
             frame_time = current_time
+            METRICS.set_gauge('fps', display_fps)
             
-            fps_text = f"FPS: {display_fps:.1f}"
-            cv2.putText(annotated_frame, fps_text, (frame_width - 150, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # Save frame if recording
+            # Hand the frame to the render threads; annotation shedding thins the
+            # display only, the recording keeps every frame
+            if renderer and scheduler.should_annotate():
+                renderer.submit(frame, result, display_fps)
             if video_writer:
-                video_writer.write(annotated_frame)
+                video_writer.write(frame, result, display_fps)
             
             # Display frame
-            if config['video'].get('display', True):
-                cv2.imshow('Bird Tracking System', annotated_frame)
+            if display:
+                annotated_frame = renderer.get_latest()
+                if annotated_frame is not None:
+                    with scheduler.stage('display'):
+                        cv2.imshow('Bird Tracking System', annotated_frame)
                 
                 # Handle keyboard input
                 key = cv2.waitKey(1) & 0xFF
@@ -179,6 +311,14 @@ def main():
                 elif key == ord('r'):
                     logger.info("Resetting tracking state")
                     tracker.reset_tracking()
+            
+            # Capture to fully handled frame
+            METRICS.observe('end_to_end', time.monotonic() - packet.timestamp)
+            if scheduler.end_frame(packet.timestamp):
+                tracker.detect_every = scheduler.detect_every
+                clip_recorder.set_scale(clip_scale * scheduler.clip_scale)
+                if video_writer:
+                    video_writer.set_stride(scheduler.record_every)
     
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
@@ -189,14 +329,28 @@ def main():
     finally:
         # Cleanup
         logger.info("Cleaning up...")
-        tracker.stop_ptz()
+        tracker.close()
         
         stats = tracker.get_statistics()
         logger.info(f"Statistics: {stats}")
+        logger.info(f"Capture statistics: {grabber.get_statistics()}")
+        logger.info(f"Deadline statistics: {scheduler.get_statistics()}")
+        logger.info(f"Stage timings: {METRICS.summary_line()}")
+        metrics_server.stop()
         
-        cap.release()
+        grabber.stop()
+        event_store.close()
+        if event_store.enabled:
+            logger.info(f"Event statistics: {event_store.get_statistics()}")
+        clip_recorder.close()
+        if clip_recorder.enabled:
+            logger.info(f"Clip statistics: {clip_recorder.get_statistics()}")
+        if renderer:
+            renderer.close()
+            logger.info(f"Render statistics: {renderer.get_statistics()}")
         if video_writer:
-            video_writer.release()
+            video_writer.close()
+            logger.info(f"Recording statistics: {video_writer.get_statistics()}")
         cv2.destroyAllWindows()
         
         logger.info("Shutdown complete")
@@ -0,0 +1,101 @@
+"""
+INT8 quantization workflow for the Bird Tracking System
+"""
+
+import yaml
+import argparse
+import json
+import logging
+from pathlib import Path
+from src.quantization import build_calibration_set, compare_precisions, quantize_model
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Build a calibration set, quantize the model, or compare INT8 against FP32
+    """
+    parser = argparse.ArgumentParser(
+        description='Build and evaluate an INT8 YOLO11 model calibrated on recorded footage'
+    )
+    parser.add_argument('--config', type=str, default='config.yaml',
+                        help='Path to configuration file (default: config.yaml)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    calibrate = commands.add_parser('calibrate', help='Pick diverse frames from recordings')
+    calibrate.add_argument('videos', nargs='+', help='Recorded videos to sample')
+    calibrate.add_argument('--output', type=str,
+                           help='Calibration directory (default: yolo.quantization.calibration_dir)')
+    calibrate.add_argument('--frames', type=int,
+                           help='Calibration set size (default: yolo.quantization.calibration_frames)')
+    calibrate.add_argument('--candidates', type=int, default=1000,
+                           help='Frames considered per video (default: 1000)')
+    
+    build = commands.add_parser('build', help='Quantize the configured model to INT8')
+    build.add_argument('--calibration', type=str,
+                       help='Calibration directory (default: yolo.quantization.calibration_dir)')
+    build.add_argument('--force', action='store_true',
+                       help='Rebuild even if a cached INT8 model exists')
+    
+    compare = commands.add_parser('compare', help='Compare INT8 and FP32 on a held-out clip')
+    compare.add_argument('video', help='Held-out clip (not used for calibration)')
+    compare.add_argument('--frames', type=int, default=300,
+                         help='Frames to evaluate (default: 300)')
+    compare.add_argument('--iou', type=float, default=0.5,
+                         help='IoU for two boxes to count as the same bird (default: 0.5)')
+    compare.add_argument('--output', type=str, default='quantization_report.json',
+                         help='Where to write the JSON report (default: quantization_report.json)')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    quant_config = config.get('yolo', {}).get('quantization', {})
+    
+    if args.command == 'calibrate':
+        output = args.output or quant_config.get('calibration_dir', 'calibration')
+        frames = args.frames or quant_config.get('calibration_frames', 300)
+        manifest = build_calibration_set(args.videos, output, num_frames=frames,
+                                         candidates_per_video=args.candidates)
+        print(f"{len(manifest['frames'])} calibration frames written to {output}")
+    
+    elif args.command == 'build':
+        path = quantize_model(config, calibration_dir=args.calibration, force=args.force)
+        print(f"INT8 model: {path}")
+        print("Set yolo.precision: \"int8\" in the config to use it")
+    
+    else:
+        calibration_videos = set()
+        try:
+            with open(f"{quant_config.get('calibration_dir', 'calibration')}/manifest.json", 'r') as f:
+                calibration_videos = {Path(video).resolve() for video in json.load(f)['videos']}
+        except (OSError, ValueError, KeyError):
+            pass
+        if Path(args.video).resolve() in calibration_videos:
+            logger.warning(f"{args.video} was used for calibration; the comparison will be optimistic")
+        
+        report = compare_precisions(config, args.video, max_frames=args.frames, iou_threshold=args.iou)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        agreement = report['agreement']
+        print("\n" + "=" * 60)
+        print(f"{'Model':<8}{'mean ms':>10}{'p95 ms':>10}{'birds':>10}")
+        print("=" * 60)
+        for name in ('fp32', 'int8'):
+            result = report[name]
+            print(f"{name:<8}{result['mean_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['detections']:>10}")
+        print(f"\nSpeedup: {report['speedup']:.2f}x over {report['frames']} frames")
+        print(f"INT8 vs FP32 (IoU >= {report['iou_threshold']}): recall {agreement['recall']:.1%}, "
+              f"precision {agreement['precision']:.1%}, mean IoU {agreement['mean_iou']:.3f}, "
+              f"conf delta {agreement['mean_conf_delta']:+.3f}")
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Query the detection event store of the Bird Tracking System
+"""
+
+import yaml
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from src.event_store import EventStore
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a local time such as '2024-05-01 06:00' or '06:00' (today)
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        clock = datetime.strptime(value, '%H:%M').time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid time '{value}' (use 'YYYY-MM-DD HH:MM' or 'HH:MM')")
+    return datetime.combine(datetime.now().date(), clock)
+
+
+def main():
+    """
+    Print the tracks or detections recorded between two times
+    """
+    parser = argparse.ArgumentParser(
+        description='Query recorded bird tracks and detections by time range and camera'
+    )
+    parser.add_argument('table', choices=['tracks', 'detections'],
+                        help='Tracks active in the range, or individual detections')
+    parser.add_argument('--from', dest='start', type=parse_time, required=True,
+                        help="Range start, local time ('YYYY-MM-DD HH:MM' or 'HH:MM' for today)")
+    parser.add_argument('--to', dest='end', type=parse_time, required=True,
+                        help="Range end, local time ('YYYY-MM-DD HH:MM' or 'HH:MM' for today)")
+    parser.add_argument('--camera', type=str,
+                        help='Only this camera')
+    parser.add_argument('--min-confidence', type=float,
+                        help='Only detections at least this confident')
+    parser.add_argument('--limit', type=int,
+                        help='Most detections printed')
+    parser.add_argument('--config', type=str, default='config.yaml',
+                        help='Path to configuration file (default: config.yaml)')
+    parser.add_argument('--directory', type=str,
+                        help='Event store directory (default: events.directory)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print one JSON object per line')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    # Read-only: the writer thread is not started
+    events_config = dict(config.get('events') or {}, enabled=False)
+    if args.directory:
+        events_config['directory'] = args.directory
+    store = EventStore({'events': events_config})
+    if not store.directory.is_dir():
+        logger.error(f"Event store not found: {store.directory}")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    if args.table == 'tracks':
+        rows = store.query_tracks(args.start, args.end, camera=args.camera)
+    else:
+        rows = store.query_detections(args.start, args.end, camera=args.camera,
+                                      min_confidence=args.min_confidence, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    
+    for row in rows:
+        if args.json:
+            print(json.dumps(row))
+        elif args.table == 'tracks':
+            print(f"{row['camera']:<12} track {row['track_id']:<6} "
+                  f"{datetime.fromtimestamp(row['start_ts']):%Y-%m-%d %H:%M:%S} - "
+                  f"{datetime.fromtimestamp(row['end_ts']):%H:%M:%S} "
+                  f"({row['end_ts'] - row['start_ts']:.1f}s, {row['hits']} hits, conf {row['conf']:.2f})")
+        else:
+            print(f"{row['camera']:<12} {datetime.fromtimestamp(row['ts']):%Y-%m-%d %H:%M:%S.%f} "
+                  f"frame {row['frame']:<8} class {row['cls']:<3} conf {row['conf']:.2f} "
+                  f"[{row['x1']:.0f}, {row['y1']:.0f}, {row['x2']:.0f}, {row['y2']:.0f}]")
+    
+    print(f"{len(rows)} {args.table} in {elapsed * 1000:.1f}ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,10 @@ setup(
     entry_points={
         "console_scripts": [
             "bird-tracker=main:main",
+            "bird-benchmark=benchmark:main",
+            "bird-quantize=quantize:main",
+            "bird-archive=process_archive:main",
+            "bird-events=query_events:main",
         ],
     },
 )
@@ -2,8 +2,35 @@
 Source package initialization
 """
 
-from .bird_detector import BirdDetector
-from .ptz_controller import PTZController
-from .bird_tracker import BirdTracker
+import importlib
 
-__all__ = ['BirdDetector', 'PTZController', 'BirdTracker']
+# Public names are imported on first access, so ``import src`` (and tools that
+# only need the config or the CLI help) do not load torch, ultralytics or zeep
+_EXPORTS = {
+    'BirdDetector': '.bird_detector',
+    'Detections': '.detections',
+    'PTZController': '.ptz_controller',
+    'PTZStatus': '.ptz_status',
+    'PTZStatusPoller': '.ptz_status',
+    'BirdTracker': '.bird_tracker',
+    'FrameGrabber': '.frame_grabber',
+    'FramePacket': '.frame_grabber',
+    'BatchInferenceQueue': '.batch_inference',
+    'MultiCameraTracker': '.multi_camera',
+    'FakePTZController': '.fake_ptz',
+}
+
+__all__ = ['BirdDetector', 'Detections', 'PTZController', 'PTZStatus', 'PTZStatusPoller', 'BirdTracker',
+           'FrameGrabber', 'FramePacket', 'BatchInferenceQueue', 'MultiCameraTracker', 'FakePTZController']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,176 @@
+"""
+Adaptive Input Resolution
+Picks the detector input size from the target's size and the pipeline's lag, with hysteresis
+"""
+
+import logging
+import time
+from typing import List, Optional, Sequence, Tuple
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def input_sizes(config: dict, stride: int = 32) -> List[int]:
+    """
+    Input sizes the detector must prepare for
+    
+    Args:
+        config: Configuration dictionary
+        stride: Model stride; sizes are rounded up to a multiple of it
+    
+    Returns:
+        Ascending list of sizes; just [img_size] when adaptive resolution is off
+    """
+    yolo_config = config.get('yolo', {})
+    img_size = int(yolo_config.get('img_size', 640))
+    adaptive_config = yolo_config.get('adaptive_resolution', {})
+    if not adaptive_config.get('enabled', False):
+        return [img_size]
+    sizes = {img_size}
+    for size in adaptive_config.get('sizes', [320, 416, 640]):
+        sizes.add(-(-int(size) // stride) * stride)
+    # img_size is the ceiling: exports and the quantized model are built for it
+    return sorted(size for size in sizes if size <= img_size)
+
+
+class AdaptiveResolution:
+    """
+    Input size policy with hysteresis
+    
+    After every inference the policy looks at two signals: how big the
+    followed bird is relative to the frame, and how far the pipeline lags
+    behind capture. It steps one size down when the bird is large (it is
+    still found at a lower resolution) or the lag exceeds the latency
+    budget. It steps one size up when the bird is small or lost and the
+    estimated lag at the larger size still fits the budget.
+    
+    A step needs the same verdict on ``down_after`` / ``up_after``
+    consecutive inferences and at least ``min_dwell`` seconds at the current
+    size, so a bird hovering around a threshold does not cause flapping.
+    Every size is prepared and warmed up by BirdDetector in advance, so a
+    switch costs nothing at runtime.
+    """
+    
+    def __init__(self, config: dict, sizes: Sequence[int], initial: Optional[int] = None):
+        """
+        Initialize the policy
+        
+        Args:
+            config: Configuration dictionary containing YOLO settings
+            sizes: Input sizes the detector has prepared (ascending)
+            initial: Starting size (defaults to the largest)
+        """
+        self.adaptive_config = config.get('yolo', {}).get('adaptive_resolution', {})
+        
+        self.sizes = sorted(sizes)
+        self.enabled = self.adaptive_config.get('enabled', False) and len(self.sizes) > 1
+        # Target extent (larger of width/height fractions of the frame)
+        self.large_target = self.adaptive_config.get('large_target', 0.25)
+        self.small_target = self.adaptive_config.get('small_target', 0.08)
+        # Capture-to-detection lag allowed per frame, seconds
+        self.latency_budget = self.adaptive_config.get('latency_budget', 0.15)
+        self.headroom = self.adaptive_config.get('headroom', 0.8)
+        self.down_after = max(1, int(self.adaptive_config.get('down_after', 3)))
+        self.up_after = max(1, int(self.adaptive_config.get('up_after', 10)))
+        self.min_dwell = self.adaptive_config.get('min_dwell', 1.0)
+        
+        self.index = self.sizes.index(initial) if initial in self.sizes else len(self.sizes) - 1
+        self._down_votes = 0
+        self._up_votes = 0
+        self._last_switch = 0.0
+        
+        # Statistics
+        self.switches = 0
+        self.frames_at_size = {size: 0 for size in self.sizes}
+        self.last_reason = None
+    
+    @property
+    def size(self) -> int:
+        """
+        Current input size
+        """
+        return self.sizes[self.index]
+    
+    def update(self, target_box, frame_shape: Tuple[int, int], lag: float,
+               inference_time: float, now: Optional[float] = None) -> int:
+        """
+        Feed the outcome of one inference and get the size for the next one
+        
+        Args:
+            target_box: xyxy box of the followed bird, or None if there is none
+            frame_shape: (height, width) of the frame
+            lag: Seconds from capture until the detections were available
+            inference_time: Seconds the inference itself took at the current size
+            now: Current time.monotonic() (defaults to now)
+        
+        Returns:
+            Input size to use for the next inference
+        """
+        size = self.size
+        self.frames_at_size[size] += 1
+        if not self.enabled:
+            return size
+        
+        now = time.monotonic() if now is None else now
+        extent = None
+        if target_box is not None:
+            height, width = frame_shape
+            extent = max((target_box[2] - target_box[0]) / width, (target_box[3] - target_box[1]) / height)
+        
+        overloaded = lag > self.latency_budget
+        down_reason = None
+        if overloaded:
+            down_reason = 'load'
+        elif extent is not None and extent >= self.large_target:
+            down_reason = 'large target'
+        
+        up_reason = None
+        if down_reason is None and self.index < len(self.sizes) - 1:
+            if extent is None or extent < self.small_target:
+                # Inference cost grows with the pixel count
+                larger = self.sizes[self.index + 1]
+                expected_lag = lag + inference_time * ((larger / size) ** 2 - 1)
+                if expected_lag <= self.latency_budget * self.headroom:
+                    up_reason = 'target lost' if extent is None else 'small target'
+        
+        self._down_votes = self._down_votes + 1 if down_reason and self.index > 0 else 0
+        self._up_votes = self._up_votes + 1 if up_reason else 0
+        
+        if now - self._last_switch >= self.min_dwell:
+            if self._down_votes >= self.down_after:
+                self._switch(self.index - 1, down_reason, now)
+            elif self._up_votes >= self.up_after:
+                self._switch(self.index + 1, up_reason, now)
+        return self.size
+    
+    def _switch(self, index: int, reason: str, now: float):
+        """
+        Move to another size and reset the hysteresis state
+        """
+        old_size = self.size
+        self.index = index
+        self._down_votes = 0
+        self._up_votes = 0
+        self._last_switch = now
+        self.switches += 1
+        self.last_reason = reason
+        METRICS.inc('resolution_switches')
+        METRICS.set_gauge('input_size', self.size)
+        logger.info(f"Input size {old_size} -> {self.size} ({reason})")
+    
+    def get_statistics(self) -> dict:
+        """
+        Get resolution statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'enabled': self.enabled,
+            'size': self.size,
+            'switches': self.switches,
+            'last_reason': self.last_reason,
+            'frames_at_size': dict(self.frames_at_size)
+        }
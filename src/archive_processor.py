@@ -0,0 +1,341 @@
+"""
+Offline Archive Processing
+Splits recorded videos into frame-range chunks and runs batched detection on them in a process pool
+"""
+
+import cv2
+import numpy as np
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VIDEO_SUFFIXES = ('.mp4', '.avi', '.mkv', '.mov', '.m4v', '.ts')
+OUTPUT_FORMATS = ('jsonl', 'parquet')
+
+# Per-process state of pool workers (set by _init_worker)
+_detector = None
+
+
+class Chunk(NamedTuple):
+    """
+    Frame range of one video processed by one worker task
+    """
+    video: str
+    start: int          # First frame
+    end: int            # One past the last frame (-1 = until the end of the video)
+    fps: float
+    output: str         # Result file; its existence marks the chunk as done
+
+
+def find_videos(inputs: List[str]) -> List[str]:
+    """
+    Expand files, directories (searched recursively) and glob patterns into video paths
+    
+    Args:
+        inputs: Paths or patterns
+    
+    Returns:
+        Sorted, de-duplicated list of video files
+    """
+    videos = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = [p for p in path.rglob('*') if p.suffix.lower() in VIDEO_SUFFIXES]
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = [Path(p) for p in glob.glob(item, recursive=True)
+                          if Path(p).suffix.lower() in VIDEO_SUFFIXES]
+        if not candidates:
+            logger.warning(f"No videos found for {item}")
+        videos.update(str(p.resolve()) for p in candidates if p.is_file())
+    return sorted(videos)
+
+
+def plan_chunks(videos: List[str], output_dir: str, chunk_frames: int = 3000,
+                stride: int = 1, fmt: str = 'jsonl') -> List[Chunk]:
+    """
+    Split videos into chunks of ``chunk_frames`` frames
+    
+    Each video gets its own result directory, named after the file and a
+    hash of its path, with one result file per chunk.
+    
+    Args:
+        videos: Video files
+        output_dir: Root directory of the results
+        chunk_frames: Frames per chunk (0 = one chunk per video)
+        stride: Frame stride (part of the file names, so runs with another
+            stride do not reuse these results)
+        fmt: Output format ('jsonl' or 'parquet')
+    
+    Returns:
+        List of chunks in video/frame order
+    """
+    chunks = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            logger.error(f"Failed to open video: {video}")
+            continue
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+        
+        video_dir = Path(output_dir) / f"{Path(video).stem}-{hashlib.sha1(video.encode()).hexdigest()[:8]}"
+        if total <= 0 or chunk_frames <= 0:
+            # Unknown length (or no chunking): read until the end
+            ranges = [(0, -1)]
+        else:
+            ranges = [(start, min(start + chunk_frames, total)) for start in range(0, total, chunk_frames)]
+        for start, end in ranges:
+            name = f"{start:08d}-{'end' if end < 0 else f'{end:08d}'}-s{stride}.{fmt}"
+            chunks.append(Chunk(video, start, end, fps, str(video_dir / name)))
+    return chunks
+
+
+def _init_worker(config: dict, threads: int):
+    """
+    Load the detector once per pool process
+    """
+    global _detector
+    # Keep each process to its share of the cores
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from .bird_detector import BirdDetector
+    _detector = BirdDetector(config)
+    _detector.warmup()
+
+
+def _write_jsonl(path: str, video: str, columns: Dict[str, np.ndarray], names: dict):
+    """
+    One JSON object per detection
+    """
+    with open(path, 'w') as f:
+        for frame, seconds, box, conf, cls in zip(columns['frame'].tolist(), columns['time_s'].tolist(),
+                                                 columns['xyxy'].tolist(), columns['conf'].tolist(),
+                                                 columns['cls'].tolist()):
+            f.write(json.dumps({
+                'video': video, 'frame': frame, 'time_s': round(seconds, 3),
+                'x1': round(box[0], 1), 'y1': round(box[1], 1), 'x2': round(box[2], 1), 'y2': round(box[3], 1),
+                'conf': round(conf, 4), 'cls': cls, 'class_name': names.get(cls, str(cls))
+            }) + '\n')
+
+
+def _write_parquet(path: str, video: str, columns: Dict[str, np.ndarray], names: dict):
+    """
+    Columnar detections (requires pyarrow)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    count = len(columns['frame'])
+    xyxy = columns['xyxy']
+    table = pa.table({
+        'video': pa.array([video] * count, pa.string()).dictionary_encode(),
+        'frame': pa.array(columns['frame'], pa.int64()),
+        'time_s': pa.array(columns['time_s'], pa.float64()),
+        'x1': pa.array(xyxy[:, 0], pa.float32()),
+        'y1': pa.array(xyxy[:, 1], pa.float32()),
+        'x2': pa.array(xyxy[:, 2], pa.float32()),
+        'y2': pa.array(xyxy[:, 3], pa.float32()),
+        'conf': pa.array(columns['conf'], pa.float32()),
+        'cls': pa.array(columns['cls'], pa.int16()),
+        'class_name': pa.array([names.get(int(c), str(int(c))) for c in columns['cls']],
+                               pa.string()).dictionary_encode()
+    })
+    pq.write_table(table, path, compression='zstd')
+
+
+def _process_chunk(chunk: Chunk, stride: int, batch_size: int, fmt: str) -> dict:
+    """
+    Detect on one chunk and write its result file (runs in a pool process)
+    
+    Only every ``stride``-th frame (counted from the start of the video) is
+    decoded; the others are skipped with grab(). Frames are detected in
+    batches of ``batch_size``. The result is written to a temporary file
+    and renamed, so an interrupted chunk never looks finished.
+    """
+    start_time = time.perf_counter()
+    cap = cv2.VideoCapture(chunk.video)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {chunk.video}")
+    if chunk.start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, chunk.start)
+    
+    frames, indices = [], []
+    parts = {'frame': [], 'xyxy': [], 'conf': [], 'cls': []}
+    names = {}
+    processed = 0
+    
+    def flush():
+        nonlocal processed, names
+        for index, detections in zip(indices, _detector.detect_batch(frames)):
+            names = detections.names or names
+            if len(detections):
+                parts['frame'].append(np.full(len(detections), index, dtype=np.int64))
+                parts['xyxy'].append(detections.xyxy)
+                parts['conf'].append(detections.conf)
+                parts['cls'].append(detections.cls.astype(np.int64))
+        processed += len(frames)
+        frames.clear()
+        indices.clear()
+    
+    index = chunk.start
+    try:
+        while chunk.end < 0 or index < chunk.end:
+            if index % stride:
+                if not cap.grab():
+                    break
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                frames.append(frame)
+                indices.append(index)
+                if len(frames) >= batch_size:
+                    flush()
+            index += 1
+        if frames:
+            flush()
+    finally:
+        cap.release()
+    
+    columns = {
+        'frame': np.concatenate(parts['frame']) if parts['frame'] else np.empty(0, dtype=np.int64),
+        'xyxy': np.concatenate(parts['xyxy']) if parts['xyxy'] else np.empty((0, 4), dtype=np.float32),
+        'conf': np.concatenate(parts['conf']) if parts['conf'] else np.empty(0, dtype=np.float32),
+        'cls': np.concatenate(parts['cls']) if parts['cls'] else np.empty(0, dtype=np.int64)
+    }
+    columns['time_s'] = columns['frame'] / chunk.fps if chunk.fps > 0 else columns['frame'].astype(np.float64)
+    
+    Path(chunk.output).parent.mkdir(parents=True, exist_ok=True)
+    temp_path = f"{chunk.output}.tmp{os.getpid()}"
+    if fmt == 'parquet':
+        _write_parquet(temp_path, chunk.video, columns, names)
+    else:
+        _write_jsonl(temp_path, chunk.video, columns, names)
+    os.replace(temp_path, chunk.output)
+    
+    return {
+        'video': chunk.video,
+        'start': chunk.start,
+        'end': index,
+        'frames_read': index - chunk.start,
+        'frames_processed': processed,
+        'detections': len(columns['frame']),
+        'seconds': time.perf_counter() - start_time
+    }
+
+
+def process_archive(config: dict, inputs: List[str], output_dir: Optional[str] = None,
+                    workers: Optional[int] = None, chunk_frames: Optional[int] = None,
+                    stride: Optional[int] = None, batch_size: Optional[int] = None,
+                    fmt: Optional[str] = None, resume: bool = True) -> dict:
+    """
+    Run detection over recorded videos with a pool of processes
+    
+    Arguments left as None come from the ``archive`` config block. Chunks
+    whose result file already exists are skipped when resuming, so an
+    interrupted run continues where it stopped.
+    
+    Args:
+        config: Configuration dictionary
+        inputs: Video files, directories or glob patterns
+        output_dir: Root directory of the results
+        workers: Pool processes (each loads its own model)
+        chunk_frames: Frames per task
+        stride: Detect on every stride-th frame only
+        batch_size: Frames per forward pass
+        fmt: 'jsonl' or 'parquet'
+        resume: Skip chunks that are already done
+    
+    Returns:
+        Summary dictionary (also written to <output_dir>/_summary.json)
+    """
+    archive_config = config.get('archive', {})
+    output_dir = output_dir or archive_config.get('output_dir', 'detections')
+    threads = max(1, int(archive_config.get('threads_per_worker', 2)))
+    workers = workers or archive_config.get('workers') or max(1, (os.cpu_count() or 1) // threads)
+    chunk_frames = archive_config.get('chunk_frames', 3000) if chunk_frames is None else chunk_frames
+    stride = max(1, int(stride or archive_config.get('stride', 1)))
+    batch_size = batch_size or archive_config.get('batch_size') or config.get('yolo', {}).get('max_batch_size', 4)
+    fmt = fmt or archive_config.get('format', 'jsonl')
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {OUTPUT_FORMATS}")
+    if fmt == 'parquet':
+        import pyarrow  # noqa: F401  (fail before starting the pool)
+    
+    videos = find_videos(inputs)
+    chunks = plan_chunks(videos, output_dir, chunk_frames, stride, fmt)
+    pending = [chunk for chunk in chunks if not (resume and Path(chunk.output).exists())]
+    logger.info(f"{len(videos)} videos, {len(chunks)} chunks ({len(chunks) - len(pending)} already done), "
+                f"{workers} workers x {threads} threads, stride {stride}, batch {batch_size}")
+    
+    # Workers batch their own frames; the shared-queue and adaptive features are for live use
+    worker_config = dict(config)
+    worker_config['yolo'] = dict(config.get('yolo', {}), max_batch_size=batch_size)
+    
+    results = []
+    failed = []
+    start_time = time.perf_counter()
+    if pending:
+        # spawn: workers must not inherit a forked copy of torch/OpenCV thread pools
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context,
+                                 initializer=_init_worker, initargs=(worker_config, threads)) as pool:
+            futures = {pool.submit(_process_chunk, chunk, stride, batch_size, fmt): chunk for chunk in pending}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed.append({'video': chunk.video, 'start': chunk.start, 'error': str(e)})
+                    logger.error(f"Chunk {Path(chunk.video).name} @ {chunk.start} failed: {e}")
+                    continue
+                results.append(result)
+                elapsed = time.perf_counter() - start_time
+                frames_read = sum(r['frames_read'] for r in results)
+                logger.info(f"[{len(results) + len(failed)}/{len(pending)}] {Path(chunk.video).name} "
+                            f"{result['start']}-{result['end']}: {result['detections']} detections "
+                            f"({frames_read / elapsed:.1f} fps overall)")
+    wall = time.perf_counter() - start_time
+    
+    frames_read = sum(r['frames_read'] for r in results)
+    frames_processed = sum(r['frames_processed'] for r in results)
+    summary = {
+        'videos': len(videos),
+        'chunks': len(chunks),
+        'chunks_skipped': len(chunks) - len(pending),
+        'chunks_done': len(results),
+        'chunks_failed': len(failed),
+        'failures': failed,
+        'workers': workers,
+        'stride': stride,
+        'batch_size': batch_size,
+        'format': fmt,
+        'frames_read': frames_read,
+        'frames_processed': frames_processed,
+        'detections': sum(r['detections'] for r in results),
+        'wall_s': wall,
+        'fps': frames_read / wall if wall > 0 else 0.0,
+        'inference_fps': frames_processed / wall if wall > 0 else 0.0
+    }
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(output_dir) / '_summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,134 @@
+"""
+Batched Inference Queue
+Collects frames from one or more producers and runs them through BirdDetector.detect_batch
+"""
+
+import numpy as np
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+from .bird_detector import BirdDetector
+from .detections import Detections
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BatchInferenceQueue:
+    """
+    Micro-batching front end for a shared BirdDetector
+    
+    Callers submit single frames and get a Future back. A worker thread
+    gathers frames until ``max_batch_size`` is reached or the oldest frame
+    has waited ``max_batch_wait`` seconds, then runs one batched forward
+    pass and resolves the futures in submission order.
+    """
+    
+    def __init__(self, detector: BirdDetector, max_batch_size: Optional[int] = None,
+                 max_batch_wait: Optional[float] = None):
+        """
+        Initialize the queue
+        
+        Args:
+            detector: Detector used for the batched forward passes
+            max_batch_size: Frames per batch (defaults to detector.max_batch_size)
+            max_batch_wait: Seconds the oldest frame may wait for a batch to fill
+                (defaults to detector.max_batch_wait)
+        """
+        self.detector = detector
+        self.max_batch_size = max_batch_size or detector.max_batch_size
+        self.max_batch_wait = detector.max_batch_wait if max_batch_wait is None else max_batch_wait
+        
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[np.ndarray, Future, float]] = []
+        self._running = True
+        
+        # Statistics
+        self.batches_run = 0
+        self.frames_run = 0
+        
+        self._thread = threading.Thread(target=self._worker, name='BatchInference', daemon=True)
+        self._thread.start()
+    
+    def submit(self, frame: np.ndarray) -> Future:
+        """
+        Queue a frame for detection
+        
+        Args:
+            frame: Input frame (BGR format)
+        
+        Returns:
+            Future resolving to the frame's Detections
+        """
+        future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("BatchInferenceQueue has been closed")
+            self._queue.append((frame, future, time.monotonic()))
+            METRICS.set_gauge('inference_queue_depth', len(self._queue))
+            self._cond.notify()
+        return future
+    
+    def _worker(self):
+        """
+        Worker loop: form batches and run them
+        """
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                
+                # Wait for the batch to fill, but never past the oldest frame's deadline
+                deadline = self._queue[0][2] + self.max_batch_wait
+                while self._running and len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+                
+                batch = self._queue[:self.max_batch_size]
+                del self._queue[:self.max_batch_size]
+                METRICS.set_gauge('inference_queue_depth', len(self._queue))
+            METRICS.observe('batch_wait', time.monotonic() - batch[0][2])
+            
+            frames = [item[0] for item in batch]
+            try:
+                results = self.detector.detect_batch(frames)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {e}")
+                results = [Detections.empty() for _ in frames]
+            
+            for (_, future, _), detections in zip(batch, results):
+                future.set_result(detections)
+            self.batches_run += 1
+            self.frames_run += len(frames)
+    
+    def close(self, timeout: float = 2.0):
+        """
+        Stop accepting frames and wait for queued frames to be processed
+        
+        Args:
+            timeout: Seconds to wait for the worker to exit
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get batching statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'batches_run': self.batches_run,
+            'frames_run': self.frames_run,
+            'mean_batch_size': self.frames_run / self.batches_run if self.batches_run else 0.0
+        }
@@ -0,0 +1,480 @@
+"""
+Benchmark Suite
+Reproducible throughput/latency measurements on synthetic or recorded video with a fake PTZ
+"""
+
+import cv2
+import numpy as np
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+from .bird_detector import BirdDetector
+from .bird_tracker import BirdTracker
+from .detections import Detections
+from .fake_ptz import FakePTZController
+from .frame_grabber import FrameGrabber
+from .inference_backends import LatencyStats
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Metrics compared against a baseline: (path in the report, True if higher is better)
+REGRESSION_METRICS = [
+    ('fps', True),
+    ('latency.p50_ms', False),
+    ('latency.p95_ms', False),
+    ('latency.p99_ms', False),
+]
+
+
+def _synthetic_birds(width: int, height: int, num_frames: int, num_birds: int,
+                     seed: int) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    Deterministic bird ellipses (center x, center y, half width, half height) per frame
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.uniform([0, 0.1 * height], [width, 0.9 * height], size=(num_birds, 2))
+    velocity = rng.uniform(-6, 6, size=(num_birds, 2))
+    size = rng.uniform(8, 40, size=num_birds)
+    phase = rng.uniform(0, 2 * np.pi, size=num_birds)
+    
+    birds = []
+    for i in range(num_frames):
+        frame_birds = []
+        for b in range(num_birds):
+            x = int((start[b, 0] + velocity[b, 0] * i) % width)
+            y = int(start[b, 1] + velocity[b, 1] * i + 20 * np.sin(0.05 * i + phase[b])) % height
+            wing = int(size[b] * (0.4 + 0.3 * abs(np.sin(0.4 * i + phase[b]))))
+            frame_birds.append((x, y, int(size[b]), max(2, wing)))
+        birds.append(frame_birds)
+    return birds
+
+
+def synthetic_bird_boxes(width: int = 1280, height: int = 720, num_frames: int = 300,
+                         num_birds: int = 3, seed: int = 0) -> List[np.ndarray]:
+    """
+    Ground-truth boxes of the clip generate_synthetic_video writes with the same arguments
+    
+    Returns:
+        Per frame, an (N, 4) float32 xyxy array clipped to the frame
+    """
+    boxes = []
+    for frame_birds in _synthetic_birds(width, height, num_frames, num_birds, seed):
+        xyxy = np.array([(x - ax, y - ay, x + ax, y + ay) for x, y, ax, ay in frame_birds],
+                        np.float32).reshape(-1, 4)
+        np.clip(xyxy[:, 0::2], 0, width, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, height, out=xyxy[:, 1::2])
+        boxes.append(xyxy[(xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])])
+    return boxes
+
+
+def generate_synthetic_video(path: str, width: int = 1280, height: int = 720, num_frames: int = 300,
+                             fps: int = 30, num_birds: int = 3, seed: int = 0) -> str:
+    """
+    Write a deterministic test clip of dark "birds" crossing a sky gradient
+    
+    The ellipses are not birds to a COCO model; synthetic_bird_boxes() gives
+    their boxes, which the tracking benchmarks inject as detections.
+    
+    Args:
+        path: Output path (.avi, MJPG)
+        width: Frame width
+        height: Frame height
+        num_frames: Number of frames
+        fps: Frame rate written into the file
+        num_birds: Number of moving birds
+        seed: Random seed for the bird paths
+    
+    Returns:
+        The output path
+    """
+    sky = np.linspace(235, 170, height, dtype=np.float32)[:, None]
+    background = np.dstack([np.repeat(sky + 15, width, axis=1),
+                            np.repeat(sky, width, axis=1),
+                            np.repeat(sky - 40, width, axis=1)]).clip(0, 255).astype(np.uint8)
+    
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot write synthetic video to {path}")
+    for frame_birds in _synthetic_birds(width, height, num_frames, num_birds, seed):
+        frame = background.copy()
+        for x, y, axis_x, axis_y in frame_birds:
+            cv2.ellipse(frame, (x, y), (axis_x, axis_y), 0, 0, 360, (40, 35, 30), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MiB
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else rss / 1024.0
+
+
+class GroundTruthDetector:
+    """
+    BirdDetector stand-in that reports the known birds of a synthetic clip
+    
+    detect() still runs the wrapped model on the frame, so inference stays
+    in the timings, but returns the ground-truth boxes of ``frame_index``
+    (set by the benchmark loop before each frame). Without them the
+    tracking, Kalman/flow and PTZ stages would only ever see empty
+    detections. All other attributes come from the wrapped detector.
+    """
+    
+    def __init__(self, detector: BirdDetector, boxes: List[np.ndarray], confidence: float = 0.9):
+        """
+        Initialize the stand-in
+        
+        Args:
+            detector: Loaded detector whose model is run on every frame
+            boxes: Per-frame (N, 4) xyxy ground truth (see synthetic_bird_boxes)
+            confidence: Confidence reported for every box
+        """
+        self.detector = detector
+        self.boxes = boxes
+        self.confidence = confidence
+        self.class_id = (detector.classes or [14])[0]
+        self.frame_index = 0
+    
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+    
+    def detect(self, frame: np.ndarray) -> Detections:
+        self.detector.detect(frame)
+        if not 0 <= self.frame_index < len(self.boxes):
+            return Detections.empty()
+        boxes = self.boxes[self.frame_index]
+        return Detections(boxes, np.full(len(boxes), self.confidence, np.float32),
+                          np.full(len(boxes), self.class_id, np.int32), {self.class_id: 'bird'})
+
+
+class StageTimer:
+    """
+    Collects per-stage durations and summarizes them as percentiles
+    """
+    
+    def __init__(self):
+        self.stages: Dict[str, LatencyStats] = {}
+    
+    @contextmanager
+    def time(self, stage: str):
+        """
+        Time the enclosed block under ``stage``
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+    
+    def add(self, stage: str, seconds: float):
+        if stage not in self.stages:
+            self.stages[stage] = LatencyStats(window=None)
+        self.stages[stage].record(seconds)
+    
+    def summary(self) -> Dict[str, dict]:
+        """
+        Summarize all stages
+        
+        Returns:
+            Mapping stage -> count, mean_ms, p50_ms, p95_ms, p99_ms
+        """
+        return {stage: stats.summary() for stage, stats in self.stages.items()}
+
+
+def _iter_frames(video_path: str, max_frames: Optional[int]):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video source: {video_path}")
+    count = 0
+    try:
+        while max_frames is None or count < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+def _stage_report(timer: StageTimer, main_stage: str, frames: int, wall: float) -> dict:
+    stages = timer.summary()
+    return {
+        'frames': frames,
+        'wall_s': wall,
+        'fps': frames / wall if wall > 0 else 0.0,
+        'latency': stages.get(main_stage, {}),
+        'stages': stages
+    }
+
+
+def bench_detector(config: dict, video_path: str, max_frames: Optional[int] = None,
+                   warmup: int = 3, detector: Optional[BirdDetector] = None,
+                   ground_truth: Optional[List[np.ndarray]] = None) -> dict:
+    """
+    Time BirdDetector.detect on every frame of a video
+    
+    Frames are decoded one at a time and decoding is not timed, so neither
+    the clip's size nor its decode cost shows up in the report.
+    
+    Args:
+        config: Configuration dictionary
+        video_path: Video file
+        max_frames: Stop after this many frames
+        warmup: Untimed detections run on the first frame
+        detector: Loaded detector to reuse (default: load one)
+        ground_truth: Not used (the model's own output is timed here); only
+            accepted so that all BENCHMARKS share one signature
+    
+    Returns:
+        Stage report
+    """
+    detector = detector or BirdDetector(config)
+    timer = StageTimer()
+    
+    frames = 0
+    wall = 0.0
+    for frame in _iter_frames(video_path, max_frames):
+        if frames == 0:
+            for _ in range(warmup):
+                detector.detect(frame)
+        start = time.perf_counter()
+        with timer.time('detect'):
+            detector.detect(frame)
+        wall += time.perf_counter() - start
+        frames += 1
+    return _stage_report(timer, 'detect', frames, wall)
+
+
+def bench_tracker(config: dict, video_path: str, max_frames: Optional[int] = None,
+                  ptz_latency: float = 0.03, render: bool = True,
+                  detector: Optional[BirdDetector] = None,
+                  ground_truth: Optional[List[np.ndarray]] = None) -> dict:
+    """
+    Time BirdTracker (with a fake PTZ) on every frame of a video
+    
+    Frames are decoded one at a time, outside the timed section.
+    
+    Args:
+        config: Configuration dictionary
+        video_path: Video file
+        max_frames: Stop after this many frames
+        ptz_latency: Simulated PTZ command round-trip in seconds
+        render: Time process_frame (track + overlays) instead of the headless track()
+        detector: Loaded detector to reuse (default: the tracker loads one)
+        ground_truth: Per-frame boxes injected as detections (synthetic clips)
+    
+    Returns:
+        Stage report
+    """
+    injected = GroundTruthDetector(detector, ground_truth) if detector and ground_truth else None
+    ptz = FakePTZController(config, simulated_latency=ptz_latency)
+    tracker = BirdTracker(config, detector=injected or detector, ptz_controller=ptz)
+    timer = StageTimer()
+    
+    frames = 0
+    wall = 0.0
+    try:
+        for index, frame in enumerate(_iter_frames(video_path, max_frames)):
+            if injected:
+                injected.frame_index = index
+            start = time.perf_counter()
+            if render:
+                with timer.time('process_frame'):
+                    tracker.process_frame(frame)
+            else:
+                with timer.time('track'):
+                    tracker.track(frame)
+            wall += time.perf_counter() - start
+            frames += 1
+    finally:
+        tracker.close()
+    
+    report = _stage_report(timer, 'process_frame' if render else 'track', frames, wall)
+    report['ptz'] = ptz.get_statistics()
+    report['tracking'] = tracker.get_statistics()
+    return report
+
+
+def bench_pipeline(config: dict, video_path: str, max_frames: Optional[int] = None,
+                   ptz_latency: float = 0.03, detector: Optional[BirdDetector] = None,
+                   ground_truth: Optional[List[np.ndarray]] = None) -> dict:
+    """
+    Run the headless main loop: paced FrameGrabber -> BirdTracker.track -> fake PTZ
+    
+    The file is replayed at its own frame rate to behave like a live camera,
+    and end-to-end latency is measured from frame capture to the end of
+    tracking.
+    
+    Args:
+        config: Configuration dictionary
+        video_path: Video file
+        max_frames: Stop after this many processed frames
+        ptz_latency: Simulated PTZ command round-trip in seconds
+        detector: Loaded detector to reuse (default: the tracker loads one)
+        ground_truth: Per-frame boxes injected as detections (synthetic clips)
+    
+    Returns:
+        Stage report
+    """
+    pipeline_config = dict(config)
+    pipeline_config['video'] = dict(config.get('video', {}))
+    pipeline_config['video']['capture'] = dict(pipeline_config['video'].get('capture', {}),
+                                               pace_to_fps=True)
+    
+    injected = GroundTruthDetector(detector, ground_truth) if detector and ground_truth else None
+    ptz = FakePTZController(config, simulated_latency=ptz_latency)
+    tracker = BirdTracker(config, detector=injected or detector, ptz_controller=ptz)
+    grabber = FrameGrabber(video_path, pipeline_config)
+    timer = StageTimer()
+    
+    processed = 0
+    grabber.start()
+    start = time.perf_counter()
+    try:
+        while max_frames is None or processed < max_frames:
+            wait_start = time.perf_counter()
+            packet = grabber.read(timeout=1.0)
+            timer.add('capture_wait', time.perf_counter() - wait_start)
+            if packet is None:
+                if grabber.finished:
+                    break
+                continue
+            if injected:
+                # Paced replay drops frames; frame_id is still the source frame number
+                injected.frame_index = packet.frame_id
+            with timer.time('track'):
+                tracker.track(packet.frame, packet.timestamp)
+            timer.add('end_to_end', time.monotonic() - packet.timestamp)
+            processed += 1
+    finally:
+        wall = time.perf_counter() - start
+        grabber.stop()
+        tracker.close()
+    
+    report = _stage_report(timer, 'end_to_end', processed, wall)
+    report['capture'] = grabber.get_statistics()
+    report['ptz'] = ptz.get_statistics()
+    return report
+
+
+BENCHMARKS = {
+    'detector': bench_detector,
+    'tracker': bench_tracker,
+    'tracker_headless': partial(bench_tracker, render=False),
+    'pipeline': bench_pipeline,
+}
+
+
+def run_benchmarks(config: dict, video_path: str, names: Optional[List[str]] = None,
+                   max_frames: Optional[int] = None,
+                   ground_truth: Optional[List[np.ndarray]] = None) -> dict:
+    """
+    Run the selected benchmarks and build a JSON-serialisable report
+    
+    The model is loaded and warmed up once and shared by all benchmarks, so
+    no run includes load or warm-up time (both are reported in ``meta``).
+    
+    Args:
+        config: Configuration dictionary
+        video_path: Video file
+        names: Benchmarks to run (keys of BENCHMARKS, default all)
+        max_frames: Frame limit per benchmark
+        ground_truth: Per-frame boxes injected as detections in the tracking
+            benchmarks (synthetic clips, see synthetic_bird_boxes)
+    
+    Returns:
+        Report dictionary
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    logger.info("Loading the shared detector...")
+    detector = BirdDetector(config)
+    detector.warmup(frame_size if all(frame_size) else None)
+    
+    yolo_config = config.get('yolo', {})
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'video': video_path,
+            'model_path': yolo_config.get('model_path', 'yolo11n.pt'),
+            'backend': yolo_config.get('backend', 'pytorch'),
+            'img_size': yolo_config.get('img_size', 640),
+            'detections': 'ground_truth' if ground_truth else 'model',
+            'model_load_s': detector.load_time,
+            'warmup_s': detector.warmup_time,
+        },
+        'benchmarks': {}
+    }
+    for name in names or list(BENCHMARKS):
+        logger.info(f"Running benchmark: {name}")
+        METRICS.reset()
+        report['benchmarks'][name] = BENCHMARKS[name](config, video_path, max_frames,
+                                                      detector=detector, ground_truth=ground_truth)
+        # Internal stage breakdown (decode, inference, postprocess, annotation, ptz_rtt, ...)
+        report['benchmarks'][name]['metrics'] = METRICS.snapshot()
+    report['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def _lookup(data: dict, path: str) -> Optional[float]:
+    for key in path.split('.'):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Find metrics that got worse than the baseline by more than ``tolerance``
+    
+    Args:
+        report: Current report
+        baseline: Stored baseline report
+        tolerance: Allowed relative change (0.10 = 10%)
+    
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, current in report.get('benchmarks', {}).items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        for path, higher_is_better in REGRESSION_METRICS:
+            new, old = _lookup(current, path), _lookup(previous, path)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{name}.{path}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+    
+    new_rss, old_rss = report.get('peak_rss_mb'), baseline.get('peak_rss_mb')
+    if new_rss and old_rss and (new_rss - old_rss) / old_rss > tolerance:
+        regressions.append(f"peak_rss_mb: {old_rss:.1f} -> {new_rss:.1f} ({(new_rss - old_rss) / old_rss:+.1%})")
+    return regressions
+
+
+def save_report(report: dict, path: str):
+    """
+    Write a report as indented JSON
+    """
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
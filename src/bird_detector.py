@@ -5,9 +5,15 @@ Optimized for RK3588S hardware
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import logging
+import time
+from .adaptive_resolution import input_sizes
+from .detections import Detections, as_detections
+from .inference_backends import LatencyStats, resolve_model_path
+from .metrics import METRICS
+from .preprocess import DirectInference
+from .quantization import quantized_model_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,16 +38,113 @@ class BirdDetector:
         self.device = self.config.get('device', 'cpu')
         self.classes = self.config.get('classes', [14])  # COCO dataset class 14: bird
         self.img_size = self.config.get('img_size', 640)
+        # Batched inference (detect_batch / BatchInferenceQueue)
+        self.max_batch_size = max(1, int(self.config.get('max_batch_size', 4)))
+        self.max_batch_wait = self.config.get('max_batch_wait', 0.02)
         
-        logger.info(f"Loading YOLO11 model: {self.model_path}")
+        # Inference backend: pytorch, onnx, openvino or torchscript (exported once and cached)
+        self.backend = self.config.get('backend', 'pytorch')
+        self.backend_fallback = self.config.get('backend_fallback', True)
+        self.export_opset = self.config.get('export_opset', 12)
+        self.export_cache_dir = self.config.get('export_cache_dir', '.model_cache')
+        # "int8" loads the quantized artifact built by quantize.py (yolo.quantization.backend)
+        self.precision = self.config.get('precision', 'fp32')
+        if self.precision == 'int8':
+            self.backend = self.config.get('quantization', {}).get('backend', 'onnx')
+        # Dummy forward passes run by warmup() before the first real frame
+        self.warmup_runs = int(self.config.get('warmup_runs', 2))
+        # Preallocated letterbox buffers and direct backend calls instead of the Ultralytics predictor
+        self.zero_copy = self.config.get('zero_copy', True)
+        self._direct: Optional[DirectInference] = None
+        self._runners: Dict[int, DirectInference] = {}
+        self.latency = LatencyStats()
+        self.load_time = 0.0
+        self.warmup_time = 0.0
+        
+        logger.info(f"Loading YOLO11 model: {self.model_path} (backend: {self.backend}, {self.precision})")
+        start = time.perf_counter()
         try:
-            self.model = YOLO(self.model_path)
+            self.model = self._load_model(self.backend)
             logger.info("YOLO11 model loaded successfully")
         except Exception as e:
-            logger.error(f"Failed to load YOLO11 model: {e}")
-            raise
+            if (self.backend == 'pytorch' and self.precision == 'fp32') or not self.backend_fallback:
+                logger.error(f"Failed to load YOLO11 model: {e}")
+                raise
+            logger.warning(f"Backend {self.backend} ({self.precision}) unavailable ({e}), falling back to pytorch")
+            self.backend = 'pytorch'
+            self.precision = 'fp32'
+            self.model = self._load_model(self.backend)
+        self.load_time = time.perf_counter() - start
+        
+        # Arguments passed on every model call, built once
+        self.predict_args = {
+            'conf': self.conf_threshold,
+            'iou': self.iou_threshold,
+            'classes': self.classes,
+            'device': self.device,
+            'imgsz': self.img_size,
+            'verbose': False
+        }
+        
+        # Input sizes adaptive resolution may switch between, each with its own
+        # model (fixed-shape exports) or sharing one (pytorch, dynamic exports)
+        self.base_img_size = self.img_size
+        self._models = {self.img_size: self.model}
+        for size in input_sizes(config):
+            if size not in self._models:
+                self._prepare_size(size)
+        self.input_sizes = sorted(self._models)
+    
+    def _prepare_size(self, size: int):
+        """
+        Make the model for another input size available to set_input_size()
+        
+        Args:
+            size: Input size in pixels
+        """
+        dynamic = self.max_batch_size > 1 and self.backend in ('onnx', 'openvino')
+        if self.backend == 'pytorch' or dynamic:
+            self._models[size] = self.model
+            return
+        try:
+            self._models[size] = self._load_model(self.backend, size)
+        except Exception as e:
+            logger.warning(f"Input size {size} unavailable for {self.backend} ({e}), skipping it")
+    
+    def _load_model(self, backend: str, img_size: Optional[int] = None):
+        """
+        Load the model for the given backend, exporting it on first use
+        
+        Args:
+            backend: Backend name
+            img_size: Input size the export is built for (defaults to img_size)
+            
+        Returns:
+            Ultralytics YOLO model
+        """
+        # Imported here so importing the package (CLI help, config checks) does not load torch
+        from ultralytics import YOLO
+        
+        img_size = img_size or self.img_size
+        if self.precision == 'int8':
+            path = quantized_model_path({'yolo': dict(self.config, img_size=img_size)})
+            if not path.exists():
+                raise FileNotFoundError(f"No INT8 model at {path} (run 'python quantize.py build')")
+            return YOLO(str(path), task='detect')
+        
+        if backend == 'pytorch':
+            return YOLO(self.model_path)
+        
+        path = resolve_model_path(
+            self.model_path, backend,
+            img_size=img_size,
+            opset=self.export_opset,
+            dynamic=self.max_batch_size > 1,
+            cache_dir=self.export_cache_dir
+        )
+        return YOLO(path, task='detect')
     
-    def detect(self, frame: np.ndarray) -> List[dict]:
+    def detect(self, frame: np.ndarray) -> Detections:
         """
         Detect birds in the given frame
         
@@ -49,7 +152,8 @@ class BirdDetector:
             frame: Input image frame (BGR format)
             
         Returns:
-            List of detections, each containing:
+            Detections container (xyxy/conf/cls arrays). Iterating it yields
+            dictionaries containing:
                 - bbox: [x1, y1, x2, y2]
                 - confidence: detection confidence
                 - class_id: class ID
@@ -57,62 +161,214 @@ class BirdDetector:
         """
         try:
             # Run inference
-            results = self.model(
-                frame,
-                conf=self.conf_threshold,
-                iou=self.iou_threshold,
-                classes=self.classes,
-                device=self.device,
-                verbose=False
-            )
-            
-            detections = []
-            if results and len(results) > 0:
-                result = results[0]
-                if result.boxes is not None and len(result.boxes) > 0:
-                    boxes = result.boxes.xyxy.cpu().numpy()
-                    confidences = result.boxes.conf.cpu().numpy()
-                    class_ids = result.boxes.cls.cpu().numpy()
-                    
-                    for box, conf, cls_id in zip(boxes, confidences, class_ids):
-                        detection = {
-                            'bbox': box.tolist(),
-                            'confidence': float(conf),
-                            'class_id': int(cls_id),
-                            'class_name': result.names[int(cls_id)]
-                        }
-                        detections.append(detection)
-            
+            start = time.perf_counter()
+            direct = self._get_direct()
+            if direct is not None:
+                detections = direct([frame])[0]
+            else:
+                results = self.model(frame, **self.predict_args)
+                detections = self._parse_result(results[0]) if results else Detections.empty()
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed)
+            METRICS.observe('inference', elapsed)
             return detections
             
         except Exception as e:
+            if self._direct is not None:
+                self._disable_direct(e)
+                return self.detect(frame)
             logger.error(f"Detection error: {e}")
-            return []
+            return Detections.empty()
     
-    def get_largest_detection(self, detections: List[dict]) -> Optional[dict]:
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Detections]:
+        """
+        Detect birds in several frames using batched forward passes
+        
+        Frames may come from one camera or several and may differ in size.
+        They are split into chunks of at most ``max_batch_size`` frames, and
+        each chunk runs through the model in a single call.
+        
+        Args:
+            frames: List of input frames (BGR format)
+            
+        Returns:
+            List of per-frame Detections, in input order
+        """
+        all_detections = []
+        for start in range(0, len(frames), self.max_batch_size):
+            chunk = frames[start:start + self.max_batch_size]
+            try:
+                batch_start = time.perf_counter()
+                direct = self._get_direct()
+                if direct is not None:
+                    chunk_detections = direct(chunk)
+                else:
+                    results = self.model(chunk, **self.predict_args)
+                    chunk_detections = [self._parse_result(result) for result in results]
+                elapsed = time.perf_counter() - batch_start
+                self.latency.record(elapsed / len(chunk))
+                METRICS.observe('inference_batch', elapsed)
+                METRICS.inc('frames_inferred', len(chunk))
+                all_detections.extend(chunk_detections)
+            except Exception as e:
+                if self._direct is not None:
+                    self._disable_direct(e)
+                    all_detections.extend(self.detect_batch(chunk))
+                    continue
+                logger.error(f"Batch detection error: {e}")
+                all_detections.extend(Detections.empty() for _ in chunk)
+        
+        return all_detections
+    
+    def _get_direct(self) -> Optional[DirectInference]:
+        """
+        Get the zero-copy runner, creating it on first use
+        
+        Returns:
+            DirectInference, or None if zero_copy is off or unavailable
+        """
+        if self._direct is None and self.zero_copy:
+            try:
+                self._direct = self._runners[self.img_size] = DirectInference(
+                    self.model, self.predict_args, self.img_size, self.max_batch_size,
+                    # Stride-aligned rectangles only with pytorch; exports get the square size they were built for
+                    rect=self.backend == 'pytorch'
+                )
+                logger.info(f"Zero-copy preprocessing enabled at {self.img_size} "
+                            f"({self._direct.preprocessor.get_statistics()['buffer_mb']:.1f} MB of buffers)")
+            except Exception as e:
+                logger.warning(f"Zero-copy preprocessing unavailable ({e}), using the Ultralytics predictor")
+                self.zero_copy = False
+        return self._direct
+    
+    def _disable_direct(self, error: Exception):
+        """
+        Fall back to the Ultralytics predictor after the direct path failed
+        """
+        logger.warning(f"Zero-copy inference failed ({error}), falling back to the Ultralytics predictor")
+        self._direct = None
+        self._runners.clear()
+        self.zero_copy = False
+    
+    def set_input_size(self, size: int):
+        """
+        Switch the network input size for the following inferences
+        
+        Args:
+            size: One of ``input_sizes``
+        """
+        if size == self.img_size:
+            return
+        if size not in self._models:
+            raise ValueError(f"Input size {size} not prepared (available: {self.input_sizes})")
+        self.img_size = size
+        self.model = self._models[size]
+        self.predict_args['imgsz'] = size
+        self._direct = self._runners.get(size)
+    
+    def _parse_result(self, result) -> Detections:
+        """
+        Convert one Ultralytics result into a Detections container
+        
+        Args:
+            result: Ultralytics Results object for a single image
+            
+        Returns:
+            Detections for that image
+        """
+        if result.boxes is None or len(result.boxes) == 0:
+            return Detections.empty(result.names)
+        
+        with METRICS.time('postprocess'):
+            return Detections(
+                result.boxes.xyxy.cpu().numpy(),
+                result.boxes.conf.cpu().numpy(),
+                result.boxes.cls.cpu().numpy(),
+                result.names
+            )
+    
+    def warmup(self, frame_size: Optional[Tuple[int, int]] = None, runs: Optional[int] = None) -> float:
+        """
+        Run dummy frames through the model so the first real frame is not slowed
+        by lazy initialization (kernel selection, memory allocation, graph setup)
+        
+        Args:
+            frame_size: (width, height) of the frames that will be processed;
+                defaults to a square of ``img_size``
+            runs: Number of forward passes (defaults to ``warmup_runs``)
+            
+        Returns:
+            Seconds spent warming up
+        """
+        runs = self.warmup_runs if runs is None else runs
+        if runs <= 0:
+            return 0.0
+        width, height = frame_size or (self.img_size, self.img_size)
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        
+        start = time.perf_counter()
+        current_size = self.img_size
+        # Every input size is warmed up, so switching sizes later causes no
+        # graph setup or buffer allocation on the tracking thread
+        for size in self.input_sizes:
+            self.set_input_size(size)
+            for _ in range(runs):
+                try:
+                    direct = self._get_direct()
+                    if direct is not None:
+                        direct([dummy])
+                    else:
+                        self.model(dummy, **self.predict_args)
+                except Exception as e:
+                    logger.warning(f"Warm-up inference at {size} failed: {e}")
+                    break
+        self.set_input_size(current_size)
+        self.warmup_time = time.perf_counter() - start
+        sizes = '/'.join(str(size) for size in self.input_sizes)
+        logger.info(f"Model warm-up: {runs} x {width}x{height} at {sizes} in {self.warmup_time:.2f}s")
+        return self.warmup_time
+    
+    def get_preprocess_stats(self) -> dict:
+        """
+        Get zero-copy preprocessing statistics
+        
+        Returns:
+            Dictionary with enabled, frames_prepared, plan_misses and buffer_mb
+            (summed over the input sizes)
+        """
+        if not self._runners:
+            return {'enabled': False}
+        stats = {'enabled': True, 'frames_prepared': 0, 'plan_misses': 0, 'buffer_mb': 0.0}
+        for runner in self._runners.values():
+            for key, value in runner.get_statistics().items():
+                stats[key] += value
+        return stats
+    
+    def get_latency_stats(self) -> dict:
+        """
+        Get per-frame inference latency of the active backend
+        
+        Returns:
+            Dictionary with backend, precision, count, mean_ms, p50_ms and p95_ms
+        """
+        return dict(self.latency.summary(), backend=self.backend, precision=self.precision)
+    
+    def get_largest_detection(self, detections: Union[Detections, List[dict]]) -> Optional[dict]:
         """
         Get the largest detection (by area)
         
         Args:
-            detections: List of detections
+            detections: Detections container or list of detection dicts
             
         Returns:
             Largest detection or None if no detections
         """
-        if not detections:
+        detections = as_detections(detections)
+        index = detections.largest_index()
+        if index < 0:
             return None
         
-        largest = None
-        max_area = 0
-        
-        for det in detections:
-            x1, y1, x2, y2 = det['bbox']
-            area = (x2 - x1) * (y2 - y1)
-            if area > max_area:
-                max_area = area
-                largest = det
-        
-        return largest
+        return detections[index]
     
     def get_detection_center(self, detection: dict) -> Tuple[int, int]:
         """
@@ -129,23 +385,27 @@ class BirdDetector:
         center_y = int((y1 + y2) / 2)
         return center_x, center_y
     
-    def draw_detections(self, frame: np.ndarray, detections: List[dict]) -> np.ndarray:
+    def draw_detections(self, frame: np.ndarray,
+                        detections: Union[Detections, List[dict]]) -> np.ndarray:
         """
         Draw bounding boxes and labels on the frame
         
         Args:
             frame: Input frame
-            detections: List of detections
+            detections: Detections container or list of detection dicts
             
         Returns:
             Frame with drawn detections
         """
         output = frame.copy()
         
-        for det in detections:
-            x1, y1, x2, y2 = [int(v) for v in det['bbox']]
-            conf = det['confidence']
-            class_name = det['class_name']
+        detections = as_detections(detections)
+        boxes = detections.xyxy.astype(np.int32)
+        centers = detections.centers().astype(np.int32)
+        
+        for (x1, y1, x2, y2), (center_x, center_y), conf, cls_id in zip(
+                boxes.tolist(), centers.tolist(), detections.conf.tolist(), detections.cls.tolist()):
+            class_name = detections.names.get(cls_id, str(cls_id))
             
             # Draw bounding box
             cv2.rectangle(output, (x1, y1), (x2, y2), (0, 255, 0), 2)
@@ -159,7 +419,6 @@ class BirdDetector:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
             
             # Draw center point
-            center_x, center_y = self.get_detection_center(det)
             cv2.circle(output, (center_x, center_y), 5, (0, 0, 255), -1)
         
         return output
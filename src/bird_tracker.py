@@ -7,49 +7,160 @@ import cv2
 import numpy as np
 import logging
 import time
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import NamedTuple, Optional, Tuple
 from .bird_detector import BirdDetector
+from .adaptive_resolution import AdaptiveResolution
 from .ptz_controller import PTZController
+from .motion_gate import MotionGate
+from .detections import Detections
+from .tiled_inference import TiledDetector
+from .interframe_tracker import InterFrameTracker
+from .multi_object_tracker import MultiObjectTracker
+from .predictive_control import PredictivePTZController
+from .metrics import METRICS
+from .ptz_status import PTZStatus
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TrackingResult(NamedTuple):
+    """
+    Outcome of BirdTracker.track() for one frame (everything render() needs)
+    """
+    timestamp: float
+    detections: Detections
+    target: Optional[Tuple[int, int]]       # Center of the followed bird
+    target_track_id: Optional[int]
+    aim: Optional[Tuple[int, int]]          # Predicted aim point, if prediction is on
+    offset: Optional[Tuple[int, int]]       # Target offset from the frame center
+    tracking_active: bool                   # A PTZ move was issued for this frame
+    frame_count: int
+    detection_count: int
+    ptz_moves: int
+    ptz_status: Optional[PTZStatus]         # Latest polled camera position (may be stale)
+    ptz_status_stale: bool
+
+
 class BirdTracker:
     """
     Bird tracking system that combines detection and PTZ control
     """
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, detector: Optional[BirdDetector] = None,
+                 inference_queue=None, ptz_controller=None,
+                 frame_size: Optional[Tuple[int, int]] = None,
+                 event_store=None, camera_name: str = 'default'):
         """
         Initialize the bird tracker
         
+        The ONVIF connection is made on a helper thread while the model loads
+        and warms up, so startup takes roughly the longer of the two instead
+        of their sum.
+        
         Args:
             config: Configuration dictionary
+            detector: Existing detector to share between trackers (optional)
+            inference_queue: BatchInferenceQueue to run detection through, so
+                several trackers can share batched forward passes (optional)
+            ptz_controller: PTZ controller to use instead of connecting to the
+                configured camera, e.g. FakePTZController (optional)
+            frame_size: (width, height) of the video, used to warm up a newly
+                loaded model with frames of the real size (optional)
+            event_store: EventStore that detections and finished tracks are
+                queued to (optional)
+            camera_name: Camera the events are recorded under
         """
         self.config = config
         self.tracking_config = config.get('tracking', {})
+        init_start = time.perf_counter()
+        
+        # Connect to the camera in the background while the model loads
+        ptz_future = None
+        pool = None
+        if ptz_controller is None:
+            logger.info("Initializing PTZ controller...")
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='PTZConnect')
+            ptz_future = pool.submit(PTZController, config)
         
-        # Initialize detector and PTZ controller
-        logger.info("Initializing bird detector...")
-        self.detector = BirdDetector(config)
+        # Initialize detector
+        owns_detector = detector is None
+        try:
+            if detector is None:
+                logger.info("Initializing bird detector...")
+                detector = BirdDetector(config)
+                detector.warmup(frame_size)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False)
+        self.detector = detector
+        self.inference_queue = inference_queue
         
-        logger.info("Initializing PTZ controller...")
         try:
-            self.ptz_controller = PTZController(config)
+            self.ptz_controller = ptz_controller or ptz_future.result()
             self.ptz_enabled = True
         except Exception as e:
             logger.warning(f"PTZ controller initialization failed: {e}")
             logger.warning("Continuing without PTZ control")
             self.ptz_enabled = False
         
+        # Startup breakdown (model load/warm-up and PTZ connect overlap)
+        self.init_times = {
+            'model_load': self.detector.load_time,
+            'warmup': self.detector.warmup_time,
+            'ptz_connect': getattr(self.ptz_controller, 'connect_time', 0.0) if self.ptz_enabled else 0.0,
+            'total': time.perf_counter() - init_start
+        }
+        logger.info("Tracker initialized in {total:.2f}s (model load {model_load:.2f}s, "
+                    "warm-up {warmup:.2f}s, PTZ connect {ptz_connect:.2f}s)".format(**self.init_times))
+        
         # Tracking parameters
         self.frame_center_tolerance = self.tracking_config.get('frame_center_tolerance', 50)
         self.update_interval = self.tracking_config.get('update_interval', 0.1)
         self.smoothing_factor = self.tracking_config.get('smoothing_factor', 0.3)
         
+        # Optional motion gate in front of the detector
+        self.motion_gate = MotionGate(config)
+        self.last_detections = Detections.empty()
+        
+        # Optional tiled inference for high-resolution streams
+        self.tiled_detector = TiledDetector(config, self._detect_batch,
+                                            iou_threshold=self.detector.iou_threshold)
+        
+        # Optional detect-every-N mode: optical flow carries the target between YOLO runs
+        self.interframe = InterFrameTracker(config)
+        self.target_class_id = None
+        
+        # Multi-object tracking: persistent IDs and a locked PTZ target
+        self.mot = MultiObjectTracker(config)
+        self.target_track_id = None
+        
+        # Optional event persistence: the store only queues, a writer thread does the I/O
+        self.event_store = event_store if event_store is not None and event_store.enabled else None
+        self.camera_name = camera_name
+        if self.event_store is not None:
+            self.mot.on_finish = partial(self.event_store.record_track, camera_name)
+        
+        # Optional latency-compensating control: aim where the target will be
+        self.predictor = PredictivePTZController(config)
+        self._predicted_track_id = None
+        
+        # Load shedding (FrameScheduler): run YOLO only on every detect_every-th frame
+        self.detect_every = 1
+        
+        # Optional adaptive input resolution (switches the detector's input size)
+        self.resolution = AdaptiveResolution(config, self.detector.input_sizes, self.detector.img_size)
+        if self.resolution.enabled and (not owns_detector or inference_queue is not None
+                                        or self.tiled_detector.enabled):
+            # A shared detector would be switched by every camera; tiles need full resolution
+            logger.info("Adaptive resolution disabled (shared detector or tiled inference)")
+            self.resolution.enabled = False
+        
         # Tracking state
         self.last_target_pos = None
+        self.target_box = None
         self.last_update_time = 0
         self.smoothed_offset_x = 0
         self.smoothed_offset_y = 0
@@ -58,27 +169,250 @@ class BirdTracker:
         self.frame_count = 0
         self.detection_count = 0
         self.tracking_count = 0
+        self.detections_shed = 0
+    
+    def _detect_batch(self, images: list) -> list:
+        """
+        Run detection on several images, through the shared queue if there is one
+        
+        Args:
+            images: List of images (BGR format)
+            
+        Returns:
+            List of Detections in input order
+        """
+        if self.inference_queue is not None:
+            futures = [self.inference_queue.submit(image) for image in images]
+            return [future.result() for future in futures]
+        return self.detector.detect_batch(images)
     
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, bool]:
+    def _carry_target(self, frame: np.ndarray) -> Optional[Detections]:
         """
-        Process a single frame: detect birds and control PTZ
+        Move the target box with the inter-frame tracker
         
         Args:
             frame: Input frame (BGR format)
             
         Returns:
-            Tuple of (annotated_frame, tracking_active)
+            Detections holding the tracked box, or None if the target was lost
         """
+        bbox = self.interframe.update(frame)
+        if bbox is None:
+            return None
+        return Detections(bbox[None], [self.interframe.confidence],
+                          [self.target_class_id], self.last_detections.names)
+    
+    def _acquire_detections(self, frame: np.ndarray) -> Tuple[Detections, bool, bool]:
+        """
+        Get the detections for a frame from YOLO, the inter-frame tracker or the cache
+        
+        Args:
+            frame: Input frame (BGR format)
+            
+        Returns:
+            Tuple of (detections, inference_ran, fresh). ``fresh`` is False when
+            the previous detections were reused for a static scene; PTZ is only
+            driven by fresh detections.
+        """
+        # Between YOLO runs the inter-frame tracker carries the target box
+        if self.interframe.enabled and not self.interframe.needs_detection():
+            tracked = self._carry_target(frame)
+            if tracked is not None:
+                return tracked, False, True
+        
+        # Shedding detection: optical flow (if on) carries the target, otherwise the
+        # previous detections are reused without driving PTZ
+        if self.detect_every > 1 and self.frame_count % self.detect_every:
+            self.detections_shed += 1
+            tracked = self._carry_target(frame) if self.interframe.active else None
+            if tracked is not None:
+                return tracked, False, True
+            return self.last_detections, False, False
+        
+        # Detect birds (skipped when the motion gate sees a static scene;
+        # the previous detections are then still valid and are reused)
+        if not self.motion_gate.should_run(frame, has_target=bool(self.last_detections)):
+            return self.last_detections, False, False
+        
+        if self.tiled_detector.enabled:
+            detections = self.tiled_detector.detect(frame, focus=self.last_target_pos)
+        elif self.inference_queue is not None:
+            detections = self.inference_queue.submit(frame).result()
+        else:
+            detections = self.detector.detect(frame)
+        self.last_detections = detections
+        return detections, True, True
+    
+    def _select_target(self, frame: np.ndarray, detections: Detections,
+                       inference_ran: bool) -> Optional[Tuple[int, int]]:
+        """
+        Pick the bird to follow and return its center
+        
+        With multi-object tracking the locked track is kept across frames;
+        otherwise the largest detection is used (closest/most prominent bird).
+        
+        Args:
+            frame: Input frame (BGR format)
+            detections: Detections of the frame
+            inference_ran: Whether the detections come from YOLO on this frame
+            
+        Returns:
+            (target_x, target_y) or None
+        """
+        target_box = None
+        self.target_track_id = None
+        
+        if self.mot.enabled and (inference_ran or not self.interframe.active):
+            if inference_ran:
+                self.mot.update(detections, time.monotonic())
+            track = self.mot.select_target()
+            if track is not None:
+                target_box = track.xyxy
+                self.target_class_id = track.cls
+                self.target_track_id = track.track_id
+        else:
+            index = detections.largest_index()
+            if index >= 0:
+                target_box = detections.xyxy[index]
+                self.target_class_id = int(detections.cls[index])
+            if self.mot.enabled:
+                self.target_track_id = self.mot.locked_id
+        
+        # A new YOLO result restarts the inter-frame tracker on the chosen target
+        if inference_ran and self.interframe.enabled:
+            if self.interframe.early:
+                self.interframe.early_detections += 1
+            if target_box is not None:
+                self.interframe.start(frame, target_box)
+            else:
+                self.interframe.stop()
+        
+        self.target_box = target_box
+        if target_box is None:
+            return None
+        return (int((target_box[0] + target_box[2]) / 2), int((target_box[1] + target_box[3]) / 2))
+    
+    def track(self, frame: np.ndarray, timestamp: Optional[float] = None) -> TrackingResult:
+        """
+        Detect birds and control PTZ without drawing anything (headless fast path)
+        
+        The frame is neither copied nor modified.
+        
+        Args:
+            frame: Input frame (BGR format)
+            timestamp: Capture time of the frame (time.monotonic()); defaults to now
+            
+        Returns:
+            TrackingResult describing this frame, for render() or logging
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
         self.frame_count += 1
         frame_height, frame_width = frame.shape[:2]
         frame_center_x = frame_width // 2
         frame_center_y = frame_height // 2
         
-        # Detect birds
-        detections = self.detector.detect(frame)
+        detection_start = time.perf_counter()
+        with METRICS.time('detection'):
+            detections, inference_ran, fresh = self._acquire_detections(frame)
+        detection_time = time.perf_counter() - detection_start
+        if not inference_ran:
+            METRICS.inc('inference_skipped')
+        
+        tracking_active = False
+        aim = None
+        offset = None
+        
+        if detections and inference_ran:
+            self.detection_count += 1
+            if self.event_store is not None:
+                self.event_store.record_detections(self.camera_name, timestamp, self.frame_count, detections)
+        
+        with METRICS.time('target_selection'):
+            target = self._select_target(frame, detections, inference_ran)
+        
+        # Pick the input size for the next inference from target size and lag
+        if self.resolution.enabled and inference_ran:
+            size = self.resolution.update(self.target_box, frame.shape[:2],
+                                          time.monotonic() - timestamp, detection_time)
+            self.detector.set_input_size(size)
+        
+        if target is not None:
+            target_x, target_y = target
+            
+            # Calculate offset from center
+            offset_x = target_x - frame_center_x
+            offset_y = target_y - frame_center_y
+            offset = (offset_x, offset_y)
+            
+            # Apply smoothing
+            self.smoothed_offset_x = (self.smoothing_factor * self.smoothed_offset_x +
+                                     (1 - self.smoothing_factor) * offset_x)
+            self.smoothed_offset_y = (self.smoothing_factor * self.smoothed_offset_y +
+                                     (1 - self.smoothing_factor) * offset_y)
+            
+            # Predict where the target will be when the command takes effect
+            aim_x, aim_y = target_x, target_y
+            if self.predictor.enabled and fresh:
+                if self.target_track_id != self._predicted_track_id:
+                    self.predictor.reset()
+                    self._predicted_track_id = self.target_track_id
+                self.predictor.update(target_x, target_y, timestamp)
+                command_latency = self.ptz_controller.command_latency if self.ptz_enabled else 0.0
+                aim_x, aim_y = self.predictor.aim_point(time.monotonic(), command_latency)
+                aim = (aim_x, aim_y)
+            
+            # Control PTZ if enabled (only on fresh detections)
+            if self.ptz_enabled and fresh:
+                current_time = time.time()
+                if current_time - self.last_update_time >= self.update_interval:
+                    moved = self.ptz_controller.move_to_center_target(
+                        aim_x, aim_y,
+                        frame_center_x, frame_center_y
+                    )
+                    self.last_update_time = current_time
+                    if moved:
+                        self.tracking_count += 1
+                        tracking_active = True
+            
+            self.last_target_pos = (target_x, target_y)
+        
+        return TrackingResult(
+            timestamp=timestamp,
+            detections=detections,
+            target=target,
+            target_track_id=self.target_track_id if target is not None else None,
+            aim=aim,
+            offset=offset,
+            tracking_active=tracking_active,
+            frame_count=self.frame_count,
+            detection_count=self.detection_count,
+            ptz_moves=self.tracking_count,
+            ptz_status=self.ptz_controller.status if self.ptz_enabled else None,
+            ptz_status_stale=self.ptz_controller.status_stale if self.ptz_enabled else True
+        )
+    
+    def render(self, frame: np.ndarray, result: TrackingResult) -> np.ndarray:
+        """
+        Draw the overlays of a tracking result on a copy of the frame
+        
+        Only reads ``result`` and configuration, so it can run on a separate
+        render thread while track() processes the next frame.
+        
+        Args:
+            frame: Frame the result was computed on
+            result: Output of track() for that frame
+            
+        Returns:
+            Annotated frame
+        """
+        start = time.perf_counter()
+        frame_height, frame_width = frame.shape[:2]
+        frame_center_x = frame_width // 2
+        frame_center_y = frame_height // 2
         
         # Draw detections
-        annotated_frame = self.detector.draw_detections(frame, detections)
+        annotated_frame = self.detector.draw_detections(frame, result.detections)
         
         # Draw frame center
         cv2.line(annotated_frame, (frame_center_x - 20, frame_center_y),
@@ -96,73 +430,90 @@ class BirdTracker:
                           frame_center_y + self.ptz_controller.dead_zone_y),
                          dead_zone_color, 1)
         
-        tracking_active = False
-        
-        if detections:
-            self.detection_count += 1
+        if result.target is not None:
+            target_x, target_y = result.target
             
-            # Get largest detection (closest/most prominent bird)
-            target = self.detector.get_largest_detection(detections)
-            
-            if target:
-                target_x, target_y = self.detector.get_detection_center(target)
-                
-                # Calculate offset from center
-                offset_x = target_x - frame_center_x
-                offset_y = target_y - frame_center_y
-                
-                # Apply smoothing
-                self.smoothed_offset_x = (self.smoothing_factor * self.smoothed_offset_x +
-                                         (1 - self.smoothing_factor) * offset_x)
-                self.smoothed_offset_y = (self.smoothing_factor * self.smoothed_offset_y +
-                                         (1 - self.smoothing_factor) * offset_y)
-                
-                # Draw line from center to target
-                cv2.line(annotated_frame, (frame_center_x, frame_center_y),
-                        (target_x, target_y), (0, 255, 255), 2)
-                
-                # Display offset
-                offset_text = f"Offset: ({offset_x:+.0f}, {offset_y:+.0f})"
-                cv2.putText(annotated_frame, offset_text, (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                # Control PTZ if enabled
-                if self.ptz_enabled:
-                    current_time = time.time()
-                    if current_time - self.last_update_time >= self.update_interval:
-                        self.ptz_controller.move_to_center_target(
-                            target_x, target_y,
-                            frame_center_x, frame_center_y
-                        )
-                        self.last_update_time = current_time
-                        self.tracking_count += 1
-                        tracking_active = True
-                
-                self.last_target_pos = (target_x, target_y)
+            # Draw line from center to target
+            cv2.line(annotated_frame, (frame_center_x, frame_center_y),
+                    (target_x, target_y), (0, 255, 255), 2)
+            if result.target_track_id is not None:
+                cv2.putText(annotated_frame, f"ID {result.target_track_id}", (target_x + 8, target_y - 8),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+            
+            # Display offset
+            offset_x, offset_y = result.offset
+            offset_text = f"Offset: ({offset_x:+.0f}, {offset_y:+.0f})"
+            cv2.putText(annotated_frame, offset_text, (10, 30),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            
+            # Predicted aim point
+            if result.aim is not None:
+                cv2.circle(annotated_frame, result.aim, 6, (255, 0, 255), 2)
         
         # Display statistics
-        stats_text = f"Frame: {self.frame_count} | Detections: {self.detection_count}"
+        stats_text = f"Frame: {result.frame_count} | Detections: {result.detection_count}"
         cv2.putText(annotated_frame, stats_text, (10, frame_height - 40),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         if self.ptz_enabled:
-            ptz_text = f"PTZ Moves: {self.tracking_count}"
+            ptz_text = f"PTZ Moves: {result.ptz_moves}"
             cv2.putText(annotated_frame, ptz_text, (10, frame_height - 10),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            
+            # Cached camera position; red once the camera stopped answering GetStatus
+            status = result.ptz_status
+            if status is not None and status.pan is not None:
+                position_text = f"Pan {status.pan:+.3f} Tilt {status.tilt:+.3f}"
+                if status.zoom is not None:
+                    position_text += f" Zoom {status.zoom:.2f}"
+                if status.moving:
+                    position_text += " (moving)"
+            else:
+                position_text = "Position unknown"
+            if result.ptz_status_stale:
+                position_text += " [STALE]"
+            position_color = (0, 0, 255) if result.ptz_status_stale else (255, 255, 255)
+            cv2.putText(annotated_frame, position_text, (200, frame_height - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, position_color, 2)
         else:
             ptz_text = "PTZ: Disabled"
             cv2.putText(annotated_frame, ptz_text, (10, frame_height - 10),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        METRICS.observe('annotation', time.perf_counter() - start)
+        
+        return annotated_frame
+    
+    def process_frame(self, frame: np.ndarray,
+                      timestamp: Optional[float] = None) -> Tuple[np.ndarray, bool]:
+        """
+        Process a single frame: detect birds, control PTZ and draw overlays
         
-        return annotated_frame, tracking_active
+        Equivalent to track() followed by render(). Headless callers should
+        use track() directly.
+        
+        Args:
+            frame: Input frame (BGR format)
+            timestamp: Capture time of the frame (time.monotonic()); defaults to now
+            
+        Returns:
+            Tuple of (annotated_frame, tracking_active)
+        """
+        result = self.track(frame, timestamp)
+        return self.render(frame, result), result.tracking_active
     
     def reset_tracking(self):
         """
         Reset tracking state
         """
         self.last_target_pos = None
+        self.target_box = None
         self.smoothed_offset_x = 0
         self.smoothed_offset_y = 0
+        self.last_detections = Detections.empty()
+        self.motion_gate.reset()
+        self.interframe.stop()
+        self.mot.reset()
+        self.predictor.reset()
         logger.info("Tracking state reset")
     
     def go_home(self):
@@ -179,6 +530,26 @@ class BirdTracker:
         if self.ptz_enabled:
             self.ptz_controller.stop()
     
+    def close(self):
+        """
+        Stop the camera and release background PTZ resources
+        
+        Active tracks are queued to the event store as finished.
+        """
+        if self.event_store is not None:
+            self.mot.reset()
+        if self.ptz_enabled:
+            self.ptz_controller.close()
+    
+    def get_track_lifetimes(self) -> list:
+        """
+        Get lifetimes of finished and active tracks
+        
+        Returns:
+            List of track dictionaries
+        """
+        return self.mot.get_track_lifetimes()
+    
     def get_statistics(self) -> dict:
         """
         Get tracking statistics
@@ -190,5 +561,14 @@ class BirdTracker:
             'frames_processed': self.frame_count,
             'detections': self.detection_count,
             'ptz_moves': self.tracking_count,
-            'ptz_enabled': self.ptz_enabled
+            'ptz_enabled': self.ptz_enabled,
+            'detections_shed': self.detections_shed,
+            'motion_gate': self.motion_gate.get_statistics(),
+            'tiling': self.tiled_detector.get_statistics(),
+            'hybrid': self.interframe.get_statistics(),
+            'mot': self.mot.get_statistics(),
+            'predictive': self.predictor.get_statistics(),
+            'startup': self.init_times,
+            'preprocess': self.detector.get_preprocess_stats(),
+            'resolution': self.resolution.get_statistics()
         }
@@ -0,0 +1,255 @@
+"""
+Event Clip Recorder
+Writes a clip per bird event, including pre-roll from a memory-capped ring buffer of compressed frames
+"""
+
+import cv2
+import numpy as np
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from .metrics import METRICS
+from .video_recorder import VideoRecorder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ClipRecorder:
+    """
+    Event-triggered recording with pre-roll
+    
+    Every frame handed to update() is downscaled and JPEG-compressed into a
+    ring buffer capped at ``max_buffer_mb`` and ``pre_roll`` seconds. When a
+    bird becomes active, a clip is opened, the buffered pre-roll is written
+    first, and recording continues until no bird has been active for
+    ``post_roll`` seconds. Compression and encoding run on a worker thread
+    fed by a small drop-oldest queue, so update() never stalls the caller.
+    
+    update() is called once per tracked frame, which can be fewer than the
+    source delivers, so a clip is written at the rate frames actually
+    reached the ring buffer rather than at the source fps.
+    """
+    
+    def __init__(self, config: dict, fps: float, name: str = 'bird'):
+        """
+        Initialize the clip recorder
+        
+        Args:
+            config: Configuration dictionary containing video.clips settings
+            fps: Frame rate of the source (upper bound of the clip frame rate)
+            name: Prefix of the clip file names (e.g. the camera name)
+        """
+        self.clips_config = config.get('video', {}).get('clips', {})
+        
+        self.enabled = self.clips_config.get('enabled', False)
+        self.output_dir = Path(self.clips_config.get('output_dir', 'clips'))
+        self.pre_roll = self.clips_config.get('pre_roll', 3.0)
+        self.post_roll = self.clips_config.get('post_roll', 5.0)
+        self.max_clip_duration = self.clips_config.get('max_clip_duration', 300.0)
+        self.max_buffer_bytes = int(self.clips_config.get('max_buffer_mb', 64) * 1024 * 1024)
+        self.scale = self.clips_config.get('scale', 1.0)
+        self.jpeg_quality = self.clips_config.get('jpeg_quality', 85)
+        self.extension = self.clips_config.get('extension', '.mp4')
+        self.fps = fps
+        self.name = name
+        
+        # Clips use the video.recording encoder settings but must not lose pre-roll frames
+        self._recorder_config = {'video': {'recording': dict(config.get('video', {}).get('recording', {}),
+                                                             drop_policy='block')}}
+        
+        self._cond = threading.Condition()
+        self._incoming = deque(maxlen=max(2, int(fps)))  # (frame, timestamp, active)
+        self._running = False
+        self._thread = None
+        
+        self._ring = deque()  # (timestamp, jpeg bytes)
+        self._ring_bytes = 0
+        self._clip: Optional[VideoRecorder] = None
+        self._clip_path: Optional[Path] = None
+        self._clip_start = 0.0
+        self._clip_scale = self.scale
+        self._last_active = 0.0
+        self._frame_size = None
+        
+        # Statistics
+        self.clips_written = 0
+        self.frames_dropped = 0
+        self.frames_recorded = 0
+        
+        if self.enabled:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, name='ClipRecorder', daemon=True)
+            self._thread.start()
+    
+    @property
+    def recording(self) -> bool:
+        return self._clip is not None
+    
+    def update(self, frame: np.ndarray, timestamp: float, active: bool):
+        """
+        Hand over a frame and whether a bird is currently tracked (never blocks)
+        
+        Args:
+            frame: Raw frame (BGR format); must not be modified afterwards
+            timestamp: Capture time (time.monotonic())
+            active: True while a bird track is present
+        """
+        if not self._running:
+            return
+        with self._cond:
+            if len(self._incoming) == self._incoming.maxlen:
+                self.frames_dropped += 1
+                METRICS.inc('clip_frames_dropped')
+            self._incoming.append((frame, timestamp, active))
+            self._cond.notify()
+    
+    def _worker(self):
+        """
+        Worker loop: compress into the ring buffer and drive the clip state machine
+        """
+        while True:
+            with self._cond:
+                while self._running and not self._incoming:
+                    self._cond.wait()
+                if not self._incoming:
+                    break
+                frame, timestamp, active = self._incoming.popleft()
+            
+            try:
+                self._process(frame, timestamp, active)
+            except Exception as e:
+                logger.error(f"Clip recorder error: {e}")
+        self._finish_clip()
+    
+    def set_scale(self, scale: float):
+        """
+        Change the frame scale (load shedding); an open clip keeps its size
+        
+        Args:
+            scale: Downscale factor of buffered and recorded frames
+        """
+        self.scale = scale
+    
+    def _process(self, frame: np.ndarray, timestamp: float, active: bool):
+        scale = self._clip_scale if self._clip is not None else self.scale
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        self._frame_size = (frame.shape[1], frame.shape[0])
+        
+        if active:
+            self._last_active = timestamp
+            if self._clip is None:
+                self._start_clip(timestamp)
+        
+        if self._clip is not None:
+            self._clip.write(frame)
+            self.frames_recorded += 1
+            ended = timestamp - self._last_active > self.post_roll
+            too_long = timestamp - self._clip_start > self.max_clip_duration
+            if ended or too_long:
+                self._finish_clip()
+        
+        # Keep the pre-roll buffer filled even while recording, for the next event
+        with METRICS.time('clip_buffer'):
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if ok:
+            self._ring.append((timestamp, jpeg))
+            self._ring_bytes += jpeg.nbytes
+        while self._ring and (self._ring_bytes > self.max_buffer_bytes or
+                              timestamp - self._ring[0][0] > self.pre_roll):
+            _, old = self._ring.popleft()
+            self._ring_bytes -= old.nbytes
+        METRICS.set_gauge('clip_buffer_bytes', self._ring_bytes)
+    
+    def _arrival_fps(self) -> float:
+        """
+        Rate at which frames reached the ring buffer (source fps until it is measurable)
+        """
+        if len(self._ring) < 2:
+            return self.fps
+        span = self._ring[-1][0] - self._ring[0][0]
+        if span <= 0:
+            return self.fps
+        return min(self.fps, max(1.0, (len(self._ring) - 1) / span))
+    
+    def _clip_path_for(self) -> Path:
+        """
+        Unique clip file name (several events can start within one second)
+        """
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        path = self.output_dir / f"{self.name}_{stamp}{self.extension}"
+        index = 1
+        while path.exists():
+            path = self.output_dir / f"{self.name}_{stamp}_{index}{self.extension}"
+            index += 1
+        return path
+    
+    def _start_clip(self, timestamp: float):
+        """
+        Open a new clip and write the buffered pre-roll into it
+        """
+        self._clip_path = self._clip_path_for()
+        width, height = self._frame_size
+        # Frames arrive at the tracking rate; encoding them at the source fps would play fast
+        fps = self._arrival_fps()
+        self._clip = VideoRecorder(str(self._clip_path), width, height, fps, self._recorder_config)
+        self._clip_start = timestamp
+        self._clip_scale = self.scale
+        logger.info(f"Bird event: recording clip {self._clip_path} at {fps:.1f} fps")
+        
+        for _, jpeg in self._ring:
+            frame = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+            if (frame.shape[1], frame.shape[0]) != (width, height):
+                # Buffered before a scale change
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            self._clip.write(frame)
+            self.frames_recorded += 1
+    
+    def _finish_clip(self):
+        """
+        Close the current clip (waits for its encoder to drain)
+        """
+        if self._clip is None:
+            return
+        clip, self._clip = self._clip, None
+        clip.close()
+        self.clips_written += 1
+        METRICS.inc('clips_written')
+        logger.info(f"Clip finished: {self._clip_path} ({clip.frames_written} frames)")
+    
+    def close(self, timeout: float = 10.0):
+        """
+        Finish the current clip and stop the worker
+        
+        Args:
+            timeout: Seconds to wait for the worker to exit
+        """
+        if self._thread is None:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get clip recording statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'enabled': self.enabled,
+            'recording': self.recording,
+            'clips_written': self.clips_written,
+            'frames_recorded': self.frames_recorded,
+            'frames_dropped': self.frames_dropped,
+            'buffered_frames': len(self._ring),
+            'buffer_mb': self._ring_bytes / (1024.0 * 1024.0)
+        }
@@ -0,0 +1,158 @@
+"""
+Array-backed Detection Results
+Compact container for boxes, confidences and class IDs with vectorized queries
+"""
+
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Union
+
+
+class Detections:
+    """
+    Detections of one frame stored as contiguous NumPy arrays
+    
+    ``xyxy`` is an (N, 4) float32 array, ``conf`` an (N,) float32 array and
+    ``cls`` an (N,) int32 array. Iterating or indexing with an int yields the
+    legacy detection dictionaries (bbox, confidence, class_id, class_name),
+    so code written against ``List[dict]`` keeps working.
+    """
+    
+    __slots__ = ('xyxy', 'conf', 'cls', 'names')
+    
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray,
+                 names: Optional[Dict[int, str]] = None):
+        """
+        Initialize the container
+        
+        Args:
+            xyxy: (N, 4) boxes as [x1, y1, x2, y2]
+            conf: (N,) confidences
+            cls: (N,) class IDs
+            names: Mapping from class ID to class name
+        """
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.ascontiguousarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.ascontiguousarray(cls, dtype=np.int32).reshape(-1)
+        self.names = names or {}
+    
+    @classmethod
+    def empty(cls, names: Optional[Dict[int, str]] = None) -> 'Detections':
+        """
+        Create a container with no detections
+        """
+        return cls(np.empty((0, 4), np.float32), np.empty(0, np.float32),
+                   np.empty(0, np.int32), names)
+    
+    @classmethod
+    def from_dicts(cls, detections: List[dict]) -> 'Detections':
+        """
+        Build a container from legacy detection dictionaries
+        
+        Args:
+            detections: List of dicts with bbox, confidence, class_id, class_name
+        
+        Returns:
+            Equivalent Detections instance
+        """
+        if not detections:
+            return cls.empty()
+        names = {int(d['class_id']): d.get('class_name', str(d['class_id'])) for d in detections}
+        return cls(np.array([d['bbox'] for d in detections], np.float32),
+                   np.array([d['confidence'] for d in detections], np.float32),
+                   np.array([d['class_id'] for d in detections], np.int32),
+                   names)
+    
+    def __len__(self) -> int:
+        return len(self.conf)
+    
+    def __bool__(self) -> bool:
+        return len(self.conf) > 0
+    
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self.conf)):
+            yield self._as_dict(i)
+    
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[dict, 'Detections']:
+        """
+        Integer index -> legacy dict; slice, index array or boolean mask -> Detections
+        """
+        if isinstance(index, (int, np.integer)):
+            return self._as_dict(int(index))
+        return Detections(self.xyxy[index], self.conf[index], self.cls[index], self.names)
+    
+    def __repr__(self) -> str:
+        return f"Detections(n={len(self)})"
+    
+    def _as_dict(self, i: int) -> dict:
+        cls_id = int(self.cls[i])
+        return {
+            'bbox': self.xyxy[i].tolist(),
+            'confidence': float(self.conf[i]),
+            'class_id': cls_id,
+            'class_name': self.names.get(cls_id, str(cls_id))
+        }
+    
+    def to_dicts(self) -> List[dict]:
+        """
+        Get the legacy list-of-dicts view
+        """
+        return list(self)
+    
+    def areas(self) -> np.ndarray:
+        """
+        Box areas as an (N,) array
+        """
+        wh = self.xyxy[:, 2:] - self.xyxy[:, :2]
+        return wh[:, 0] * wh[:, 1]
+    
+    def centers(self) -> np.ndarray:
+        """
+        Box centers as an (N, 2) array of (x, y)
+        """
+        return (self.xyxy[:, :2] + self.xyxy[:, 2:]) * 0.5
+    
+    def largest_index(self) -> int:
+        """
+        Index of the box with the largest positive area, or -1 if there is none
+        """
+        if len(self.conf) == 0:
+            return -1
+        areas = self.areas()
+        index = int(np.argmax(areas))
+        return index if areas[index] > 0 else -1
+    
+    @staticmethod
+    def concatenate(parts: List['Detections']) -> 'Detections':
+        """
+        Join several containers into one
+        
+        Args:
+            parts: Containers to join
+        
+        Returns:
+            Combined Detections (names merged)
+        """
+        if not parts:
+            return Detections.empty()
+        names = {}
+        for part in parts:
+            names.update(part.names)
+        return Detections(np.concatenate([p.xyxy for p in parts]),
+                          np.concatenate([p.conf for p in parts]),
+                          np.concatenate([p.cls for p in parts]),
+                          names)
+
+
+def as_detections(detections: Union[Detections, List[dict], None]) -> Detections:
+    """
+    Accept either a Detections container or a legacy list of dicts
+    
+    Args:
+        detections: Detections, list of detection dicts, or None
+    
+    Returns:
+        Detections instance
+    """
+    if isinstance(detections, Detections):
+        return detections
+    return Detections.from_dicts(detections or [])
@@ -0,0 +1,379 @@
+"""
+Detection Event Store
+Persists detections and finished tracks to time-partitioned SQLite files from a background writer
+"""
+
+import numpy as np
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Partition file name format and length
+PARTITIONS = {
+    'day': ('%Y-%m-%d', timedelta(days=1)),
+    'hour': ('%Y-%m-%d_%H', timedelta(hours=1)),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    camera TEXT NOT NULL,
+    ts REAL NOT NULL,
+    frame INTEGER,
+    x1 REAL, y1 REAL, x2 REAL, y2 REAL,
+    conf REAL,
+    cls INTEGER
+);
+CREATE INDEX IF NOT EXISTS detections_camera_ts ON detections (camera, ts);
+CREATE INDEX IF NOT EXISTS detections_ts ON detections (ts);
+CREATE TABLE IF NOT EXISTS tracks (
+    camera TEXT NOT NULL,
+    track_id INTEGER,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    hits INTEGER,
+    cls INTEGER,
+    conf REAL,
+    x1 REAL, y1 REAL, x2 REAL, y2 REAL
+);
+CREATE INDEX IF NOT EXISTS tracks_camera_start ON tracks (camera, start_ts);
+CREATE INDEX IF NOT EXISTS tracks_start ON tracks (start_ts);
+"""
+
+TimeLike = Union[float, datetime]
+
+
+def _epoch(value: TimeLike) -> float:
+    """
+    Seconds since the epoch from a float or a (local, naive) datetime
+    """
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+class EventStore:
+    """
+    Buffered writer and query interface for detection and track events
+    
+    record_detections() and record_track() only put an item on a bounded
+    queue and never wait; when the queue is full the event is dropped and
+    counted. A writer thread drains the queue in batches of up to
+    ``batch_size`` events (or whatever arrived within ``flush_interval``
+    seconds) and inserts each batch in one transaction.
+    
+    Events go to one SQLite database per day (or hour) in WAL mode, so
+    queries can read while the writer appends, and a time-range query
+    only opens the partitions it overlaps. Both tables are indexed by
+    (camera, time) and by time.
+    
+    Timestamps are wall-clock seconds since the epoch; monotonic capture
+    times from the tracker are converted with the offset taken at startup.
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the store and start the writer thread (if enabled)
+        
+        Args:
+            config: Configuration dictionary containing events settings
+        """
+        self.events_config = config.get('events', {})
+        
+        self.enabled = self.events_config.get('enabled', False)
+        self.directory = Path(self.events_config.get('directory', 'events'))
+        # Camera name used in single-camera mode (multi-camera uses the camera names)
+        self.camera = self.events_config.get('camera', 'default')
+        self.partition = self.events_config.get('partition', 'day')
+        if self.partition not in PARTITIONS:
+            raise ValueError(f"Unknown partition '{self.partition}', expected one of {tuple(PARTITIONS)}")
+        self.partition_format, self.partition_length = PARTITIONS[self.partition]
+        self.batch_size = max(1, int(self.events_config.get('batch_size', 500)))
+        self.flush_interval = self.events_config.get('flush_interval', 1.0)
+        self.min_confidence = self.events_config.get('min_confidence', 0.0)
+        queue_size = max(1, int(self.events_config.get('queue_size', 10000)))
+        
+        # time.time() - time.monotonic(), to store capture times as wall-clock times
+        self._clock_offset = time.time() - time.monotonic()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._thread = None
+        
+        # Statistics
+        self.events_queued = 0
+        self.events_dropped = 0
+        self.events_written = 0
+        self.batches_written = 0
+        self.write_errors = 0
+        
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._worker, name='EventStore', daemon=True)
+            self._thread.start()
+    
+    def wall_time(self, monotonic_time: float) -> float:
+        """
+        Convert a time.monotonic() value to seconds since the epoch
+        """
+        return monotonic_time + self._clock_offset
+    
+    def _put(self, item: tuple) -> bool:
+        """
+        Queue an event without blocking
+        """
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.events_dropped += 1
+            METRICS.inc('events_dropped')
+            return False
+        self.events_queued += 1
+        return True
+    
+    def record_detections(self, camera: str, timestamp: float, frame_index: int, detections) -> bool:
+        """
+        Queue the detections of one frame
+        
+        Args:
+            camera: Camera name
+            timestamp: Capture time (time.monotonic())
+            frame_index: Frame number
+            detections: Detections container (its arrays must not be modified afterwards)
+        
+        Returns:
+            False if the event was dropped (store disabled or queue full)
+        """
+        if not self.enabled or not len(detections):
+            return False
+        return self._put(('detections', camera, self.wall_time(timestamp), frame_index,
+                          detections.xyxy, detections.conf, detections.cls))
+    
+    def record_track(self, camera: str, track: dict) -> bool:
+        """
+        Queue a finished track
+        
+        Args:
+            camera: Camera name
+            track: Track dictionary (MultiObjectTracker format, monotonic times)
+        
+        Returns:
+            False if the event was dropped (store disabled or queue full)
+        """
+        if not self.enabled:
+            return False
+        return self._put(('track', camera, track))
+    
+    def _partition_key(self, timestamp: float) -> str:
+        """
+        Partition name of a wall-clock time
+        """
+        return datetime.fromtimestamp(timestamp).strftime(self.partition_format)
+    
+    def _connection(self, key: str) -> sqlite3.Connection:
+        """
+        Writer connection of a partition, created with its schema on first use
+        """
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = sqlite3.connect(str(self.directory / f"{key}.db"))
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            # Only the newest partitions receive events; close older ones
+            while len(self._connections) >= 2:
+                oldest = min(self._connections)
+                self._connections.pop(oldest).close()
+            self._connections[key] = connection
+        return connection
+    
+    def _worker(self):
+        """
+        Writer loop: collect a batch, insert it, repeat until closed
+        """
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"Event store write failed ({len(batch)} events lost): {e}")
+            finally:
+                for _ in range(len(batch) + (0 if running else 1)):
+                    self._queue.task_done()
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+    
+    def _write(self, batch: List[tuple]):
+        """
+        Insert a batch of events, one transaction per partition
+        """
+        start = time.perf_counter()
+        detections: Dict[str, list] = {}
+        tracks: Dict[str, list] = {}
+        for item in batch:
+            if item[0] == 'detections':
+                _, camera, timestamp, frame_index, xyxy, conf, cls = item
+                keep = conf >= self.min_confidence
+                rows = detections.setdefault(self._partition_key(timestamp), [])
+                rows.extend((camera, timestamp, frame_index, *box, score, label) for box, score, label in zip(
+                    xyxy[keep].tolist(), conf[keep].tolist(), cls[keep].astype(np.int64).tolist()))
+            else:
+                _, camera, track = item
+                start_ts = self.wall_time(track['first_seen'])
+                tracks.setdefault(self._partition_key(start_ts), []).append((
+                    camera, track['track_id'], start_ts, self.wall_time(track['last_seen']),
+                    track.get('hits'), track.get('class_id'), track.get('confidence'), *track['bbox']))
+        
+        for key in sorted(set(detections) | set(tracks)):
+            connection = self._connection(key)
+            with connection:
+                if key in detections:
+                    connection.executemany('INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                           detections[key])
+                if key in tracks:
+                    connection.executemany('INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                           tracks[key])
+        self.events_written += len(batch)
+        self.batches_written += 1
+        METRICS.observe('event_write', time.perf_counter() - start)
+        METRICS.set_gauge('event_queue_depth', self._queue.qsize())
+    
+    def _partitions(self, start: float, end: float) -> List[Path]:
+        """
+        Partition files that may hold events between start and end
+        
+        The partition before ``start`` is included for tracks that began
+        earlier and were still active.
+        """
+        first = datetime.fromtimestamp(start) - self.partition_length
+        last = datetime.fromtimestamp(end)
+        paths = []
+        for path in sorted(self.directory.glob('*.db')):
+            try:
+                begin = datetime.strptime(path.stem, self.partition_format)
+            except ValueError:
+                continue
+            if first - self.partition_length < begin <= last:
+                paths.append(path)
+        return paths
+    
+    def _query(self, sql: str, params: tuple, start: float, end: float) -> List[dict]:
+        """
+        Run a query on every overlapping partition (read-only connections)
+        """
+        rows = []
+        for path in self._partitions(start, end):
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            connection.row_factory = sqlite3.Row
+            try:
+                rows.extend(dict(row) for row in connection.execute(sql, params))
+            finally:
+                connection.close()
+        return rows
+    
+    def query_tracks(self, start: TimeLike, end: TimeLike, camera: Optional[str] = None) -> List[dict]:
+        """
+        Tracks that were active at any time between start and end
+        
+        Args:
+            start: Range start (epoch seconds or local datetime)
+            end: Range end (epoch seconds or local datetime)
+            camera: Only this camera (optional)
+        
+        Returns:
+            Track dictionaries ordered by start time
+        """
+        start, end = _epoch(start), _epoch(end)
+        # Indexed range on start_ts; tracks spanning a partition boundary are
+        # covered by also reading the previous partition
+        sql = 'SELECT * FROM tracks WHERE start_ts < ? AND start_ts >= ? AND end_ts >= ?'
+        params = (end, start - self.partition_length.total_seconds(), start)
+        if camera is not None:
+            sql += ' AND camera = ?'
+            params += (camera,)
+        return sorted(self._query(sql, params, start, end), key=lambda row: row['start_ts'])
+    
+    def query_detections(self, start: TimeLike, end: TimeLike, camera: Optional[str] = None,
+                         min_confidence: Optional[float] = None, limit: Optional[int] = None) -> List[dict]:
+        """
+        Detections between start and end
+        
+        Args:
+            start: Range start (epoch seconds or local datetime)
+            end: Range end (epoch seconds or local datetime)
+            camera: Only this camera (optional)
+            min_confidence: Only detections at least this confident (optional)
+            limit: Most rows returned (optional)
+        
+        Returns:
+            Detection dictionaries ordered by time
+        """
+        start, end = _epoch(start), _epoch(end)
+        sql = 'SELECT * FROM detections WHERE ts >= ? AND ts < ?'
+        params = (start, end)
+        if camera is not None:
+            sql += ' AND camera = ?'
+            params += (camera,)
+        if min_confidence is not None:
+            sql += ' AND conf >= ?'
+            params += (min_confidence,)
+        rows = sorted(self._query(sql, params, start, end), key=lambda row: row['ts'])
+        return rows[:limit] if limit is not None else rows
+    
+    def flush(self):
+        """
+        Wait until every queued event has been written
+        """
+        if self._thread is not None:
+            self._queue.join()
+    
+    def close(self, timeout: float = 10.0):
+        """
+        Write the remaining events and stop the writer
+        
+        Args:
+            timeout: Seconds to wait for the writer to finish
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get event store statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'enabled': self.enabled,
+            'events_queued': self.events_queued,
+            'events_written': self.events_written,
+            'events_dropped': self.events_dropped,
+            'batches_written': self.batches_written,
+            'write_errors': self.write_errors,
+            'queue_depth': self._queue.qsize()
+        }
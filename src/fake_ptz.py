@@ -0,0 +1,148 @@
+"""
+Simulated PTZ Controller
+Stand-in for PTZController used by benchmarks and camera-less testing
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+from .ptz_executor import PTZExecutor
+from .ptz_status import PTZStatus, PTZStatusPoller
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FakePTZController:
+    """
+    PTZController look-alike that records commands instead of talking ONVIF
+    
+    Every ContinuousMove/Stop sleeps for ``simulated_latency`` seconds to
+    mimic a SOAP round-trip, and the commands go through the same
+    PTZExecutor as the real controller, so timing behaviour matches. The
+    position integrates the commanded velocity (one unit per second at
+    full speed) and is polled like a real camera.
+    """
+    
+    def __init__(self, config: dict, simulated_latency: float = 0.03):
+        """
+        Initialize the fake controller
+        
+        Args:
+            config: Configuration dictionary containing camera settings
+            simulated_latency: Seconds each command takes
+        """
+        self.ptz_config = config.get('camera', {}).get('ptz', {})
+        self.dead_zone_x = self.ptz_config.get('dead_zone_x', 50)
+        self.dead_zone_y = self.ptz_config.get('dead_zone_y', 50)
+        self.fixed_speed = max(0.0, min(1.0, int(self.ptz_config.get('fixed_speed_percent', 50)) / 100.0))
+        self.move_duration = self.ptz_config.get('move_duration', 0.2)
+        self.simulated_latency = simulated_latency
+        
+        self._lock = threading.Lock()
+        self.pan = 0.0
+        self.tilt = 0.0
+        self.velocity = (0.0, 0.0)
+        self._velocity_since = time.monotonic()
+        self.moves_sent = 0
+        self.stops_sent = 0
+        
+        self.executor = PTZExecutor(self._send_continuous_move, self._send_stop)
+        
+        self.status_poller = None
+        status_poll_config = self.ptz_config.get('status_poll', {})
+        if status_poll_config.get('enabled', True):
+            self.status_poller = PTZStatusPoller(
+                self.get_status,
+                interval=status_poll_config.get('interval', 0.5),
+                stale_after=status_poll_config.get('stale_after', 2.0)
+            )
+    
+    def _set_velocity(self, velocity: tuple):
+        # Caller holds self._lock
+        now = time.monotonic()
+        elapsed = now - self._velocity_since
+        self.pan += self.velocity[0] * elapsed
+        self.tilt += self.velocity[1] * elapsed
+        self.velocity = velocity
+        self._velocity_since = now
+    
+    def _send_continuous_move(self, pan_velocity: float, tilt_velocity: float):
+        time.sleep(self.simulated_latency)
+        with self._lock:
+            self._set_velocity((pan_velocity, tilt_velocity))
+            self.moves_sent += 1
+    
+    def _send_stop(self):
+        time.sleep(self.simulated_latency)
+        with self._lock:
+            self._set_velocity((0.0, 0.0))
+            self.stops_sent += 1
+    
+    @property
+    def command_latency(self) -> float:
+        return self.executor.command_latency
+    
+    def move_continuous(self, pan_velocity: float, tilt_velocity: float, duration: float = 0.5):
+        self.executor.submit_move(pan_velocity, tilt_velocity, duration)
+    
+    def stop(self):
+        self.executor.submit_stop()
+    
+    def move_to_center_target(self, target_x: int, target_y: int,
+                              frame_center_x: int, frame_center_y: int) -> bool:
+        """
+        Same dead-zone logic as PTZController.move_to_center_target
+        """
+        offset_x = target_x - frame_center_x
+        offset_y = target_y - frame_center_y
+        pan_velocity = 0.0
+        tilt_velocity = 0.0
+        if abs(offset_x) >= self.dead_zone_x:
+            pan_velocity = self.fixed_speed if offset_x > 0 else -self.fixed_speed
+        if abs(offset_y) >= self.dead_zone_y:
+            tilt_velocity = -self.fixed_speed if offset_y > 0 else self.fixed_speed
+        if pan_velocity == 0.0 and tilt_velocity == 0.0:
+            return False
+        self.executor.submit_move(pan_velocity, tilt_velocity, self.move_duration)
+        return True
+    
+    def go_home(self):
+        with self._lock:
+            self._set_velocity(self.velocity)
+            self.pan = self.tilt = 0.0
+    
+    def get_status(self) -> Optional[dict]:
+        with self._lock:
+            self._set_velocity(self.velocity)
+            return {'pan': self.pan, 'tilt': self.tilt, 'zoom': 0.0,
+                    'moving': self.velocity != (0.0, 0.0)}
+    
+    @property
+    def status(self) -> Optional[PTZStatus]:
+        return self.status_poller.get_snapshot() if self.status_poller is not None else None
+    
+    @property
+    def status_stale(self) -> bool:
+        return self.status_poller is None or self.status_poller.is_stale()
+    
+    def close(self):
+        if self.status_poller is not None:
+            self.status_poller.stop()
+            self.status_poller = None
+        self.stop()
+        self.executor.shutdown()
+    
+    def get_statistics(self) -> dict:
+        """
+        Get command statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        stats = dict(self.executor.get_statistics(), moves_applied=self.moves_sent,
+                     stops_applied=self.stops_sent)
+        if self.status_poller is not None:
+            stats['status_poll'] = self.status_poller.get_statistics()
+        return stats
@@ -0,0 +1,244 @@
+"""
+Threaded Video Capture Module
+Decodes frames on a background thread and keeps only the newest one
+"""
+
+import cv2
+import numpy as np
+import logging
+import threading
+import time
+from typing import NamedTuple, Optional, Union
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FramePacket(NamedTuple):
+    """
+    A decoded frame together with its capture metadata
+    """
+    frame: np.ndarray
+    timestamp: float  # time.monotonic() when the frame was read from the source
+    frame_id: int     # Sequence number of the frame since the grabber started
+
+
+class FrameGrabber:
+    """
+    Latest-frame-only video reader
+    
+    A dedicated thread keeps calling ``cap.read()`` so the decoder (and the
+    RTSP buffer behind it) never backs up while the caller is busy running
+    inference. Only the newest frame is retained; older unread frames are
+    counted as dropped.
+    """
+    
+    def __init__(self, source: Union[int, str], config: Optional[dict] = None):
+        """
+        Initialize the frame grabber
+        
+        Args:
+            source: Video source (camera index, file path or RTSP URL)
+            config: Configuration dictionary containing video settings
+        """
+        config = config or {}
+        self.capture_config = config.get('video', {}).get('capture', {})
+        
+        self.source = source
+        self.reconnect_delay = self.capture_config.get('reconnect_delay', 1.0)
+        self.max_read_failures = self.capture_config.get('max_read_failures', 30)
+        self.buffer_size = self.capture_config.get('buffer_size', 1)
+        self.pace_to_fps = self.capture_config.get('pace_to_fps', False)
+        
+        self.cap = None
+        self.width = 0
+        self.height = 0
+        self.fps = 0
+        self.frame_count = 0  # > 0 for seekable files, 0 for live streams
+        self.finished = False
+        
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._latest: Optional[FramePacket] = None
+        self._last_delivered_id = -1
+        self._running = False
+        self._thread = None
+        
+        # Statistics
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        
+        self._open()
+    
+    def _open(self):
+        """
+        Open the underlying cv2.VideoCapture and read its properties
+        """
+        logger.info(f"Opening video source: {self.source}")
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Failed to open video source: {self.source}")
+        
+        # Keep the driver-side queue as short as possible
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+        if self.fps <= 0:
+            self.fps = 30
+        self.frame_count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    
+    def _reconnect(self):
+        """
+        Release and reopen the video source after repeated read failures
+        """
+        METRICS.inc('reconnects')
+        logger.warning(f"Reconnecting to video source: {self.source}")
+        if self.cap is not None:
+            self.cap.release()
+        time.sleep(self.reconnect_delay)
+        try:
+            self._open()
+            self.reconnects += 1
+        except RuntimeError as e:
+            logger.error(f"Reconnect failed: {e}")
+    
+    def start(self) -> 'FrameGrabber':
+        """
+        Start the background capture thread
+        
+        Returns:
+            The grabber itself, for chaining
+        """
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop,
+                                        name='FrameGrabber', daemon=True)
+        self._thread.start()
+        return self
+    
+    def _capture_loop(self):
+        """
+        Background loop: read frames and publish the newest one
+        """
+        frame_id = 0
+        consecutive_failures = 0
+        frame_interval = 1.0 / self.fps
+        next_frame_time = time.monotonic()
+        
+        while self._running:
+            if self.pace_to_fps:
+                # Replay files at their own rate, like a live camera
+                delay = next_frame_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame_time = max(next_frame_time + frame_interval, time.monotonic() - frame_interval)
+            
+            read_start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                if self.frame_count > 0 and self.cap.get(cv2.CAP_PROP_POS_FRAMES) >= self.frame_count:
+                    logger.info(f"End of video file: {self.source}")
+                    with self._new_frame:
+                        self.finished = True
+                        self._running = False
+                        self._new_frame.notify_all()
+                    break
+                self.read_failures += 1
+                METRICS.inc('read_failures')
+                consecutive_failures += 1
+                if consecutive_failures >= self.max_read_failures:
+                    self._reconnect()
+                    consecutive_failures = 0
+                else:
+                    time.sleep(0.01)
+                continue
+            
+            METRICS.observe('decode', time.perf_counter() - read_start)
+            consecutive_failures = 0
+            packet = FramePacket(frame, time.monotonic(), frame_id)
+            frame_id += 1
+            
+            with self._new_frame:
+                # The previous frame was never handed out: it is dropped
+                if self._latest is not None and self._latest.frame_id != self._last_delivered_id:
+                    self.frames_dropped += 1
+                    METRICS.inc('frames_dropped')
+                self._latest = packet
+                self.frames_captured += 1
+                self._new_frame.notify_all()
+    
+    def get_latest(self) -> Optional[FramePacket]:
+        """
+        Get the newest frame without blocking
+        
+        Returns:
+            The newest FramePacket, or None if no frame has arrived since
+            the previous call
+        """
+        with self._lock:
+            return self._take_locked()
+    
+    def read(self, timeout: float = 1.0) -> Optional[FramePacket]:
+        """
+        Wait up to ``timeout`` seconds for a frame newer than the last one returned
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            The newest FramePacket, or None on timeout
+        """
+        with self._new_frame:
+            self._new_frame.wait_for(
+                lambda: (self._latest is not None and
+                         self._latest.frame_id != self._last_delivered_id) or not self._running,
+                timeout=timeout
+            )
+            return self._take_locked()
+    
+    def _take_locked(self) -> Optional[FramePacket]:
+        """
+        Hand out the latest frame if it has not been delivered yet (lock held)
+        """
+        packet = self._latest
+        if packet is None or packet.frame_id == self._last_delivered_id:
+            return None
+        self._last_delivered_id = packet.frame_id
+        self.frames_delivered += 1
+        return packet
+    
+    def stop(self):
+        """
+        Stop the capture thread and release the video source
+        """
+        self._running = False
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get capture statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_delivered': self.frames_delivered,
+            'frames_dropped': self.frames_dropped,
+            'read_failures': self.read_failures,
+            'reconnects': self.reconnects
+        }
@@ -0,0 +1,161 @@
+"""
+Off-Thread Frame Rendering
+Draws tracking overlays on a worker thread for display, recording and preview consumers
+"""
+
+import cv2
+import numpy as np
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def draw_fps(frame: np.ndarray, fps: float) -> np.ndarray:
+    """
+    Draw the loop rate in the top-right corner (in place)
+    """
+    cv2.putText(frame, f"FPS: {fps:.1f}", (frame.shape[1] - 150, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    return frame
+
+
+class RenderWorker:
+    """
+    Latest-only render stage running beside the tracking loop
+    
+    The tracking loop hands over (frame, result) pairs with submit(), which
+    never blocks. The worker renders the newest pair; pairs overwritten
+    before they were rendered are counted as skipped, so a slow display can
+    never hold back tracking. Rendered frames are passed to the
+    registered consumers (on the worker thread) and kept for get_latest().
+    """
+    
+    def __init__(self, render_fn: Callable[[np.ndarray, Any], np.ndarray]):
+        """
+        Initialize the render worker
+        
+        Args:
+            render_fn: Function (frame, result) -> annotated frame, e.g. BirdTracker.render
+        """
+        self.render_fn = render_fn
+        self.consumers: List[Callable[[np.ndarray], None]] = []
+        
+        self._cond = threading.Condition()
+        self._pending: Optional[tuple] = None
+        self._latest: Optional[np.ndarray] = None
+        self._latest_id = 0
+        self._delivered_id = 0
+        self._running = True
+        
+        # Statistics
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        
+        self._thread = threading.Thread(target=self._worker, name='RenderWorker', daemon=True)
+        self._thread.start()
+    
+    def add_consumer(self, consumer: Callable[[np.ndarray], None]):
+        """
+        Register a callback receiving every rendered frame
+        
+        Consumers only see the frames that were not skipped; a video file
+        should get every frame through VideoRecorder(render_fn=...) instead.
+        
+        Args:
+            consumer: Callable taking the annotated frame; runs on the render thread
+        """
+        self.consumers.append(consumer)
+    
+    def submit(self, frame: np.ndarray, result: Any, fps: Optional[float] = None):
+        """
+        Queue a frame for rendering, replacing one that was not rendered yet
+        
+        The frame must not be modified by the caller afterwards.
+        
+        Args:
+            frame: Frame the result was computed on
+            result: Tracking result passed to render_fn
+            fps: Loop rate drawn in the top-right corner (optional)
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.frames_skipped += 1
+                METRICS.inc('render_skipped')
+            self._pending = (frame, result, fps)
+            self.frames_submitted += 1
+            self._cond.notify()
+    
+    def _worker(self):
+        """
+        Worker loop: render the newest pending frame and hand it to consumers
+        """
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                frame, result, fps = self._pending
+                self._pending = None
+            
+            try:
+                annotated = self.render_fn(frame, result)
+                if fps is not None:
+                    draw_fps(annotated, fps)
+            except Exception as e:
+                logger.error(f"Render error: {e}")
+                continue
+            
+            for consumer in self.consumers:
+                try:
+                    consumer(annotated)
+                except Exception as e:
+                    logger.error(f"Render consumer error: {e}")
+            
+            with self._cond:
+                self._latest = annotated
+                self._latest_id += 1
+                self.frames_rendered += 1
+    
+    def get_latest(self) -> Optional[np.ndarray]:
+        """
+        Get the newest rendered frame if it has not been returned before
+        
+        Returns:
+            Annotated frame, or None if nothing new was rendered
+        """
+        with self._cond:
+            if self._latest_id == self._delivered_id:
+                return None
+            self._delivered_id = self._latest_id
+            return self._latest
+    
+    def close(self, timeout: float = 2.0):
+        """
+        Render the pending frame (if any) and stop the worker
+        
+        Args:
+            timeout: Seconds to wait for the worker to exit
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get render statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'frames_submitted': self.frames_submitted,
+            'frames_rendered': self.frames_rendered,
+            'frames_skipped': self.frames_skipped
+        }
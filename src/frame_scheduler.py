@@ -0,0 +1,240 @@
+"""
+Deadline-Aware Frame Scheduler
+Tracks per-stage time against a per-frame latency budget and sheds optional work in a fixed order
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Optional work, in the order it is given up (level 1, 2, 3)
+SHED_ORDER = ('annotation', 'recording', 'detection')
+
+
+class FrameScheduler:
+    """
+    Per-frame deadline bookkeeping and load shedding
+    
+    Each frame's latency (capture to fully handled) is compared with the
+    budget; frames over it count as deadline misses. The shed level rises
+    by one when the smoothed latency stays over budget for
+    ``escalate_after`` frames, and falls by one when it stays under
+    ``budget * recover_ratio`` for ``recover_after`` frames. Levels are
+    cumulative:
+    
+    1. annotation - display overlays are rendered only every ``annotation_stride``
+       frames (the ``--save-video`` recording still gets every frame)
+    2. recording - event clips are recorded at ``recording_scale``, and the
+       ``--save-video`` recording renders only every ``recording_stride``
+       frames (the others repeat the previous frame)
+    3. detection - YOLO runs only every ``detect_stride`` frames
+    
+    Work that is not running (``idle``, e.g. nothing is recorded) has no
+    level, so the scheduler never climbs through a level that sheds nothing.
+    PTZ commands are never shed, so the control loop keeps its rate while
+    the optional work makes room for it.
+    
+    Disabled by default: the default budget (two frame intervals) is far
+    below the inference time of the NPU models, so it would shed on every
+    run. Either way the first sustained overrun is logged once with the
+    measured latency as a hint for ``budget``; later level changes are only
+    logged at debug level and counted in the statistics.
+    """
+    
+    def __init__(self, config: dict, fps: Optional[float] = None, idle: Iterable[str] = ()):
+        """
+        Initialize the scheduler
+        
+        Args:
+            config: Configuration dictionary containing scheduler settings
+            fps: Source frame rate; the default budget is two frame intervals
+                (one for capture, one for processing)
+            idle: Names from SHED_ORDER with nothing to shed (their level is skipped)
+        """
+        self.scheduler_config = config.get('scheduler', {})
+        
+        self.enabled = self.scheduler_config.get('enabled', False)
+        budget = self.scheduler_config.get('budget')
+        if budget is None:
+            budget = 2.0 / fps if fps and fps > 0 else 0.2
+        self.budget = float(budget)
+        self.recover_ratio = self.scheduler_config.get('recover_ratio', 0.7)
+        self.escalate_after = max(1, int(self.scheduler_config.get('escalate_after', 15)))
+        self.recover_after = max(1, int(self.scheduler_config.get('recover_after', 60)))
+        max_level = int(self.scheduler_config.get('max_level', len(SHED_ORDER)))
+        # Work given up at level 1, 2, ...
+        self.levels = tuple(name for name in SHED_ORDER[:max_level] if name not in set(idle))
+        self.max_level = len(self.levels)
+        self.annotation_stride = max(1, int(self.scheduler_config.get('annotation_stride', 5)))
+        self.recording_scale = self.scheduler_config.get('recording_scale', 0.5)
+        self.recording_stride = max(1, int(self.scheduler_config.get('recording_stride', 2)))
+        self.detect_stride = max(1, int(self.scheduler_config.get('detect_stride', 2)))
+        self.smoothing = self.scheduler_config.get('smoothing', 0.1)
+        
+        self.level = 0
+        self.latency = 0.0      # EMA of frame latency, seconds
+        self._over = 0
+        self._under = 0
+        self._hinted = False
+        self.stage_times: Dict[str, float] = {}     # EMA per stage, seconds
+        
+        # Statistics
+        self.frames = 0
+        self.deadline_misses = 0
+        self.worst_latency = 0.0
+        self.level_changes = 0
+        self.frames_at_level = [0] * (len(SHED_ORDER) + 1)
+    
+    @property
+    def shedding(self) -> tuple:
+        """
+        Names of the work currently shed
+        """
+        return self.levels[:self.level]
+    
+    @property
+    def annotate_every(self) -> int:
+        """
+        Render overlays for every n-th frame
+        """
+        return self.annotation_stride if 'annotation' in self.shedding else 1
+    
+    @property
+    def clip_scale(self) -> float:
+        """
+        Factor applied to the configured event clip scale
+        """
+        return self.recording_scale if 'recording' in self.shedding else 1.0
+    
+    @property
+    def record_every(self) -> int:
+        """
+        Render the --save-video recording for every n-th frame
+        """
+        return self.recording_stride if 'recording' in self.shedding else 1
+    
+    @property
+    def detect_every(self) -> int:
+        """
+        Run YOLO on every n-th frame
+        """
+        return self.detect_stride if 'detection' in self.shedding else 1
+    
+    def should_annotate(self) -> bool:
+        """
+        Whether the current frame should be handed to the renderer
+        """
+        return self.frames % self.annotate_every == 0
+    
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time the enclosed block as stage ``name`` (also recorded in METRICS)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            METRICS.observe(name, elapsed)
+            previous = self.stage_times.get(name)
+            self.stage_times[name] = elapsed if previous is None else (
+                previous + self.smoothing * (elapsed - previous))
+    
+    def end_frame(self, timestamp: float) -> bool:
+        """
+        Account the finished frame against the deadline and adjust the shed level
+        
+        Args:
+            timestamp: Capture time of the frame (time.monotonic())
+        
+        Returns:
+            True if the shed level changed
+        """
+        latency = time.monotonic() - timestamp
+        self.frames_at_level[self.level] += 1
+        self.frames += 1
+        self.worst_latency = max(self.worst_latency, latency)
+        if latency > self.budget:
+            self.deadline_misses += 1
+            METRICS.inc('deadline_misses')
+        self.latency = latency if self.frames == 1 else self.latency + self.smoothing * (latency - self.latency)
+        METRICS.set_gauge('frame_latency', self.latency)
+        
+        if self.latency > self.budget:
+            self._over += 1
+            self._under = 0
+        elif self.latency < self.budget * self.recover_ratio:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+        
+        if not self.enabled:
+            if self._over >= self.escalate_after:
+                self._hint("scheduler is disabled, nothing is shed")
+            return False
+        
+        if self._over >= self.escalate_after and self.level < self.max_level:
+            self._set_level(self.level + 1)
+            return True
+        if self._under >= self.recover_after and self.level > 0:
+            self._set_level(self.level - 1)
+            return True
+        return False
+    
+    def _set_level(self, level: int):
+        """
+        Change the shed level and reset the hysteresis counters
+        """
+        raising = level > self.level
+        work = self.levels[max(level, self.level) - 1]
+        self.level = level
+        self._over = self._under = 0
+        self.level_changes += 1
+        METRICS.set_gauge('shed_level', level)
+        stages = ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.stage_times.items())
+        if raising:
+            self._hint(f"shedding {work}")
+            logger.debug(f"Behind deadline ({self.latency * 1000:.0f}ms > {self.budget * 1000:.0f}ms): "
+                         f"shedding {work} [{stages}]")
+        else:
+            logger.debug(f"Back within deadline ({self.latency * 1000:.0f}ms): restoring {work}")
+    
+    def _hint(self, action: str):
+        """
+        Log the first sustained overrun once, with the measured latency as a budget hint
+        """
+        if self._hinted:
+            return
+        self._hinted = True
+        stages = ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.stage_times.items())
+        logger.warning(f"Frames take {self.latency * 1000:.0f}ms, over the {self.budget * 1000:.0f}ms budget "
+                       f"({action}){f' [{stages}]' if stages else ''}; if this is the normal speed of the model, "
+                       f"set scheduler.budget to about {self.latency * 1.2:.2f}s")
+    
+    def get_statistics(self) -> dict:
+        """
+        Get scheduling statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'budget_ms': self.budget * 1000.0,
+            'frames': self.frames,
+            'deadline_misses': self.deadline_misses,
+            'miss_ratio': self.deadline_misses / self.frames if self.frames else 0.0,
+            'latency_ms': self.latency * 1000.0,
+            'worst_latency_ms': self.worst_latency * 1000.0,
+            'level': self.level,
+            'shedding': list(self.shedding),
+            'level_changes': self.level_changes,
+            'frames_at_level': list(self.frames_at_level),
+            'stage_ms': {name: seconds * 1000.0 for name, seconds in self.stage_times.items()}
+        }
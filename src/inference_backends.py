@@ -0,0 +1,264 @@
+"""
+Inference Backend Selection
+Exports YOLO11 weights to ONNX Runtime / OpenVINO / TorchScript and caches the artifacts
+"""
+
+import numpy as np
+import hashlib
+import json
+import logging
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backend name -> Ultralytics export format (None = run the .pt weights directly)
+BACKENDS = {
+    'pytorch': None,
+    'onnx': 'onnx',
+    'openvino': 'openvino',
+    'torchscript': 'torchscript',
+}
+
+# SHA-256 of weights files already hashed by this process, by (path, size, mtime)
+_WEIGHTS_HASHES: Dict[Tuple[str, int, int], str] = {}
+# File in the export cache that keeps those hashes across runs
+HASH_INDEX = 'weights_hashes.json'
+
+
+def resolve_weights(model_path: str) -> str:
+    """
+    Local path of the weights, letting Ultralytics fetch official ones (e.g. yolo11n.pt)
+    
+    Args:
+        model_path: Path or Ultralytics asset name of the .pt weights
+    
+    Returns:
+        Path of the local file, or model_path unchanged if it cannot be obtained
+    """
+    if Path(model_path).is_file():
+        return model_path
+    try:
+        from ultralytics.utils.downloads import attempt_download_asset
+        resolved = attempt_download_asset(model_path)
+    except Exception as e:
+        logger.warning(f"Could not fetch weights {model_path}: {e}")
+        return model_path
+    return resolved if Path(resolved).is_file() else model_path
+
+
+def weights_hash(model_path: str, length: int = 12, cache_dir: Optional[str] = None) -> str:
+    """
+    Hash the weights file so exported artifacts are invalidated when it changes
+    
+    The digest is remembered by (path, size, mtime): in this process, and in
+    ``HASH_INDEX`` inside ``cache_dir`` across runs, so an unchanged file is
+    only read once. If the file is not available, the name and the
+    Ultralytics version are hashed instead, so the export is still built
+    and cached.
+    
+    Args:
+        model_path: Path to the .pt weights
+        length: Number of hex digits to keep
+        cache_dir: Export cache directory holding the hash index (optional)
+    
+    Returns:
+        Truncated SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    if not Path(model_path).is_file():
+        try:
+            import ultralytics
+            version = ultralytics.__version__
+        except ImportError:
+            version = 'unknown'
+        logger.warning(f"Weights file {model_path} not found; caching exports by name and "
+                       f"Ultralytics {version} instead of content")
+        digest.update(f"{Path(model_path).name}-ultralytics-{version}".encode())
+        return digest.hexdigest()[:length]
+    
+    path = Path(model_path).resolve()
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    hexdigest = _WEIGHTS_HASHES.get(key)
+    index_path = Path(cache_dir) / HASH_INDEX if cache_dir else None
+    index = {}
+    if hexdigest is None and index_path is not None and index_path.is_file():
+        try:
+            index = json.loads(index_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable weights hash index {index_path}: {e}")
+        entry = index.get(key[0], {})
+        if entry.get('size') == key[1] and entry.get('mtime_ns') == key[2]:
+            hexdigest = entry.get('sha256')
+    
+    if hexdigest is None:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        hexdigest = digest.hexdigest()
+        if index_path is not None:
+            index[key[0]] = {'size': key[1], 'mtime_ns': key[2], 'sha256': hexdigest}
+            try:
+                index_path.parent.mkdir(parents=True, exist_ok=True)
+                index_path.write_text(json.dumps(index, indent=1))
+            except OSError as e:
+                logger.warning(f"Could not update weights hash index {index_path}: {e}")
+    _WEIGHTS_HASHES[key] = hexdigest
+    return hexdigest[:length]
+
+
+def cached_artifact_path(model_path: str, backend: str, img_size: int, opset: int,
+                         dynamic: bool, cache_dir: str, precision: str = 'fp32') -> Path:
+    """
+    Path of the cached export for the given weights and export settings
+    
+    Args:
+        model_path: Local path of the .pt weights (already passed through resolve_weights)
+        backend: Backend name (key of BACKENDS)
+        img_size: Export input size
+        opset: ONNX opset
+        dynamic: Whether the export has dynamic batch/shape axes
+        cache_dir: Cache directory
+        precision: "fp32" for plain exports, "int8" for quantized artifacts
+    
+    Returns:
+        Artifact path (a file, or a directory for OpenVINO)
+    """
+    stem = Path(model_path).stem
+    key = f"{stem}-{weights_hash(model_path, cache_dir=cache_dir)}-{img_size}"
+    if backend == 'onnx':
+        key += f"-op{opset}"
+    if dynamic:
+        key += "-dyn"
+    if precision != 'fp32':
+        key += f"-{precision}"
+    suffix = {'onnx': '.onnx', 'openvino': '_openvino_model', 'torchscript': '.torchscript'}[backend]
+    return Path(cache_dir) / f"{key}{suffix}"
+
+
+def resolve_model_path(model_path: str, backend: str, img_size: int = 640, opset: int = 12,
+                       dynamic: bool = False, cache_dir: str = '.model_cache') -> str:
+    """
+    Get a loadable model path for the backend, exporting on first use
+    
+    Args:
+        model_path: Path to the .pt weights
+        backend: Backend name (key of BACKENDS)
+        img_size: Export input size
+        opset: ONNX opset
+        dynamic: Export with dynamic axes (needed for batched inference)
+        cache_dir: Directory holding exported artifacts
+    
+    Returns:
+        Path to pass to ``YOLO()``
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {list(BACKENDS)}")
+    if BACKENDS[backend] is None:
+        return model_path
+    
+    # Official weights are downloaded on first use; hash and export the local file
+    model_path = resolve_weights(model_path)
+    artifact = cached_artifact_path(model_path, backend, img_size, opset, dynamic, cache_dir)
+    if artifact.exists():
+        logger.info(f"Using cached {backend} model: {artifact}")
+        return str(artifact)
+    
+    from ultralytics import YOLO
+    
+    logger.info(f"Exporting {model_path} to {backend} (img_size={img_size}); this runs once")
+    export_args = {'format': BACKENDS[backend], 'imgsz': img_size}
+    if backend == 'onnx':
+        export_args['opset'] = opset
+    if dynamic and backend in ('onnx', 'openvino'):
+        export_args['dynamic'] = True
+    
+    start = time.perf_counter()
+    exported = Path(YOLO(model_path).export(**export_args))
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(exported), str(artifact))
+    logger.info(f"Export finished in {time.perf_counter() - start:.1f}s, cached at {artifact}")
+    return str(artifact)
+
+
+class LatencyStats:
+    """
+    Rolling window of inference latencies
+    """
+    
+    def __init__(self, window: Optional[int] = 300):
+        """
+        Initialize the window
+        
+        Args:
+            window: Number of most recent samples kept (None keeps all)
+        """
+        self.samples = deque(maxlen=window)
+        self.count = 0
+    
+    def record(self, seconds: float):
+        """
+        Add one latency sample in seconds
+        """
+        self.samples.append(seconds * 1000.0)
+        self.count += 1
+    
+    def summary(self) -> dict:
+        """
+        Summarize the window
+        
+        Returns:
+            Dictionary with count, mean_ms, p50_ms, p95_ms and p99_ms
+        """
+        if not self.samples:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0}
+        values = np.fromiter(self.samples, dtype=np.float64)
+        return {
+            'count': self.count,
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99)),
+        }
+
+
+def benchmark_backends(config: dict, backends: Optional[List[str]] = None,
+                       runs: int = 50, warmup: int = 5) -> Dict[str, dict]:
+    """
+    Measure detection latency of each backend on dummy frames
+    
+    Args:
+        config: Configuration dictionary (``yolo`` block is used)
+        backends: Backends to compare (defaults to all)
+        runs: Timed detections per backend
+        warmup: Untimed detections run first
+    
+    Returns:
+        Mapping backend -> latency summary (or {'error': message})
+    """
+    from .bird_detector import BirdDetector
+    
+    img_size = config.get('yolo', {}).get('img_size', 640)
+    frame = np.zeros((img_size, img_size, 3), dtype=np.uint8)
+    report = {}
+    for backend in backends or list(BACKENDS):
+        backend_config = dict(config)
+        backend_config['yolo'] = dict(config.get('yolo', {}), backend=backend, backend_fallback=False)
+        try:
+            detector = BirdDetector(backend_config)
+        except Exception as e:
+            logger.warning(f"Backend {backend} unavailable: {e}")
+            report[backend] = {'error': str(e)}
+            continue
+        for _ in range(warmup):
+            detector.detect(frame)
+        detector.latency = LatencyStats(window=runs)
+        for _ in range(runs):
+            detector.detect(frame)
+        report[backend] = detector.get_latency_stats()
+    return report
@@ -0,0 +1,213 @@
+"""
+Inter-Frame Box Tracker
+Carries the target box between YOLO runs with pyramidal Lucas-Kanade optical flow
+"""
+
+import cv2
+import numpy as np
+import logging
+from typing import List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InterFrameTracker:
+    """
+    Detect-every-N helper
+    
+    After a detection, feature points inside the target box are followed
+    with optical flow on a downscaled grayscale frame, and the box is moved
+    by their median displacement. YOLO is requested again after
+    ``detect_interval`` frames, or earlier when too few points survive the
+    forward-backward check. The interval shrinks when the target moves fast
+    and grows when it is slow.
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the inter-frame tracker
+        
+        Args:
+            config: Configuration dictionary containing tracking settings
+        """
+        self.hybrid_config = config.get('tracking', {}).get('hybrid', {})
+        
+        self.enabled = self.hybrid_config.get('enabled', False)
+        self.min_interval = max(1, self.hybrid_config.get('min_detect_interval', 1))
+        self.max_interval = max(self.min_interval, self.hybrid_config.get('max_detect_interval', 8))
+        self.slow_speed = self.hybrid_config.get('slow_speed', 2.0)  # px/frame at full resolution
+        self.fast_speed = self.hybrid_config.get('fast_speed', 20.0)
+        self.min_confidence = self.hybrid_config.get('min_confidence', 0.5)
+        self.track_width = self.hybrid_config.get('track_width', 640)
+        self.max_points = self.hybrid_config.get('max_points', 30)
+        self.fb_threshold = self.hybrid_config.get('fb_threshold', 1.0)  # px, forward-backward error
+        
+        self._lk_params = dict(winSize=(15, 15), maxLevel=2,
+                               criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        
+        self.bbox: Optional[np.ndarray] = None  # [x1, y1, x2, y2] at full resolution
+        self.confidence = 0.0
+        self.speed = 0.0
+        self.detect_interval = self.min_interval
+        self.frames_since_detection = 0
+        self._prev_gray: Optional[np.ndarray] = None
+        self._points: Optional[np.ndarray] = None
+        self._last_detected: Optional[np.ndarray] = None
+        self._scale = 1.0
+        
+        # Statistics
+        self.frames_tracked = 0
+        self.early_detections = 0
+    
+    @property
+    def active(self) -> bool:
+        return self.bbox is not None
+    
+    def _gray(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscaled grayscale copy of the frame used for flow
+        """
+        height, width = frame.shape[:2]
+        self._scale = min(1.0, self.track_width / float(width))
+        if self._scale < 1.0:
+            frame = cv2.resize(frame, (int(width * self._scale), int(height * self._scale)),
+                               interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    
+    def _seed_points(self, gray: np.ndarray, bbox: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Pick good features inside the box (falls back to a grid for textureless birds)
+        """
+        x1, y1, x2, y2 = (bbox * self._scale).astype(int)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, gray.shape[1] - 1), min(y2, gray.shape[0] - 1)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return None
+        
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=self.max_points, qualityLevel=0.01,
+                                         minDistance=2, mask=mask)
+        if points is None or len(points) < 4:
+            xs = np.linspace(x1, x2, 4)
+            ys = np.linspace(y1, y2, 4)
+            points = np.array([[[x, y]] for y in ys for x in xs], dtype=np.float32)
+        return points.astype(np.float32)
+    
+    def start(self, frame: np.ndarray, bbox: List[float]):
+        """
+        (Re)start tracking from a fresh detection
+        
+        Args:
+            frame: Frame the detection was made on
+            bbox: Detected box [x1, y1, x2, y2]
+        """
+        new_bbox = np.asarray(bbox, dtype=np.float32)
+        if self._last_detected is not None and self.frames_since_detection > 0:
+            # Speed from the detection-to-detection displacement
+            shift = ((new_bbox[:2] + new_bbox[2:]) - (self._last_detected[:2] + self._last_detected[2:])) * 0.5
+            self.speed = float(np.hypot(*shift)) / self.frames_since_detection
+        self._last_detected = new_bbox
+        
+        self._prev_gray = self._gray(frame)
+        self._points = self._seed_points(self._prev_gray, new_bbox)
+        self.bbox = new_bbox if self._points is not None else None
+        self.confidence = 1.0 if self.bbox is not None else 0.0
+        self.frames_since_detection = 0
+        self._adapt_interval()
+    
+    def _adapt_interval(self):
+        """
+        Map target speed to a detection interval: fast -> min_interval, slow -> max_interval
+        """
+        if self.fast_speed <= self.slow_speed:
+            self.detect_interval = self.min_interval
+            return
+        t = (self.speed - self.slow_speed) / (self.fast_speed - self.slow_speed)
+        t = min(1.0, max(0.0, t))
+        self.detect_interval = int(round(self.max_interval - t * (self.max_interval - self.min_interval)))
+    
+    def update(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Move the box to the new frame
+        
+        Args:
+            frame: New frame (BGR format)
+        
+        Returns:
+            Updated box [x1, y1, x2, y2], or None if the target was lost
+        """
+        if self.bbox is None:
+            return None
+        
+        gray = self._gray(frame)
+        self.frames_since_detection += 1
+        if gray.shape != self._prev_gray.shape:
+            self.stop()
+            return None
+        
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points,
+                                                           None, **self._lk_params)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, next_points,
+                                                               None, **self._lk_params)
+        fb_error = np.linalg.norm((self._points - back_points).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.fb_threshold)
+        
+        self.confidence = float(good.mean()) if len(good) else 0.0
+        if good.sum() < 2:
+            self.stop()
+            return None
+        
+        shift = np.median((next_points - self._points).reshape(-1, 2)[good], axis=0) / self._scale
+        self.bbox = self.bbox + np.array([shift[0], shift[1], shift[0], shift[1]], dtype=np.float32)
+        self.speed = 0.7 * self.speed + 0.3 * float(np.hypot(*shift))
+        self._adapt_interval()
+        
+        self._prev_gray = gray
+        self._points = next_points[good].reshape(-1, 1, 2)
+        self.frames_tracked += 1
+        return self.bbox
+    
+    @property
+    def early(self) -> bool:
+        """
+        Whether too few flow points survive, so YOLO is due before the interval elapsed
+        """
+        return self.enabled and self.bbox is not None and self.confidence < self.min_confidence
+    
+    def needs_detection(self) -> bool:
+        """
+        Whether YOLO should run on the next frame (no side effects; the caller
+        counts ``early_detections`` when an early detection actually runs)
+        
+        Returns:
+            True if tracking is off, the interval elapsed or confidence dropped
+        """
+        if not self.enabled or self.bbox is None or self.early:
+            return True
+        return self.frames_since_detection + 1 >= self.detect_interval
+    
+    def stop(self):
+        """
+        Drop the tracked box
+        """
+        self.bbox = None
+        self.confidence = 0.0
+        self._points = None
+        self._prev_gray = None
+        self._last_detected = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get inter-frame tracking statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'frames_tracked': self.frames_tracked,
+            'early_detections': self.early_detections,
+            'detect_interval': self.detect_interval,
+            'target_speed': self.speed
+        }
@@ -0,0 +1,288 @@
+"""
+Pipeline Metrics
+Per-stage latency histograms, counters and gauges with a Prometheus text endpoint and log summaries
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (0.5 ms .. 2.5 s)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (Prometheus semantics, non-cumulative storage)
+    """
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile by linear interpolation inside the bucket
+        
+        Args:
+            q: Quantile in [0, 1]
+        
+        Returns:
+            Value in seconds (0.0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store for stage timings, counters and gauges
+    
+    Recording costs a perf_counter call, a bisect and a short lock, so
+    stages can be timed on every frame.
+    """
+    
+    def __init__(self, prefix: str = 'bird'):
+        """
+        Initialize the registry
+        
+        Args:
+            prefix: Prefix of the exported metric names
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+    
+    def observe(self, stage: str, seconds: float):
+        """
+        Record one duration of a pipeline stage
+        
+        Args:
+            stage: Stage name (e.g. 'inference')
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def time(self, stage: str):
+        """
+        Time the enclosed block as ``stage``
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+    
+    def inc(self, name: str, amount: float = 1):
+        """
+        Increase a counter
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def set_gauge(self, name: str, value: float):
+        """
+        Set a gauge (e.g. a queue depth)
+        """
+        with self._lock:
+            self.gauges[name] = value
+    
+    def reset(self):
+        """
+        Drop all recorded values
+        """
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.gauges.clear()
+    
+    def snapshot(self) -> dict:
+        """
+        Get a summary of everything recorded so far
+        
+        Returns:
+            Dictionary with per-stage count/mean_ms/p50_ms/p95_ms/p99_ms,
+            counters and gauges
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'mean_ms': h.sum / h.count * 1000.0 if h.count else 0.0,
+                    'p50_ms': h.quantile(0.50) * 1000.0,
+                    'p95_ms': h.quantile(0.95) * 1000.0,
+                    'p99_ms': h.quantile(0.99) * 1000.0,
+                }
+                for stage, h in self.stages.items()
+            }
+            return {'stages': stages, 'counters': dict(self.counters), 'gauges': dict(self.gauges)}
+    
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+        
+        Returns:
+            Exposition text
+        """
+        p = self.prefix
+        lines = []
+        with self._lock:
+            if self.stages:
+                lines.append(f"# HELP {p}_stage_seconds Duration of each pipeline stage")
+                lines.append(f"# TYPE {p}_stage_seconds histogram")
+                for stage, h in sorted(self.stages.items()):
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                    lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                    lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {p}_{name} gauge")
+                lines.append(f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def summary_line(self) -> str:
+        """
+        One-line human-readable summary for periodic logging
+        
+        Returns:
+            Summary such as ``inference p50=21.3ms p95=30.1ms n=600 | ...``
+        """
+        snapshot = self.snapshot()
+        parts = [f"{stage} p50={s['p50_ms']:.1f}ms p95={s['p95_ms']:.1f}ms n={s['count']}"
+                 for stage, s in sorted(snapshot['stages'].items())]
+        parts += [f"{name}={value:g}" for name, value in sorted(snapshot['counters'].items())]
+        parts += [f"{name}={value:g}" for name, value in sorted(snapshot['gauges'].items())]
+        return " | ".join(parts) if parts else "no samples"
+
+
+# Process-wide registry used by all pipeline components
+METRICS = MetricsRegistry()
+
+
+class MetricsServer:
+    """
+    Exposes a registry on a local HTTP endpoint and logs periodic summaries
+    
+    ``GET /metrics`` returns the Prometheus text format. Both the HTTP
+    server and the log summaries run on daemon threads.
+    """
+    
+    def __init__(self, config: dict, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the metrics server
+        
+        Args:
+            config: Configuration dictionary containing metrics settings
+            registry: Registry to expose (defaults to the process-wide METRICS)
+        """
+        self.metrics_config = config.get('metrics', {})
+        self.registry = registry or METRICS
+        
+        self.http_enabled = self.metrics_config.get('http_enabled', False)
+        self.host = self.metrics_config.get('host', '127.0.0.1')
+        self.port = self.metrics_config.get('port', 9108)
+        self.log_interval = self.metrics_config.get('log_interval', 60)
+        
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop_event = threading.Event()
+        self._threads = []
+    
+    def _make_handler(self):
+        registry = self.registry
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the application log
+        
+        return Handler
+    
+    def start(self) -> 'MetricsServer':
+        """
+        Start the HTTP endpoint and the summary logger (as configured)
+        
+        Returns:
+            The server itself, for chaining
+        """
+        if self.http_enabled:
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+                self._server.daemon_threads = True
+                thread = threading.Thread(target=self._server.serve_forever, name='MetricsHTTP', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+                logger.info(f"Metrics endpoint: http://{self.host}:{self._server.server_address[1]}/metrics")
+            except OSError as e:
+                logger.error(f"Failed to start metrics endpoint on {self.host}:{self.port}: {e}")
+                self._server = None
+        
+        if self.log_interval and self.log_interval > 0:
+            thread = threading.Thread(target=self._log_loop, name='MetricsLog', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+    
+    def _log_loop(self):
+        while not self._stop_event.wait(self.log_interval):
+            logger.info(f"Stage timings: {self.registry.summary_line()}")
+    
+    def stop(self):
+        """
+        Stop the HTTP endpoint and the summary logger
+        """
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
@@ -0,0 +1,125 @@
+"""
+Motion Gate
+Skips YOLO inference on frames where nothing moved
+"""
+
+import cv2
+import numpy as np
+import logging
+import time
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MotionGate:
+    """
+    Cheap change detector run before inference
+    
+    Each frame is downscaled to a small grayscale image and compared with a
+    running-average background. Inference runs when enough pixels changed,
+    and in any case at least every ``max_skip_interval`` seconds so birds
+    perched motionless are not lost.
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the motion gate
+        
+        Args:
+            config: Configuration dictionary containing tracking settings
+        """
+        self.gate_config = config.get('tracking', {}).get('motion_gate', {})
+        
+        self.enabled = self.gate_config.get('enabled', False)
+        self.downscale_width = self.gate_config.get('downscale_width', 160)
+        self.pixel_threshold = self.gate_config.get('pixel_threshold', 25)
+        self.min_changed_ratio = self.gate_config.get('min_changed_ratio', 0.002)
+        self.background_alpha = self.gate_config.get('background_alpha', 0.05)
+        self.max_skip_interval = self.gate_config.get('max_skip_interval', 1.0)
+        self.run_while_tracking = self.gate_config.get('run_while_tracking', True)
+        
+        self._background: Optional[np.ndarray] = None
+        self._last_run_time = 0.0
+        
+        # Statistics
+        self.frames_run = 0
+        self.frames_skipped = 0
+        self.forced_runs = 0
+        self.last_changed_ratio = 0.0
+    
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscale and convert a frame to a blurred grayscale image
+        """
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / float(width)
+        small = cv2.resize(frame, (self.downscale_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+    
+    def should_run(self, frame: np.ndarray, has_target: bool = False) -> bool:
+        """
+        Decide whether inference should run on this frame
+        
+        Args:
+            frame: Input frame (BGR format)
+            has_target: Whether the previous inference found a bird
+        
+        Returns:
+            True if the detector should run
+        """
+        if not self.enabled:
+            self.frames_run += 1
+            return True
+        
+        gray = self._prepare(frame)
+        now = time.monotonic()
+        
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            changed = True
+            self.last_changed_ratio = 1.0
+        else:
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+            self.last_changed_ratio = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            changed = self.last_changed_ratio >= self.min_changed_ratio
+            cv2.accumulateWeighted(gray, self._background, self.background_alpha)
+        
+        if changed or (has_target and self.run_while_tracking):
+            run = True
+        elif now - self._last_run_time >= self.max_skip_interval:
+            run = True
+            self.forced_runs += 1
+        else:
+            run = False
+        
+        if run:
+            self._last_run_time = now
+            self.frames_run += 1
+        else:
+            self.frames_skipped += 1
+        return run
+    
+    def reset(self):
+        """
+        Forget the background model (e.g. after the camera moved to a new view)
+        """
+        self._background = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get gate statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        total = self.frames_run + self.frames_skipped
+        return {
+            'inference_runs': self.frames_run,
+            'inference_skipped': self.frames_skipped,
+            'forced_runs': self.forced_runs,
+            'skip_ratio': self.frames_skipped / total if total else 0.0
+        }
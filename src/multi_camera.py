@@ -0,0 +1,283 @@
+"""
+Multi-Camera Orchestrator
+Runs one capture/PTZ context per camera around a single shared YOLO11 model
+"""
+
+import copy
+import numpy as np
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .bird_detector import BirdDetector
+from .bird_tracker import BirdTracker
+from .batch_inference import BatchInferenceQueue
+from .frame_grabber import FrameGrabber
+from .metrics import METRICS
+from .clip_recorder import ClipRecorder
+from .event_store import EventStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_camera_config(config: dict, camera_entry: dict) -> dict:
+    """
+    Build the configuration of one camera from the global config and its ``cameras`` entry
+    
+    The entry's ``camera`` and ``tracking`` blocks are merged over the global
+    ones (the nested ``ptz`` block is merged too) and ``source`` replaces
+    ``video.source``.
+    
+    Args:
+        config: Global configuration dictionary
+        camera_entry: One item of the ``cameras`` list
+    
+    Returns:
+        Configuration dictionary for that camera
+    """
+    camera_config = copy.deepcopy(config)
+    camera_config.pop('cameras', None)
+    
+    camera_block = camera_config.setdefault('camera', {})
+    entry_camera = camera_entry.get('camera', {})
+    ptz_block = dict(camera_block.get('ptz', {}))
+    ptz_block.update(entry_camera.get('ptz', {}))
+    camera_block.update(entry_camera)
+    camera_block['ptz'] = ptz_block
+    
+    camera_config.setdefault('tracking', {}).update(camera_entry.get('tracking', {}))
+    
+    video_block = camera_config.setdefault('video', {})
+    if 'source' in camera_entry:
+        video_block['source'] = camera_entry['source']
+    
+    return camera_config
+
+
+class CameraContext:
+    """
+    Capture, tracking and PTZ state of one camera
+    """
+    
+    def __init__(self, name: str, config: dict, detector: BirdDetector,
+                 inference_queue: BatchInferenceQueue, event_store: Optional[EventStore] = None):
+        """
+        Initialize the camera context
+        
+        Args:
+            name: Camera name used in logs and window titles
+            config: Per-camera configuration (see build_camera_config)
+            detector: Shared detector
+            inference_queue: Shared batched inference queue
+            event_store: Shared event store; events are recorded under ``name`` (optional)
+        """
+        self.name = name
+        self.config = config
+        
+        source = config.get('video', {}).get('source', 0)
+        self.grabber = FrameGrabber(source, config)
+        self.tracker = None
+        try:
+            self.tracker = BirdTracker(config, detector=detector, inference_queue=inference_queue,
+                                       event_store=event_store, camera_name=name)
+            self.clip_recorder = ClipRecorder(config, self.grabber.fps, name=name)
+        except Exception:
+            # The caller only logs the failure; release the stream and PTZ connection
+            if self.tracker is not None:
+                self.tracker.close()
+            self.grabber.stop()
+            raise
+        
+        self._lock = threading.Lock()
+        self._last: Optional[tuple] = None  # (frame, TrackingResult) of the newest processed frame
+        self._rendered: Optional[tuple] = None
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        """
+        Start capturing and processing frames on this camera's thread
+        """
+        self._running = True
+        self.grabber.start()
+        self._thread = threading.Thread(target=self._loop, name=f'Camera-{self.name}', daemon=True)
+        self._thread.start()
+    
+    def _loop(self):
+        """
+        Processing loop: newest frame -> shared inference -> PTZ
+        """
+        while self._running:
+            wait_start = time.perf_counter()
+            packet = self.grabber.read(timeout=1.0)
+            METRICS.observe('capture_wait', time.perf_counter() - wait_start)
+            if packet is None:
+                if self.grabber.finished:
+                    logger.info(f"[{self.name}] Video source finished")
+                    break
+                continue
+            try:
+                with METRICS.time('track'):
+                    result = self.tracker.track(packet.frame, packet.timestamp)
+                METRICS.observe('end_to_end', time.monotonic() - packet.timestamp)
+                self.clip_recorder.update(packet.frame, packet.timestamp, result.target is not None)
+            except Exception as e:
+                logger.error(f"[{self.name}] Error processing frame: {e}")
+                continue
+            with self._lock:
+                self._last = (packet.frame, result)
+    
+    def get_annotated_frame(self) -> Optional[np.ndarray]:
+        """
+        Render the most recent processed frame of this camera
+        
+        Overlays are drawn here, on the caller's (display) thread, so the
+        processing loop never draws when nothing is shown.
+        
+        Returns:
+            Annotated frame or None if nothing new was processed since the last call
+        """
+        with self._lock:
+            last = self._last
+        if last is None or last is self._rendered:
+            return None
+        self._rendered = last
+        return self.tracker.render(*last)
+    
+    def stop(self):
+        """
+        Stop processing, release the video source and the PTZ worker
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.grabber.stop()
+        self.clip_recorder.close()
+        self.tracker.close()
+
+
+class MultiCameraTracker:
+    """
+    Orchestrates several cameras sharing one detector
+    
+    The YOLO11 weights are loaded once. Every camera thread submits its
+    newest frame to a shared BatchInferenceQueue and waits for the result,
+    so each camera has at most one frame in flight and the FIFO queue
+    serves the cameras round-robin.
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the orchestrator
+        
+        Args:
+            config: Configuration dictionary with a ``cameras`` list
+        """
+        camera_entries: List[dict] = config.get('cameras') or []
+        if not camera_entries:
+            raise ValueError("Multi-camera mode requires a non-empty 'cameras' list")
+        
+        names = [entry.get('name', f'camera{index}') for index, entry in enumerate(camera_entries)]
+        for name in names:
+            if names.count(name) > 1:
+                raise ValueError(f"Duplicate camera name: {name}")
+        
+        logger.info("Initializing shared bird detector...")
+        self.detector = BirdDetector(config)
+        self.inference_queue: Optional[BatchInferenceQueue] = None
+        self.event_store: Optional[EventStore] = None
+        self.cameras: Dict[str, CameraContext] = {}
+        try:
+            self.inference_queue = BatchInferenceQueue(
+                self.detector,
+                max_batch_size=min(self.detector.max_batch_size, len(camera_entries))
+            )
+            
+            # One event store for all cameras; rows carry the camera name
+            self.event_store = EventStore(config)
+            
+            # Open the streams and connect the cameras concurrently while the model warms up
+            with ThreadPoolExecutor(max_workers=len(names) + 1, thread_name_prefix='CameraInit') as pool:
+                warmup = pool.submit(self.detector.warmup)
+                futures = {}
+                for name, entry in zip(names, camera_entries):
+                    logger.info(f"Initializing camera '{name}'...")
+                    futures[name] = pool.submit(CameraContext, name, build_camera_config(config, entry),
+                                                self.detector, self.inference_queue, self.event_store)
+                for name, future in futures.items():
+                    try:
+                        self.cameras[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to initialize camera '{name}': {e}")
+                warmup.result()
+            
+            if not self.cameras:
+                raise RuntimeError("No camera could be initialized")
+        except BaseException:
+            # Nothing is handed to the caller: release every camera, the workers and the model
+            self.stop()
+            self.cameras = {}
+            self.detector = None
+            raise
+    
+    def start(self):
+        """
+        Start all camera threads
+        """
+        for context in self.cameras.values():
+            context.start()
+    
+    def stop(self):
+        """
+        Stop all cameras, the shared inference worker and the event writer
+        """
+        for context in self.cameras.values():
+            context.stop()
+        if self.inference_queue is not None:
+            self.inference_queue.close()
+        if self.event_store is not None:
+            self.event_store.close()
+    
+    def go_home(self):
+        """
+        Return all cameras to their home positions
+        """
+        for context in self.cameras.values():
+            context.tracker.go_home()
+    
+    def stop_ptz(self):
+        """
+        Stop PTZ movement on all cameras
+        """
+        for context in self.cameras.values():
+            context.tracker.stop_ptz()
+    
+    def reset_tracking(self):
+        """
+        Reset tracking state on all cameras
+        """
+        for context in self.cameras.values():
+            context.tracker.reset_tracking()
+    
+    def get_statistics(self) -> dict:
+        """
+        Get per-camera and shared inference statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'cameras': {
+                name: {
+                    'tracking': context.tracker.get_statistics(),
+                    'capture': context.grabber.get_statistics(),
+                    'clips': context.clip_recorder.get_statistics()
+                }
+                for name, context in self.cameras.items()
+            },
+            'inference': self.inference_queue.get_statistics(),
+            'events': self.event_store.get_statistics()
+        }
@@ -0,0 +1,318 @@
+"""
+Multi-Object Tracker
+ByteTrack/SORT-style association with persistent track IDs and target lock
+"""
+
+import numpy as np
+import logging
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+from .detections import Detections
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional; fall back to greedy assignment
+    linear_sum_assignment = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of boxes
+    
+    Args:
+        boxes_a: (N, 4) boxes [x1, y1, x2, y2]
+        boxes_b: (M, 4) boxes [x1, y1, x2, y2]
+    
+    Returns:
+        (N, M) IoU matrix
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-9)
+
+
+def assign(cost: np.ndarray, max_cost: float) -> List[Tuple[int, int]]:
+    """
+    Solve the assignment problem on a cost matrix
+    
+    Uses the Hungarian algorithm when scipy is available, otherwise a greedy
+    lowest-cost-first matching. Pairs above ``max_cost`` are never matched.
+    
+    Args:
+        cost: (N, M) cost matrix
+        max_cost: Maximum cost of an accepted pair
+    
+    Returns:
+        List of (row, col) matches
+    """
+    if cost.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+        return [(r, c) for r, c in zip(rows.tolist(), cols.tolist()) if cost[r, c] <= max_cost]
+    
+    matches = []
+    flat = np.argsort(cost, axis=None)
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    for index in flat.tolist():
+        r, c = divmod(index, cost.shape[1])
+        if cost[r, c] > max_cost:
+            break
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        matches.append((r, c))
+    return matches
+
+
+class Track:
+    """
+    State of one tracked bird
+    """
+    
+    __slots__ = ('track_id', 'xyxy', 'velocity', 'conf', 'cls', 'hits', 'misses',
+                 'first_seen', 'last_seen', 'confirmed')
+    
+    def __init__(self, track_id: int, xyxy: np.ndarray, conf: float, cls: int, timestamp: float):
+        self.track_id = track_id
+        self.xyxy = xyxy.astype(np.float32)
+        self.velocity = np.zeros(2, dtype=np.float32)  # center px/frame
+        self.conf = conf
+        self.cls = cls
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.confirmed = False
+    
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (int((self.xyxy[0] + self.xyxy[2]) / 2), int((self.xyxy[1] + self.xyxy[3]) / 2))
+    
+    @property
+    def area(self) -> float:
+        return float((self.xyxy[2] - self.xyxy[0]) * (self.xyxy[3] - self.xyxy[1]))
+    
+    def predicted_box(self) -> np.ndarray:
+        """
+        Constant-velocity prediction of the box one frame (plus any missed frames) ahead
+        """
+        shift = self.velocity * (self.misses + 1)
+        return self.xyxy + np.array([shift[0], shift[1], shift[0], shift[1]], dtype=np.float32)
+    
+    def to_dict(self) -> dict:
+        return {
+            'track_id': self.track_id,
+            'bbox': self.xyxy.tolist(),
+            'confidence': self.conf,
+            'class_id': self.cls,
+            'hits': self.hits,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'lifetime': self.last_seen - self.first_seen
+        }
+
+
+class MultiObjectTracker:
+    """
+    IoU/motion multi-object tracker with persistent IDs
+    
+    Detections are split by confidence (ByteTrack): confident boxes are
+    matched to the constant-velocity predictions of existing tracks first,
+    then low-confidence boxes are used to keep unmatched tracks alive.
+    Unmatched confident boxes start new tracks, which are confirmed after
+    ``min_hits`` matches. Tracks missing for more than ``max_age`` updates
+    are retired and their lifetimes recorded. One confirmed track is locked
+    as the PTZ target and kept until it is lost.
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the tracker
+        
+        Args:
+            config: Configuration dictionary containing tracking settings
+        """
+        self.mot_config = config.get('tracking', {}).get('mot', {})
+        
+        self.enabled = self.mot_config.get('enabled', False)
+        self.high_conf = self.mot_config.get('high_conf', 0.5)
+        self.min_iou = self.mot_config.get('min_iou', 0.1)
+        self.max_age = self.mot_config.get('max_age', 15)
+        self.min_hits = self.mot_config.get('min_hits', 2)
+        self.velocity_smoothing = self.mot_config.get('velocity_smoothing', 0.5)
+        self.history_size = self.mot_config.get('history_size', 1000)
+        
+        self.tracks: List[Track] = []
+        self.locked_id: Optional[int] = None
+        self.finished = deque(maxlen=self.history_size)
+        self._next_id = 1
+        # Called with each finished track's dictionary, e.g. EventStore.record_track
+        self.on_finish: Optional[Callable[[dict], None]] = None
+        
+        # Statistics
+        self.total_tracks = 0
+        self.target_switches = 0
+    
+    def _match(self, tracks: List[Track], boxes: np.ndarray) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+        """
+        Associate tracks with boxes by IoU against predicted positions
+        
+        Returns:
+            (matches, unmatched track indices, unmatched box indices)
+        """
+        if not tracks or len(boxes) == 0:
+            return [], list(range(len(tracks))), list(range(len(boxes)))
+        predicted = np.stack([t.predicted_box() for t in tracks])
+        cost = 1.0 - iou_matrix(predicted, boxes)
+        matches = assign(cost, 1.0 - self.min_iou)
+        matched_tracks = {r for r, _ in matches}
+        matched_boxes = {c for _, c in matches}
+        return (matches,
+                [i for i in range(len(tracks)) if i not in matched_tracks],
+                [j for j in range(len(boxes)) if j not in matched_boxes])
+    
+    def _apply(self, track: Track, box: np.ndarray, conf: float, cls: int, timestamp: float):
+        """
+        Update a track with its matched box
+        """
+        old_center = (track.xyxy[:2] + track.xyxy[2:]) * 0.5
+        new_center = (box[:2] + box[2:]) * 0.5
+        step = (new_center - old_center) / (track.misses + 1)
+        a = self.velocity_smoothing
+        track.velocity = a * track.velocity + (1.0 - a) * step
+        track.xyxy = box.astype(np.float32)
+        track.conf = conf
+        track.cls = cls
+        track.hits += 1
+        track.misses = 0
+        track.last_seen = timestamp
+        if track.hits >= self.min_hits:
+            track.confirmed = True
+    
+    def update(self, detections: Detections, timestamp: float) -> List[Track]:
+        """
+        Advance all tracks with the detections of a new frame
+        
+        Args:
+            detections: Detections of the frame
+            timestamp: Frame time in seconds
+        
+        Returns:
+            Confirmed tracks seen in this frame
+        """
+        boxes, confs, classes = detections.xyxy, detections.conf, detections.cls
+        high = np.flatnonzero(confs >= self.high_conf)
+        low = np.flatnonzero(confs < self.high_conf)
+        
+        # First pass: confident boxes against all tracks
+        matches, unmatched_tracks, unmatched_high = self._match(self.tracks, boxes[high])
+        for r, c in matches:
+            j = high[c]
+            self._apply(self.tracks[r], boxes[j], float(confs[j]), int(classes[j]), timestamp)
+        
+        # Second pass: low-confidence boxes keep the remaining tracks alive
+        remaining = [self.tracks[i] for i in unmatched_tracks]
+        matches, still_unmatched, _ = self._match(remaining, boxes[low])
+        for r, c in matches:
+            j = low[c]
+            self._apply(remaining[r], boxes[j], float(confs[j]), int(classes[j]), timestamp)
+        for i in still_unmatched:
+            remaining[i].misses += 1
+        
+        # New tracks from unmatched confident boxes
+        for c in unmatched_high:
+            j = high[c]
+            self.tracks.append(Track(self._next_id, boxes[j], float(confs[j]), int(classes[j]), timestamp))
+            self._next_id += 1
+            self.total_tracks += 1
+        
+        # Retire lost tracks
+        alive = []
+        for track in self.tracks:
+            if track.misses > self.max_age:
+                self._retire(track)
+            else:
+                alive.append(track)
+        self.tracks = alive
+        
+        return [t for t in self.tracks if t.confirmed and t.misses == 0]
+    
+    def _retire(self, track: Track):
+        """
+        Record the lifetime of a track that ended (confirmed tracks only)
+        """
+        if not track.confirmed:
+            return
+        finished = track.to_dict()
+        self.finished.append(finished)
+        if self.on_finish is not None:
+            self.on_finish(finished)
+    
+    def select_target(self) -> Optional[Track]:
+        """
+        Get the locked target, locking onto the largest confirmed track if needed
+        
+        Returns:
+            Target track seen in the latest update, or None
+        """
+        visible = {t.track_id: t for t in self.tracks if t.confirmed and t.misses == 0}
+        if self.locked_id in visible:
+            return visible[self.locked_id]
+        if self.locked_id is not None and any(t.track_id == self.locked_id for t in self.tracks):
+            # Locked target briefly missed: hold the lock instead of jumping to another bird
+            return None
+        if not visible:
+            self.locked_id = None
+            return None
+        target = max(visible.values(), key=lambda t: t.area)
+        if self.locked_id is not None:
+            self.target_switches += 1
+        self.locked_id = target.track_id
+        return target
+    
+    def reset(self):
+        """
+        Drop all tracks (lifetimes of confirmed tracks are recorded)
+        """
+        for track in self.tracks:
+            self._retire(track)
+        self.tracks = []
+        self.locked_id = None
+    
+    def get_track_lifetimes(self) -> List[dict]:
+        """
+        Get finished and active confirmed tracks with their lifetimes
+        
+        Returns:
+            List of track dictionaries (track_id, bbox, first_seen, last_seen, lifetime, ...)
+        """
+        return list(self.finished) + [t.to_dict() for t in self.tracks if t.confirmed]
+    
+    def get_statistics(self) -> dict:
+        """
+        Get multi-object tracking statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        lifetimes = [t['lifetime'] for t in self.finished]
+        return {
+            'active_tracks': sum(1 for t in self.tracks if t.confirmed),
+            'total_tracks': self.total_tracks,
+            'finished_tracks': len(self.finished),
+            'mean_lifetime': float(np.mean(lifetimes)) if lifetimes else 0.0,
+            'locked_id': self.locked_id,
+            'target_switches': self.target_switches
+        }
@@ -0,0 +1,179 @@
+"""
+Predictive PTZ Control
+Kalman-filtered target velocity used to aim where the bird will be when the PTZ command lands
+"""
+
+import numpy as np
+import logging
+from typing import Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ConstantVelocityKalman:
+    """
+    2D constant-velocity Kalman filter with state [x, y, vx, vy]
+    
+    Time steps come from frame timestamps, so irregular frame intervals
+    (dropped frames, slow inference) are handled correctly.
+    """
+    
+    def __init__(self, process_noise: float = 500.0, measurement_noise: float = 25.0):
+        """
+        Initialize the filter
+        
+        Args:
+            process_noise: Acceleration noise spectral density (px^2/s^3)
+            measurement_noise: Measurement variance of the target center (px^2)
+        """
+        self.q = process_noise
+        self.r = measurement_noise
+        self.x: Optional[np.ndarray] = None
+        self.P = np.eye(4)
+        self.timestamp: Optional[float] = None
+        self._H = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float64)
+        self._R = np.eye(2) * self.r
+    
+    def _transition(self, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        dt2, dt3 = dt * dt, dt * dt * dt
+        q = self.q
+        Q = np.array([[dt3 / 3, 0, dt2 / 2, 0],
+                      [0, dt3 / 3, 0, dt2 / 2],
+                      [dt2 / 2, 0, dt, 0],
+                      [0, dt2 / 2, 0, dt]]) * q
+        return F, Q
+    
+    def update(self, x: float, y: float, timestamp: float):
+        """
+        Predict to ``timestamp`` and correct with a measured center
+        
+        Args:
+            x: Measured center x (px)
+            y: Measured center y (px)
+            timestamp: Capture time of the measurement (seconds)
+        """
+        z = np.array([x, y], dtype=np.float64)
+        if self.x is None:
+            self.x = np.array([x, y, 0.0, 0.0])
+            self.P = np.diag([self.r, self.r, 1e4, 1e4])
+            self.timestamp = timestamp
+            return
+        
+        dt = max(1e-3, timestamp - self.timestamp)
+        F, Q = self._transition(dt)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        
+        innovation = z - self._H @ self.x
+        S = self._H @ self.P @ self._H.T + self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ innovation
+        self.P = (np.eye(4) - K @ self._H) @ self.P
+        self.timestamp = timestamp
+    
+    def predict(self, timestamp: float) -> Tuple[float, float]:
+        """
+        Extrapolate the position to ``timestamp`` without changing the state
+        
+        Args:
+            timestamp: Time to predict for (seconds)
+        
+        Returns:
+            (x, y) predicted center
+        """
+        dt = timestamp - self.timestamp
+        return (float(self.x[0] + self.x[2] * dt), float(self.x[1] + self.x[3] * dt))
+    
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        if self.x is None:
+            return (0.0, 0.0)
+        return (float(self.x[2]), float(self.x[3]))
+    
+    def reset(self):
+        self.x = None
+        self.timestamp = None
+
+
+class PredictivePTZController:
+    """
+    Lead compensation for the PTZ control loop
+    
+    The target center is filtered over frame capture timestamps. The aim
+    point is the filtered position extrapolated by the pipeline delay: the
+    age of the frame when the command is issued plus the measured ONVIF
+    command latency (and an optional fixed actuation delay).
+    """
+    
+    def __init__(self, config: dict):
+        """
+        Initialize the predictive controller
+        
+        Args:
+            config: Configuration dictionary containing tracking settings
+        """
+        self.predictive_config = config.get('tracking', {}).get('predictive', {})
+        
+        self.enabled = self.predictive_config.get('enabled', False)
+        self.actuation_delay = self.predictive_config.get('actuation_delay', 0.1)
+        self.max_lead = self.predictive_config.get('max_lead', 0.8)
+        self.reset_after = self.predictive_config.get('reset_after', 1.0)
+        self.filter = ConstantVelocityKalman(
+            process_noise=self.predictive_config.get('process_noise', 500.0),
+            measurement_noise=self.predictive_config.get('measurement_noise', 25.0)
+        )
+        
+        self.last_lead = 0.0
+    
+    def update(self, x: float, y: float, timestamp: float):
+        """
+        Feed a new target measurement
+        
+        Args:
+            x: Target center x (px)
+            y: Target center y (px)
+            timestamp: Capture time of the frame (seconds, time.monotonic domain)
+        """
+        if self.filter.timestamp is not None and timestamp - self.filter.timestamp > self.reset_after:
+            self.filter.reset()
+        self.filter.update(x, y, timestamp)
+    
+    def aim_point(self, now: float, command_latency: float) -> Tuple[int, int]:
+        """
+        Where the target is expected to be when a command sent now takes effect
+        
+        Args:
+            now: Current time (seconds, same domain as the frame timestamps)
+            command_latency: Measured PTZ command round-trip (seconds)
+        
+        Returns:
+            (x, y) aim point in frame coordinates
+        """
+        lead = (now - self.filter.timestamp) + command_latency + self.actuation_delay
+        self.last_lead = min(max(lead, 0.0), self.max_lead)
+        x, y = self.filter.predict(self.filter.timestamp + self.last_lead)
+        return int(x), int(y)
+    
+    def reset(self):
+        """
+        Forget the target state (e.g. when the locked target changes)
+        """
+        self.filter.reset()
+    
+    def get_statistics(self) -> dict:
+        """
+        Get predictive control statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        vx, vy = self.filter.velocity
+        return {
+            'enabled': self.enabled,
+            'velocity_x': vx,
+            'velocity_y': vy,
+            'last_lead': self.last_lead
+        }
@@ -0,0 +1,306 @@
+"""
+Zero-Copy Inference Pipeline
+Letterboxes frames into preallocated buffers, feeds the network directly and maps boxes back in place
+"""
+
+import cv2
+import numpy as np
+import logging
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+from .detections import Detections
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAD_VALUE = 114  # Ultralytics letterbox grey
+
+
+class LetterboxPlan(NamedTuple):
+    """
+    Geometry of letterboxing one frame size into the network input
+    """
+    input_shape: Tuple[int, int]    # (height, width) of the network input
+    resized: Tuple[int, int]        # (width, height) of the scaled frame
+    top: int
+    left: int
+    gain_x: float                   # input pixels per frame pixel
+    gain_y: float
+    frame_shape: Tuple[int, int]    # (height, width) of the original frame
+
+
+class LetterboxPreprocessor:
+    """
+    Letterbox, BGR->RGB, HWC->CHW and 1/255 scaling into reusable buffers
+    
+    Two flat buffers sized for ``max_batch_size`` images of ``img_size`` x
+    ``img_size`` are allocated once: a uint8 canvas the frames are resized
+    into (cv2.resize writes straight into the canvas region), and the
+    float32 network input, filled by a single strided ufunc pass that does
+    the colour swap, transpose and normalization at once. Smaller (rect)
+    inputs are contiguous views of the same buffers. The padding of a slot
+    is only repainted when that slot's geometry changes; a different input
+    shape moves every slot within the canvas, so it invalidates them all.
+    """
+    
+    def __init__(self, img_size: int = 640, max_batch_size: int = 1, stride: int = 32,
+                 rect: bool = True, plan_cache_size: int = 16):
+        """
+        Initialize the preprocessor and allocate its buffers
+        
+        Args:
+            img_size: Network input side in pixels
+            max_batch_size: Most images prepared at once
+            stride: Model stride; rect inputs are padded to a multiple of it
+            rect: Use the smallest stride-aligned rectangle (pytorch and dynamic
+                exports) instead of the full img_size square
+            plan_cache_size: Number of distinct frame sizes whose geometry is cached
+        """
+        self.img_size = int(img_size)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.stride = int(stride)
+        self.rect = rect
+        self.plan_cache_size = plan_cache_size
+        
+        side = self.img_size
+        self._canvas = np.full(self.max_batch_size * side * side * 3, PAD_VALUE, dtype=np.uint8)
+        self._input = np.empty(self.max_batch_size * 3 * side * side, dtype=np.float32)
+        self._slot_plans: List[Optional[LetterboxPlan]] = [None] * self.max_batch_size
+        self._canvas_shape: Optional[Tuple[int, int]] = None
+        self._plans: 'OrderedDict[tuple, LetterboxPlan]' = OrderedDict()
+        self._scale = np.float32(1.0 / 255.0)
+        
+        # Statistics
+        self.frames_prepared = 0
+        self.plan_misses = 0
+    
+    def plan(self, frame_shape: Tuple[int, int], square: bool = False) -> LetterboxPlan:
+        """
+        Compute (or look up) the letterbox geometry for a frame size
+        
+        Args:
+            frame_shape: (height, width) of the frame
+            square: Force the img_size square even in rect mode
+        
+        Returns:
+            LetterboxPlan
+        """
+        key = (frame_shape[0], frame_shape[1], square or not self.rect)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+        
+        self.plan_misses += 1
+        height, width = frame_shape
+        gain = min(self.img_size / height, self.img_size / width)
+        resized_w, resized_h = round(width * gain), round(height * gain)
+        if key[2]:
+            input_h = input_w = self.img_size
+        else:
+            input_h = resized_h + (self.img_size - resized_h) % self.stride
+            input_w = resized_w + (self.img_size - resized_w) % self.stride
+        # Centered padding, rounded like Ultralytics' LetterBox
+        pad_h, pad_w = (input_h - resized_h) / 2, (input_w - resized_w) / 2
+        plan = LetterboxPlan(
+            input_shape=(input_h, input_w),
+            resized=(resized_w, resized_h),
+            top=round(pad_h - 0.1),
+            left=round(pad_w - 0.1),
+            gain_x=resized_w / width,
+            gain_y=resized_h / height,
+            frame_shape=(height, width)
+        )
+        self._plans[key] = plan
+        if len(self._plans) > self.plan_cache_size:
+            self._plans.popitem(last=False)
+        return plan
+    
+    def prepare(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, List[LetterboxPlan]]:
+        """
+        Letterbox and normalize frames into the shared input buffer
+        
+        The returned array is a view of the preallocated buffer and is
+        overwritten by the next call.
+        
+        Args:
+            frames: Up to max_batch_size BGR frames
+        
+        Returns:
+            Tuple of ((N, 3, H, W) float32 RGB input in 0..1, per-frame plans)
+        """
+        count = len(frames)
+        if count > self.max_batch_size:
+            raise ValueError(f"{count} frames exceed max_batch_size {self.max_batch_size}")
+        
+        # A batch must share one input shape; mixed sizes fall back to the square
+        square = len({frame.shape[:2] for frame in frames}) > 1
+        plans = [self.plan(frame.shape[:2], square) for frame in frames]
+        input_h, input_w = plans[0].input_shape
+        if self._canvas_shape != (input_h, input_w):
+            # Slots of another input shape overlap these ones in the flat canvas
+            self._slot_plans = [None] * self.max_batch_size
+            self._canvas_shape = (input_h, input_w)
+        canvas = self._canvas[:count * input_h * input_w * 3].reshape(count, input_h, input_w, 3)
+        blob = self._input[:count * 3 * input_h * input_w].reshape(count, 3, input_h, input_w)
+        
+        for index, (frame, plan) in enumerate(zip(frames, plans)):
+            slot = canvas[index]
+            if self._slot_plans[index] != plan:
+                # Geometry changed: the old picture may show through the new padding
+                slot.fill(PAD_VALUE)
+                self._slot_plans[index] = plan
+            resized_w, resized_h = plan.resized
+            region = slot[plan.top:plan.top + resized_h, plan.left:plan.left + resized_w]
+            if (resized_h, resized_w) == frame.shape[:2]:
+                np.copyto(region, frame)
+            else:
+                cv2.resize(frame, plan.resized, dst=region, interpolation=cv2.INTER_LINEAR)
+            # BGR->RGB, HWC->CHW and uint8->float32/255 in one pass, no temporaries
+            np.multiply(slot[..., ::-1].transpose(2, 0, 1), self._scale, out=blob[index])
+        
+        self.frames_prepared += count
+        return blob, plans
+    
+    @staticmethod
+    def map_boxes(boxes: np.ndarray, plan: LetterboxPlan) -> np.ndarray:
+        """
+        Map (N, 4) xyxy boxes from network input to frame coordinates, in place
+        
+        Args:
+            boxes: Boxes in network input pixels (modified in place)
+            plan: Plan the frame was prepared with
+        
+        Returns:
+            The same array, in frame pixels and clipped to the frame
+        """
+        height, width = plan.frame_shape
+        xs = boxes[:, 0::2]
+        ys = boxes[:, 1::2]
+        xs -= plan.left
+        ys -= plan.top
+        xs /= plan.gain_x
+        ys /= plan.gain_y
+        np.clip(xs, 0, width, out=xs)
+        np.clip(ys, 0, height, out=ys)
+        return boxes
+    
+    def get_statistics(self) -> dict:
+        """
+        Get preprocessing statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'frames_prepared': self.frames_prepared,
+            'plan_misses': self.plan_misses,
+            'buffer_mb': (self._canvas.nbytes + self._input.nbytes) / (1024.0 * 1024.0)
+        }
+
+
+class DirectInference:
+    """
+    Runs an Ultralytics model on LetterboxPreprocessor output
+    
+    The Ultralytics predictor is only used once, to build its inference
+    backend (AutoBackend, which covers pytorch and every exported format).
+    Afterwards the preallocated input is wrapped with torch.from_numpy (no
+    copy), passed to the backend, reduced with Ultralytics' NMS and the
+    boxes are mapped back in place, so no letterbox images, Results
+    objects or orig-image copies are created per frame.
+    
+    Like the Ultralytics model itself, an instance must not be called from
+    several threads at once (the input buffers are shared).
+    """
+    
+    def __init__(self, model, predict_args: dict, img_size: int, max_batch_size: int,
+                 rect: bool = True):
+        """
+        Initialize the runner
+        
+        Args:
+            model: Loaded Ultralytics YOLO model
+            predict_args: conf/iou/classes/device/max_det arguments of the detector
+            img_size: Network input side in pixels
+            max_batch_size: Most frames per forward pass
+            rect: Allow stride-aligned rectangular inputs (pytorch / dynamic exports)
+        """
+        import torch
+        try:
+            from ultralytics.utils.nms import non_max_suppression
+        except ImportError:  # Ultralytics < 8.3.1xx
+            from ultralytics.utils.ops import non_max_suppression
+        
+        self._torch = torch
+        self._nms = non_max_suppression
+        self.conf = predict_args.get('conf', 0.25)
+        self.iou = predict_args.get('iou', 0.45)
+        self.classes = predict_args.get('classes')
+        self.max_det = predict_args.get('max_det', 300)
+        
+        if getattr(model, 'predictor', None) is None:
+            # One regular call sets up the predictor and its backend
+            model(np.zeros((img_size, img_size, 3), dtype=np.uint8), **predict_args)
+        self.backend = model.predictor.model
+        self.names = self.backend.names
+        self.device = self.backend.device
+        self.half = bool(getattr(self.backend, 'fp16', False))
+        self.nms_args = {'max_det': self.max_det}
+        if getattr(self.backend, 'end2end', False):
+            self.nms_args['end2end'] = True
+        
+        stride = max(int(getattr(self.backend, 'stride', 32)), 32)
+        self.preprocessor = LetterboxPreprocessor(img_size, max_batch_size, stride=stride, rect=rect)
+        
+        # Device-side input buffer; on CPU at fp32 the host buffer is used as is
+        self._device_input = None
+        if self.device.type != 'cpu' or self.half:
+            dtype = torch.float16 if self.half else torch.float32
+            self._device_input = torch.empty(max_batch_size * 3 * img_size * img_size,
+                                             dtype=dtype, device=self.device)
+    
+    def __call__(self, frames: List[np.ndarray]) -> List[Detections]:
+        """
+        Detect on up to max_batch_size frames
+        
+        Args:
+            frames: BGR frames
+        
+        Returns:
+            Detections per frame, in frame coordinates
+        """
+        torch = self._torch
+        with METRICS.time('preprocess'):
+            blob, plans = self.preprocessor.prepare(frames)
+            tensor = torch.from_numpy(blob)
+            if self._device_input is not None:
+                staged = self._device_input[:blob.size].view(blob.shape)
+                staged.copy_(tensor, non_blocking=True)
+                tensor = staged
+        
+        with torch.inference_mode():
+            preds = self.backend(tensor)
+            outputs = self._nms(preds, self.conf, self.iou, self.classes, **self.nms_args)
+        
+        with METRICS.time('postprocess'):
+            detections = []
+            for output, plan in zip(outputs, plans):
+                if len(output) == 0:
+                    detections.append(Detections.empty(self.names))
+                    continue
+                # (N, 6) x1, y1, x2, y2, conf, cls; .numpy() shares memory on CPU
+                data = output.float().cpu().numpy()
+                self.preprocessor.map_boxes(data[:, :4], plan)
+                detections.append(Detections(data[:, :4], data[:, 4], data[:, 5], self.names))
+        return detections
+    
+    def get_statistics(self) -> dict:
+        """
+        Get preprocessing statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return self.preprocessor.get_statistics()
@@ -5,9 +5,11 @@ Handles pan-tilt-zoom operations for ONVIF-compatible cameras
 
 import logging
 import time
+from pathlib import Path
 from typing import Optional, Tuple
-from onvif import ONVIFCamera
-from zeep.exceptions import Fault
+from .metrics import METRICS
+from .ptz_executor import PTZExecutor
+from .ptz_status import PTZStatus, PTZStatusPoller
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +43,19 @@ class PTZController:
         # Fixed-speed continuous move requirement: speed is fixed at a percent value (default 50%)
         self.fixed_speed_percent = int(self.ptz_config.get('fixed_speed_percent', 50))
         self.fixed_speed = max(0.0, min(1.0, self.fixed_speed_percent / 100.0))
+        # Send moves from a worker thread instead of sleeping on the caller's thread
+        self.async_commands = self.ptz_config.get('async_commands', True)
+        self.move_duration = self.ptz_config.get('move_duration', 0.2)
+        # Background GetStatus polling
+        self.status_poll_config = self.ptz_config.get('status_poll', {})
+        
+        # ONVIF/zeep client settings
+        self.onvif_config = self.camera_config.get('onvif', {})
+        self.wsdl_cache = self.onvif_config.get('wsdl_cache', '.onvif_cache/zeep.sqlite')
+        self.wsdl_cache_timeout = self.onvif_config.get('wsdl_cache_timeout', 30 * 24 * 3600)
+        self.wsdl_dir = self.onvif_config.get('wsdl_dir')
+        self.operation_timeout = self.onvif_config.get('operation_timeout', 5.0)
+        self.use_request_templates = self.onvif_config.get('use_request_templates', True)
         
         self.camera = None
         self.ptz_service = None
@@ -50,20 +65,49 @@ class PTZController:
         # Last movement timestamp for rate limiting
         self.last_move_time = 0
         self.min_move_interval = 0.1  # Minimum seconds between moves
+        self._command_latency = 0.0  # Last measured ContinuousMove round-trip (blocking path)
+        
+        # Prebuilt requests (see _build_request_templates)
+        self._move_request = None
+        self._stop_request = None
+        
+        # Statistics
+        self.connect_time = 0.0
+        self.command_cpu_time = 0.0  # EMA of CPU seconds spent building/sending one command
         
         self._connect()
+        
+        self.executor = None
+        if self.async_commands:
+            self.executor = PTZExecutor(self._send_continuous_move, self._send_stop)
+        
+        self.status_poller = None
+        if self.status_poll_config.get('enabled', True):
+            self.status_poller = PTZStatusPoller(
+                self._query_status,
+                interval=self.status_poll_config.get('interval', 0.5),
+                stale_after=self.status_poll_config.get('stale_after', 2.0)
+            )
     
     def _connect(self):
         """
         Connect to the ONVIF camera and initialize PTZ service
         """
+        start = time.perf_counter()
         try:
+            # Imported on first connect so importing the package stays fast
+            from onvif import ONVIFCamera
+            
             logger.info(f"Connecting to ONVIF camera at {self.ip}:{self.port}")
+            camera_args = {'transport': self._make_transport()}
+            if self.wsdl_dir:
+                camera_args['wsdl_dir'] = self.wsdl_dir
             self.camera = ONVIFCamera(
                 self.ip,
                 self.port,
                 self.username,
-                self.password
+                self.password,
+                **camera_args
             )
             
             # Get media service and profile
@@ -78,12 +122,57 @@ class PTZController:
             
             # Get PTZ service
             self.ptz_service = self.camera.create_ptz_service()
-            logger.info("PTZ service initialized successfully")
+            if self.use_request_templates:
+                self._build_request_templates()
+            
+            self.connect_time = time.perf_counter() - start
+            METRICS.observe('onvif_connect', self.connect_time)
+            logger.info(f"PTZ service initialized successfully in {self.connect_time:.2f}s")
             
         except Exception as e:
             logger.error(f"Failed to connect to ONVIF camera: {e}")
             raise
     
+    def _make_transport(self):
+        """
+        Build the zeep transport, with an on-disk cache for remotely fetched schemas
+        
+        The ONVIF WSDLs import XML schemas by URL (soap-envelope, xmlmime, ...),
+        which zeep would otherwise download again on every start.
+        
+        Returns:
+            zeep Transport
+        """
+        from zeep.cache import SqliteCache
+        from zeep.transports import Transport
+        
+        cache = None
+        if self.wsdl_cache:
+            Path(self.wsdl_cache).parent.mkdir(parents=True, exist_ok=True)
+            cache = SqliteCache(path=str(self.wsdl_cache), timeout=self.wsdl_cache_timeout)
+        return Transport(cache=cache, operation_timeout=self.operation_timeout)
+    
+    def _build_request_templates(self):
+        """
+        Create the ContinuousMove and Stop requests once; commands only update the velocity
+        """
+        self._move_request = self.ptz_service.create_type('ContinuousMove')
+        self._move_request.ProfileToken = self.profile.token
+        self._move_request.Velocity = {
+            'PanTilt': {'x': 0.0, 'y': 0.0},
+            'Zoom': {'x': 0.0},
+        }
+        
+        self._stop_request = self.ptz_service.create_type('Stop')
+        self._stop_request.ProfileToken = self.profile.token
+        self._stop_request.PanTilt = True
+        self._stop_request.Zoom = True
+    
+    def _record_command_cpu(self, cpu_start: float):
+        cpu = time.thread_time() - cpu_start
+        METRICS.observe('ptz_command_cpu', cpu)
+        self.command_cpu_time = cpu if self.command_cpu_time == 0.0 else 0.9 * self.command_cpu_time + 0.1 * cpu
+    
     def move_continuous(self, pan_velocity: float, tilt_velocity: float, duration: float = 0.5):
         """
         Move camera continuously with specified velocities
@@ -96,6 +185,7 @@ class PTZController:
         if not self.ptz_service:
             logger.warning("PTZ service not initialized")
             return
+        from zeep.exceptions import Fault
         
         # Rate limiting
         current_time = time.time()
@@ -103,25 +193,8 @@ class PTZController:
             return
         
         try:
-            # Normalize to fixed-speed continuous movement (camera only supports continuous @ fixed speed)
-            def _sgn(v: float) -> float:
-                return 0.0 if v == 0 else (1.0 if v > 0 else -1.0)
-
-            pan_velocity = _sgn(pan_velocity) * self.fixed_speed
-            tilt_velocity = _sgn(tilt_velocity) * self.fixed_speed
-            
-            # Create velocity vector (types come from ver10 schema, not PTZ WSDL)
-            request = self.ptz_service.create_type('ContinuousMove')
-            request.ProfileToken = self.profile.token
-
-            # Assign dicts; zeep will coerce to proper types
-            request.Velocity = {
-                'PanTilt': {'x': pan_velocity, 'y': tilt_velocity},
-                'Zoom': {'x': 0.0},
-            }
-            
-            # Execute move
-            self.ptz_service.ContinuousMove(request)
+            self._send_continuous_move(pan_velocity, tilt_velocity)
+            self._command_latency = time.time() - current_time
             self.last_move_time = current_time
             
             # Schedule stop after duration
@@ -133,6 +206,56 @@ class PTZController:
         except Exception as e:
             logger.error(f"Error during continuous move: {e}")
     
+    def _send_continuous_move(self, pan_velocity: float, tilt_velocity: float):
+        """
+        Issue a single ContinuousMove request (no stop is scheduled)
+        
+        Args:
+            pan_velocity: Pan velocity, only its sign is used
+            tilt_velocity: Tilt velocity, only its sign is used
+        """
+        # Normalize to fixed-speed continuous movement (camera only supports continuous @ fixed speed)
+        def _sgn(v: float) -> float:
+            return 0.0 if v == 0 else (1.0 if v > 0 else -1.0)
+
+        pan_velocity = _sgn(pan_velocity) * self.fixed_speed
+        tilt_velocity = _sgn(tilt_velocity) * self.fixed_speed
+        
+        cpu_start = time.thread_time()
+        if self._move_request is not None:
+            # Reuse the prebuilt request; only the velocity values change
+            request = self._move_request
+            request.Velocity['PanTilt']['x'] = pan_velocity
+            request.Velocity['PanTilt']['y'] = tilt_velocity
+        else:
+            # Create velocity vector (types come from ver10 schema, not PTZ WSDL)
+            request = self.ptz_service.create_type('ContinuousMove')
+            request.ProfileToken = self.profile.token
+
+            # Assign dicts; zeep will coerce to proper types
+            request.Velocity = {
+                'PanTilt': {'x': pan_velocity, 'y': tilt_velocity},
+                'Zoom': {'x': 0.0},
+            }
+        
+        # Execute move
+        self.ptz_service.ContinuousMove(request)
+        self._record_command_cpu(cpu_start)
+    
+    def _send_stop(self):
+        """
+        Issue a single Stop request for pan/tilt and zoom
+        """
+        cpu_start = time.thread_time()
+        request = self._stop_request
+        if request is None:
+            request = self.ptz_service.create_type('Stop')
+            request.ProfileToken = self.profile.token
+            request.PanTilt = True
+            request.Zoom = True
+        self.ptz_service.Stop(request)
+        self._record_command_cpu(cpu_start)
+    
     def stop(self):
         """
         Stop all PTZ movements
@@ -140,17 +263,27 @@ class PTZController:
         if not self.ptz_service:
             return
         
+        if self.executor is not None:
+            # Queue behind any in-flight move so the stop is never overtaken
+            self.executor.submit_stop()
+            return
+        
         try:
-            request = self.ptz_service.create_type('Stop')
-            request.ProfileToken = self.profile.token
-            request.PanTilt = True
-            request.Zoom = True
-            self.ptz_service.Stop(request)
+            self._send_stop()
         except Exception as e:
             logger.error(f"Error stopping PTZ: {e}")
     
+    @property
+    def command_latency(self) -> float:
+        """
+        Measured round-trip of a PTZ move command in seconds
+        """
+        if self.executor is not None:
+            return self.executor.command_latency
+        return self._command_latency
+    
     def move_to_center_target(self, target_x: int, target_y: int, 
-                              frame_center_x: int, frame_center_y: int):
+                              frame_center_x: int, frame_center_y: int) -> bool:
         """
         Move camera to center the target in the frame
         
@@ -159,6 +292,9 @@ class PTZController:
             target_y: Y coordinate of target
             frame_center_x: X coordinate of frame center
             frame_center_y: Y coordinate of frame center
+            
+        Returns:
+            True if a move was issued, False if the target is inside the dead zone
         """
         # Calculate offset from center
         offset_x = target_x - frame_center_x
@@ -167,7 +303,7 @@ class PTZController:
         # Check if within dead zone
         if abs(offset_x) < self.dead_zone_x and abs(offset_y) < self.dead_zone_y:
             logger.debug("Target within dead zone, no movement needed")
-            return
+            return False
         
         # Continuous-only control with fixed speed magnitude
         # Determine direction by sign of offset, magnitude fixed by fixed_speed (e.g., 50% -> 0.5)
@@ -182,14 +318,19 @@ class PTZController:
         # If both axes within dead zone, do nothing
         if pan_velocity == 0.0 and tilt_velocity == 0.0:
             logger.debug("Target within dead zone after evaluation; no movement issued")
-            return
+            return False
 
         logger.debug(
             f"Continuous fixed-speed move: pan={pan_velocity:.3f}, tilt={tilt_velocity:.3f} (fixed {self.fixed_speed_percent}%)"
         )
 
         # Execute movement with short duration pulses
-        self.move_continuous(pan_velocity, tilt_velocity, duration=0.2)
+        if self.executor is not None:
+            # Returns immediately; the worker sends the move and the scheduled stop
+            self.executor.submit_move(pan_velocity, tilt_velocity, self.move_duration)
+        else:
+            self.move_continuous(pan_velocity, tilt_velocity, duration=self.move_duration)
+        return True
     
     def go_home(self):
         """
@@ -217,13 +358,67 @@ class PTZController:
             return None
         
         try:
-            status = self.ptz_service.GetStatus({'ProfileToken': self.profile.token})
-            return {
-                'pan': status.Position.PanTilt.x if status.Position else None,
-                'tilt': status.Position.PanTilt.y if status.Position else None,
-                'zoom': status.Position.Zoom.x if status.Position else None,
-                'moving': status.MoveStatus if hasattr(status, 'MoveStatus') else None
-            }
+            return self._query_status()
         except Exception as e:
             logger.error(f"Error getting PTZ status: {e}")
             return None
+    
+    def _query_status(self) -> dict:
+        """
+        Issue a GetStatus request (raises on failure)
+        """
+        status = self.ptz_service.GetStatus({'ProfileToken': self.profile.token})
+        return {
+            'pan': status.Position.PanTilt.x if status.Position else None,
+            'tilt': status.Position.PanTilt.y if status.Position else None,
+            'zoom': status.Position.Zoom.x if status.Position else None,
+            'moving': status.MoveStatus if hasattr(status, 'MoveStatus') else None
+        }
+    
+    @property
+    def status(self) -> Optional[PTZStatus]:
+        """
+        Latest background-polled status (no network I/O); None if polling is off or has not succeeded yet
+        """
+        if self.status_poller is None:
+            return None
+        return self.status_poller.get_snapshot()
+    
+    @property
+    def status_stale(self) -> bool:
+        """
+        True if the polled status is missing or older than ``status_poll.stale_after``
+        """
+        return self.status_poller is None or self.status_poller.is_stale()
+    
+    def close(self):
+        """
+        Stop the camera and shut down the command worker and status poller
+        """
+        if self.status_poller is not None:
+            self.status_poller.stop()
+            self.status_poller = None
+        self.stop()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self._command_latency = self.executor.command_latency
+            self.executor = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get connection and command statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        stats = {
+            'connect_time': self.connect_time,
+            'command_cpu_time': self.command_cpu_time,
+            'command_latency': self.command_latency,
+            'request_templates': self._move_request is not None
+        }
+        if self.executor is not None:
+            stats.update(self.executor.get_statistics())
+        if self.status_poller is not None:
+            stats['status_poll'] = self.status_poller.get_statistics()
+        return stats
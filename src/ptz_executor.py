@@ -0,0 +1,176 @@
+"""
+Asynchronous PTZ Command Executor
+Runs ONVIF move/stop requests on a worker thread so the vision loop never blocks
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PTZExecutor:
+    """
+    Single-worker PTZ command queue with scheduled stops
+    
+    The queue holds at most one pending move: a newer command replaces an
+    older one that has not been sent yet. Each move carries a duration after
+    which the worker issues a Stop. If a new move with the same velocity
+    arrives while the camera is already moving, only the stop deadline is
+    extended and no extra SOAP request is made.
+    """
+    
+    _STOP = ('stop',)
+    
+    def __init__(self, send_move: Callable[[float, float], None],
+                 send_stop: Callable[[], None]):
+        """
+        Initialize the executor
+        
+        Args:
+            send_move: Callable issuing ContinuousMove(pan, tilt) to the camera
+            send_stop: Callable issuing Stop to the camera
+        """
+        self._send_move = send_move
+        self._send_stop = send_stop
+        
+        self._cond = threading.Condition()
+        self._pending: Optional[tuple] = None  # (pan, tilt, duration) or _STOP
+        self._active_velocity: Optional[Tuple[float, float]] = None
+        self._stop_deadline: Optional[float] = None
+        self._running = True
+        
+        # Statistics
+        self.commands_submitted = 0
+        self.commands_replaced = 0
+        self.moves_sent = 0
+        self.stops_sent = 0
+        self.deadline_extensions = 0
+        self.command_latency = 0.0  # EMA of the SOAP round-trip, seconds
+        
+        self._thread = threading.Thread(target=self._worker, name='PTZExecutor', daemon=True)
+        self._thread.start()
+    
+    def submit_move(self, pan_velocity: float, tilt_velocity: float, duration: float):
+        """
+        Queue a continuous move, replacing any move that has not been sent yet
+        
+        Args:
+            pan_velocity: Pan velocity (-1.0 to 1.0)
+            tilt_velocity: Tilt velocity (-1.0 to 1.0)
+            duration: Seconds to keep moving before the scheduled stop
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.commands_replaced += 1
+                METRICS.inc('ptz_commands_replaced')
+            self._pending = (pan_velocity, tilt_velocity, duration)
+            self.commands_submitted += 1
+            self._cond.notify()
+    
+    def submit_stop(self):
+        """
+        Queue a Stop, replacing any move that has not been sent yet
+        
+        Commands are sent in order by the single worker, so a stop can never
+        be overtaken by a move that was submitted before it.
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.commands_replaced += 1
+                METRICS.inc('ptz_commands_replaced')
+            self._pending = self._STOP
+            self._stop_deadline = None
+            self.commands_submitted += 1
+            self._cond.notify()
+    
+    def _worker(self):
+        """
+        Worker loop: send pending moves and fire scheduled stops
+        """
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    if self._stop_deadline is None:
+                        self._cond.wait()
+                    else:
+                        remaining = self._stop_deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(timeout=remaining)
+                
+                if not self._running and self._pending is None:
+                    return
+                
+                command = self._pending
+                self._pending = None
+                if command is None or command is self._STOP:
+                    # Explicit stop, or stop deadline reached with nothing newer queued
+                    self._stop_deadline = None
+                    self._active_velocity = None
+                    do_stop = True
+                else:
+                    pan, tilt, duration = command
+                    do_stop = False
+                    if self._active_velocity == (pan, tilt):
+                        # Already moving this way: the new deadline is enough
+                        self._stop_deadline = time.monotonic() + duration
+                        self.deadline_extensions += 1
+                        continue
+                    self._active_velocity = (pan, tilt)
+            
+            # SOAP requests are made outside the lock so submit_move never waits on the network
+            try:
+                start = time.monotonic()
+                if do_stop:
+                    self._send_stop()
+                    self.stops_sent += 1
+                else:
+                    self._send_move(pan, tilt)
+                    self.moves_sent += 1
+                elapsed = time.monotonic() - start
+                METRICS.observe('ptz_rtt', elapsed)
+                self.command_latency = (elapsed if self.command_latency == 0.0
+                                        else 0.8 * self.command_latency + 0.2 * elapsed)
+            except Exception as e:
+                logger.error(f"PTZ executor command failed: {e}")
+                METRICS.inc('ptz_command_errors')
+                with self._cond:
+                    self._active_velocity = None
+            if not do_stop:
+                # The camera only starts moving once ContinuousMove returns, so the move
+                # lasts ``duration`` from then (after a failure the stop is still sent)
+                with self._cond:
+                    self._stop_deadline = time.monotonic() + duration
+    
+    def shutdown(self, timeout: float = 2.0):
+        """
+        Stop the worker thread once the queued command (if any) has been sent
+        
+        Args:
+            timeout: Seconds to wait for the worker to exit
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get executor statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'commands_submitted': self.commands_submitted,
+            'commands_replaced': self.commands_replaced,
+            'moves_sent': self.moves_sent,
+            'stops_sent': self.stops_sent,
+            'deadline_extensions': self.deadline_extensions,
+            'command_latency': self.command_latency
+        }
@@ -0,0 +1,177 @@
+"""
+PTZ Status Poller
+Refreshes pan/tilt/zoom and move status in the background and publishes immutable snapshots
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+from .metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PTZStatus(NamedTuple):
+    """
+    Camera position at one point in time (immutable, safe to share between threads)
+    """
+    pan: Optional[float]
+    tilt: Optional[float]
+    zoom: Optional[float]
+    moving: Optional[bool]
+    timestamp: float    # time.monotonic() when the GetStatus response arrived
+    latency: float      # GetStatus round-trip, seconds
+    
+    def age(self, now: Optional[float] = None) -> float:
+        """
+        Seconds since this snapshot was taken
+        """
+        return (time.monotonic() if now is None else now) - self.timestamp
+
+
+def is_moving(move_status) -> Optional[bool]:
+    """
+    Reduce an ONVIF MoveStatus (or a plain bool) to a single flag
+    
+    Args:
+        move_status: Bool, None, or an object with PanTilt/Zoom states ("IDLE", "MOVING", "UNKNOWN")
+    
+    Returns:
+        True if any axis is moving, None if unknown
+    """
+    if move_status is None or isinstance(move_status, bool):
+        return move_status
+    states = [getattr(move_status, axis, None) for axis in ('PanTilt', 'Zoom')]
+    states = [str(state).upper() for state in states if state is not None]
+    if not states:
+        return None
+    return any(state == 'MOVING' for state in states)
+
+
+class PTZStatusPoller:
+    """
+    Background GetStatus loop
+    
+    A worker thread queries the camera every ``interval`` seconds and
+    replaces the published snapshot with a new PTZStatus. Readers call
+    get_snapshot(), which returns the last snapshot without any network
+    I/O. Failed polls keep the previous snapshot, so its age keeps growing;
+    once it is older than ``stale_after`` seconds the status is reported
+    as stale.
+    """
+    
+    def __init__(self, fetch_status: Callable[[], Optional[dict]],
+                 interval: float = 0.5, stale_after: float = 2.0):
+        """
+        Initialize the poller and start its thread
+        
+        Args:
+            fetch_status: Callable returning a dict with pan/tilt/zoom/moving;
+                may raise or return None on failure
+            interval: Seconds between polls
+            stale_after: Snapshot age in seconds after which the status is stale
+        """
+        self._fetch_status = fetch_status
+        self.interval = interval
+        self.stale_after = stale_after
+        
+        self._snapshot: Optional[PTZStatus] = None
+        self._stop_event = threading.Event()
+        
+        # Statistics
+        self.polls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        
+        self._thread = threading.Thread(target=self._worker, name='PTZStatusPoller', daemon=True)
+        self._thread.start()
+    
+    def _worker(self):
+        """
+        Worker loop: poll, publish, sleep until the next poll is due
+        """
+        while not self._stop_event.is_set():
+            start = time.monotonic()
+            try:
+                status = self._fetch_status()
+                if status is None:
+                    raise RuntimeError("no status returned")
+            except Exception as e:
+                self.errors += 1
+                self.consecutive_errors += 1
+                METRICS.inc('ptz_status_errors')
+                if self.consecutive_errors == 1:
+                    logger.warning(f"PTZ status poll failed: {e}")
+            else:
+                now = time.monotonic()
+                latency = now - start
+                # A single reference assignment: readers see either the old or the new snapshot
+                self._snapshot = PTZStatus(
+                    pan=status.get('pan'),
+                    tilt=status.get('tilt'),
+                    zoom=status.get('zoom'),
+                    moving=is_moving(status.get('moving')),
+                    timestamp=now,
+                    latency=latency
+                )
+                METRICS.observe('ptz_status', latency)
+                if self.consecutive_errors:
+                    logger.info(f"PTZ status polling recovered after {self.consecutive_errors} failures")
+                self.consecutive_errors = 0
+            self.polls += 1
+            
+            snapshot = self._snapshot
+            if snapshot is not None:
+                METRICS.set_gauge('ptz_status_age', snapshot.age())
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - start)))
+    
+    def get_snapshot(self) -> Optional[PTZStatus]:
+        """
+        Get the newest status without querying the camera
+        
+        Returns:
+            Latest PTZStatus, or None until the first poll succeeded
+        """
+        return self._snapshot
+    
+    def is_stale(self, snapshot: Optional[PTZStatus] = None) -> bool:
+        """
+        Check whether the (given or newest) snapshot is too old to rely on
+        
+        Args:
+            snapshot: Snapshot to check; defaults to the newest one
+        
+        Returns:
+            True if there is no snapshot or it is older than stale_after
+        """
+        snapshot = snapshot or self._snapshot
+        return snapshot is None or snapshot.age() > self.stale_after
+    
+    def stop(self, timeout: float = 2.0):
+        """
+        Stop the polling thread
+        
+        Args:
+            timeout: Seconds to wait for an in-flight poll to finish
+        """
+        self._stop_event.set()
+        self._thread.join(timeout=timeout)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get polling statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        snapshot = self._snapshot
+        return {
+            'polls': self.polls,
+            'errors': self.errors,
+            'consecutive_errors': self.consecutive_errors,
+            'status_age': snapshot.age() if snapshot is not None else None,
+            'stale': self.is_stale(snapshot),
+            'poll_latency': snapshot.latency if snapshot is not None else None
+        }
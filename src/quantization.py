@@ -0,0 +1,455 @@
+"""
+INT8 Quantization Workflow
+Builds a calibration set from recorded footage, quantizes the model and compares INT8 against FP32
+"""
+
+import cv2
+import numpy as np
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from .inference_backends import LatencyStats, cached_artifact_path, resolve_model_path, resolve_weights
+from .multi_object_tracker import iou_matrix
+from .preprocess import LetterboxPreprocessor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backends an INT8 artifact can be built for
+QUANTIZATION_BACKENDS = ('onnx', 'openvino')
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+
+def frame_descriptor(frame: np.ndarray) -> np.ndarray:
+    """
+    Cheap appearance descriptor used to pick diverse calibration frames
+    
+    A z-normalized 16x9 grayscale thumbnail (scene layout) followed by a
+    16-bin brightness histogram (exposure: dawn, noon, dusk, backlight).
+    
+    Args:
+        frame: BGR frame
+    
+    Returns:
+        1-D float32 descriptor
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(gray, (16, 9), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    thumb = (thumb - thumb.mean()) / (thumb.std() + 1e-6)
+    hist = cv2.calcHist([gray], [0], None, [16], [0, 256]).ravel()
+    hist = hist / (hist.sum() + 1e-6) * 4.0  # comparable weight to the thumbnail part
+    return np.concatenate([thumb / np.sqrt(thumb.size), hist]).astype(np.float32)
+
+
+def select_diverse(descriptors: np.ndarray, count: int) -> List[int]:
+    """
+    Greedy farthest-point selection of ``count`` mutually distant descriptors
+    
+    Args:
+        descriptors: (N, D) descriptors
+        count: Number of indices to pick
+    
+    Returns:
+        Selected row indices, in selection order
+    """
+    if len(descriptors) <= count:
+        return list(range(len(descriptors)))
+    # Start from the frame farthest from the average scene
+    distances = np.linalg.norm(descriptors - descriptors.mean(axis=0), axis=1)
+    selected = [int(np.argmax(distances))]
+    distances = np.linalg.norm(descriptors - descriptors[selected[0]], axis=1)
+    while len(selected) < count:
+        index = int(np.argmax(distances))
+        selected.append(index)
+        np.minimum(distances, np.linalg.norm(descriptors - descriptors[index], axis=1), out=distances)
+    return selected
+
+
+def build_calibration_set(video_paths: List[str], output_dir: str, num_frames: int = 300,
+                          candidates_per_video: int = 1000, max_side: int = 1280) -> dict:
+    """
+    Sample candidate frames from recordings and keep the most diverse ones
+    
+    Every video contributes up to ``candidates_per_video`` evenly spaced
+    frames; ``num_frames`` of all candidates are then chosen by
+    farthest-point selection on frame_descriptor() and written as JPEGs.
+    
+    Args:
+        video_paths: Recorded videos (not the held-out evaluation clip)
+        output_dir: Directory receiving images/ and manifest.json
+        num_frames: Size of the calibration set
+        candidates_per_video: Frames considered per video
+        max_side: Longer side of the stored images (larger frames are downscaled)
+    
+    Returns:
+        Manifest dictionary (also written to manifest.json)
+    """
+    candidates = []   # (video, frame index, downscaled frame)
+    descriptors = []
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            logger.warning(f"Skipping unreadable video: {video_path}")
+            continue
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(1, total // candidates_per_video) if total > 0 else 1
+        index = 0
+        taken = 0
+        while taken < candidates_per_video:
+            if index % step:
+                # grab() skips without converting the frame
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            scale = max_side / max(frame.shape[:2])
+            if scale < 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            candidates.append((video_path, index, frame))
+            descriptors.append(frame_descriptor(frame))
+            taken += 1
+            index += 1
+        cap.release()
+        logger.info(f"{video_path}: {taken} candidate frames (every {step})")
+    
+    if not candidates:
+        raise RuntimeError("No frames could be read from the calibration videos")
+    
+    selected = select_diverse(np.stack(descriptors), num_frames)
+    image_dir = Path(output_dir) / 'images'
+    if image_dir.exists():
+        shutil.rmtree(image_dir)
+    image_dir.mkdir(parents=True)
+    
+    entries = []
+    for rank, candidate_index in enumerate(selected):
+        video_path, frame_index, frame = candidates[candidate_index]
+        name = f"calib_{rank:04d}.jpg"
+        cv2.imwrite(str(image_dir / name), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        entries.append({'image': name, 'video': str(video_path), 'frame': frame_index})
+    
+    manifest = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'videos': [str(path) for path in video_paths],
+        'candidates': len(candidates),
+        'frames': entries
+    }
+    with open(Path(output_dir) / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Calibration set: {len(entries)} of {len(candidates)} candidates written to {image_dir}")
+    return manifest
+
+
+def calibration_images(calibration_dir: str) -> List[Path]:
+    """
+    List the images of a calibration set
+    
+    Args:
+        calibration_dir: Directory created by build_calibration_set
+    
+    Returns:
+        Sorted image paths
+    """
+    image_dir = Path(calibration_dir) / 'images'
+    images = sorted(p for p in image_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        raise FileNotFoundError(f"No calibration images in {image_dir} (run 'quantize.py calibrate' first)")
+    return images
+
+
+def _write_dataset_yaml(calibration_dir: str, names: Dict[int, str]) -> Path:
+    """
+    Describe the calibration images as an Ultralytics dataset (used by OpenVINO INT8 export)
+    """
+    import yaml
+    
+    image_dir = (Path(calibration_dir) / 'images').resolve()
+    data_path = Path(calibration_dir) / 'calibration.yaml'
+    with open(data_path, 'w') as f:
+        yaml.safe_dump({'path': str(image_dir.parent), 'train': str(image_dir), 'val': str(image_dir),
+                        'names': {int(k): v for k, v in names.items()}}, f, sort_keys=False)
+    return data_path
+
+
+class _CalibrationReader:
+    """
+    onnxruntime calibration data reader (get_next protocol) over the calibration images
+    
+    Images are letterboxed exactly like inference (LetterboxPreprocessor),
+    so the activation ranges match what the model sees at runtime.
+    """
+    
+    def __init__(self, images: List[Path], input_name: str, img_size: int):
+        self.images = iter(images)
+        self.input_name = input_name
+        self.preprocessor = LetterboxPreprocessor(img_size, 1, rect=False)
+    
+    def get_next(self) -> Optional[dict]:
+        for path in self.images:
+            image = cv2.imread(str(path))
+            if image is None:
+                continue
+            blob, _ = self.preprocessor.prepare([image])
+            return {self.input_name: blob.copy()}
+        return None
+
+
+def _detect_head_nodes(model) -> List[str]:
+    """
+    Names of the nodes of the final Detect module (kept in FP32 by default)
+    
+    Box regression (DFL) and the concat of the three scales lose the most
+    accuracy when quantized, and they are a small share of the compute.
+    """
+    indices = []
+    for node in model.graph.node:
+        parts = node.name.split('/')
+        if len(parts) > 2 and parts[1].startswith('model.') and parts[1][6:].isdigit():
+            indices.append(int(parts[1][6:]))
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node if node.name.startswith(head)]
+
+
+def _quantize_onnx(fp32_path: str, output_path: Path, images: List[Path], img_size: int,
+                   quantize_head: bool, per_channel: bool):
+    """
+    Static QDQ INT8 quantization of an ONNX export with onnxruntime
+    """
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    
+    # Shape inference and graph cleanup first, so shared biases (Identity nodes
+    # in the export) become plain initializers the quantizer can fold
+    prepared_path = output_path.with_name(output_path.stem + '-prep.onnx')
+    try:
+        quant_pre_process(fp32_path, str(prepared_path))
+        source_path = str(prepared_path)
+    except Exception as e:
+        logger.warning(f"Quantization pre-processing failed ({e}), quantizing the raw export")
+        source_path = fp32_path
+    
+    input_name = onnxruntime.InferenceSession(
+        source_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    model = onnx.load(source_path)
+    opset = next((o.version for o in model.opset_import if o.domain in ('', 'ai.onnx')), 13)
+    if per_channel and opset < 13:
+        # Per-channel DequantizeLinear (axis attribute) needs opset 13
+        from onnx import version_converter
+        logger.info(f"Converting opset {opset} -> 13 for per-channel quantization")
+        model = version_converter.convert_version(model, 13)
+        onnx.save(model, str(prepared_path))
+        source_path = str(prepared_path)
+    excluded = [] if quantize_head else _detect_head_nodes(model)
+    reader = _CalibrationReader(images, input_name, img_size)
+    
+    logger.info(f"Calibrating on {len(images)} images ({len(excluded)} head nodes kept in FP32)")
+    try:
+        quantize_static(
+            source_path, str(output_path), reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            nodes_to_exclude=excluded
+        )
+    finally:
+        prepared_path.unlink(missing_ok=True)
+    
+    # Keep the Ultralytics metadata (names, stride, imgsz) so YOLO() can load the result
+    source = onnx.load(fp32_path, load_external_data=False)
+    quantized = onnx.load(str(output_path))
+    if not quantized.metadata_props:
+        quantized.metadata_props.extend(source.metadata_props)
+        onnx.save(quantized, str(output_path))
+
+
+def quantized_model_path(config: dict) -> Path:
+    """
+    Cache path of the INT8 artifact for the configured model and quantization backend
+    
+    Args:
+        config: Configuration dictionary (``yolo`` and ``yolo.quantization`` blocks)
+    
+    Returns:
+        Artifact path (may not exist yet)
+    """
+    yolo_config = config.get('yolo', {})
+    backend = yolo_config.get('quantization', {}).get('backend', 'onnx')
+    if backend not in QUANTIZATION_BACKENDS:
+        raise ValueError(f"INT8 is supported for {QUANTIZATION_BACKENDS}, not '{backend}'")
+    return cached_artifact_path(
+        resolve_weights(yolo_config.get('model_path', 'yolo11n.pt')), backend,
+        img_size=yolo_config.get('img_size', 640),
+        opset=yolo_config.get('export_opset', 12),
+        dynamic=int(yolo_config.get('max_batch_size', 4)) > 1,
+        cache_dir=yolo_config.get('export_cache_dir', '.model_cache'),
+        precision='int8'
+    )
+
+
+def quantize_model(config: dict, calibration_dir: Optional[str] = None, force: bool = False) -> str:
+    """
+    Build (or reuse) the INT8 artifact for the configured model
+    
+    Args:
+        config: Configuration dictionary (``yolo`` and ``yolo.quantization`` blocks)
+        calibration_dir: Calibration set directory (defaults to quantization.calibration_dir)
+        force: Rebuild even if a cached artifact exists
+    
+    Returns:
+        Path of the INT8 model, loadable with ``YOLO(path, task='detect')``
+    """
+    yolo_config = config.get('yolo', {})
+    quant_config = yolo_config.get('quantization', {})
+    model_path = yolo_config.get('model_path', 'yolo11n.pt')
+    img_size = yolo_config.get('img_size', 640)
+    cache_dir = yolo_config.get('export_cache_dir', '.model_cache')
+    opset = yolo_config.get('export_opset', 12)
+    dynamic = int(yolo_config.get('max_batch_size', 4)) > 1
+    backend = quant_config.get('backend', 'onnx')
+    calibration_dir = calibration_dir or quant_config.get('calibration_dir', 'calibration')
+    
+    artifact = quantized_model_path(config)
+    if artifact.exists() and not force:
+        logger.info(f"Using cached INT8 model: {artifact}")
+        return str(artifact)
+    images = calibration_images(calibration_dir)
+    
+    start = time.perf_counter()
+    if artifact.is_dir():
+        shutil.rmtree(artifact)
+    elif artifact.exists():
+        artifact.unlink()
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    if backend == 'onnx':
+        fp32_path = resolve_model_path(model_path, 'onnx', img_size=img_size, opset=opset,
+                                       dynamic=dynamic, cache_dir=cache_dir)
+        _quantize_onnx(fp32_path, artifact, images, img_size,
+                       quantize_head=quant_config.get('quantize_head', False),
+                       per_channel=quant_config.get('per_channel', True))
+    else:
+        from ultralytics import YOLO
+        
+        model = YOLO(model_path)
+        data = _write_dataset_yaml(calibration_dir, model.names)
+        exported = Path(model.export(format='openvino', imgsz=img_size, int8=True, data=str(data),
+                                     dynamic=dynamic))
+        shutil.move(str(exported), str(artifact))
+    logger.info(f"INT8 {backend} model built in {time.perf_counter() - start:.1f}s: {artifact}")
+    return str(artifact)
+
+
+def _match(reference, candidate, iou_threshold: float):
+    """
+    Greedily match candidate boxes to reference boxes by IoU (highest confidence first)
+    
+    Returns:
+        List of (reference index, candidate index, IoU)
+    """
+    ious = iou_matrix(reference.xyxy, candidate.xyxy)
+    matches = []
+    used = set()
+    for j in np.argsort(-candidate.conf):
+        if ious.shape[0] == 0:
+            break
+        column = ious[:, j].copy()
+        if used:
+            column[list(used)] = -1.0
+        i = int(np.argmax(column))
+        if column[i] >= iou_threshold:
+            used.add(i)
+            matches.append((i, int(j), float(column[i])))
+    return matches
+
+
+def compare_precisions(config: dict, video_path: str, max_frames: int = 300,
+                       iou_threshold: float = 0.5, warmup: int = 5) -> dict:
+    """
+    Run the FP32 and INT8 detectors on a held-out clip and compare speed and detections
+    
+    FP32 detections are the reference: recall is the share of FP32 birds
+    the INT8 model also finds, precision the share of INT8 birds that FP32
+    agrees with.
+    
+    Args:
+        config: Configuration dictionary
+        video_path: Held-out clip (not used for calibration)
+        max_frames: Frames to evaluate
+        iou_threshold: IoU needed for two boxes to count as the same bird
+        warmup: Untimed runs of each detector on the first frame
+    
+    Returns:
+        Report dictionary
+    """
+    from .bird_detector import BirdDetector
+    
+    detectors = {}
+    for mode in ('fp32', 'int8'):
+        mode_config = dict(config)
+        mode_config['yolo'] = dict(config.get('yolo', {}), precision=mode, backend_fallback=False)
+        detectors[mode] = BirdDetector(mode_config)
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+    
+    # Frames are streamed: both models run on each frame as it is decoded,
+    # and only the running totals are kept
+    frames = reference_total = candidate_total = matched = 0
+    ious = []
+    conf_deltas = []
+    try:
+        while frames < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if frames == 0:
+                # Untimed warm-up on the first frame
+                for detector in detectors.values():
+                    for _ in range(warmup):
+                        detector.detect(frame)
+                    detector.latency = LatencyStats(window=None)
+            reference = detectors['fp32'].detect(frame)
+            candidate = detectors['int8'].detect(frame)
+            frames += 1
+            
+            matches = _match(reference, candidate, iou_threshold)
+            reference_total += len(reference)
+            candidate_total += len(candidate)
+            matched += len(matches)
+            ious.extend(iou for _, _, iou in matches)
+            conf_deltas.extend(float(candidate.conf[j] - reference.conf[i]) for i, j, _ in matches)
+    finally:
+        cap.release()
+    if not frames:
+        raise RuntimeError(f"No frames read from {video_path}")
+    
+    recall = matched / reference_total if reference_total else 1.0
+    precision = matched / candidate_total if candidate_total else 1.0
+    fp32_latency = detectors['fp32'].get_latency_stats()
+    int8_latency = detectors['int8'].get_latency_stats()
+    return {
+        'video': str(video_path),
+        'frames': frames,
+        'iou_threshold': iou_threshold,
+        'fp32': dict(fp32_latency, detections=reference_total),
+        'int8': dict(int8_latency, detections=candidate_total),
+        'speedup': fp32_latency['mean_ms'] / int8_latency['mean_ms'] if int8_latency['mean_ms'] else 0.0,
+        'agreement': {
+            'recall': recall,
+            'precision': precision,
+            'f1': 2 * recall * precision / (recall + precision) if recall + precision else 0.0,
+            'mean_iou': float(np.mean(ious)) if ious else 0.0,
+            'mean_conf_delta': float(np.mean(conf_deltas)) if conf_deltas else 0.0
+        }
+    }
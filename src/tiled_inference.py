@@ -0,0 +1,202 @@
+"""
+Tiled Inference for High-Resolution Streams
+Runs the detector on overlapping tiles so distant birds keep enough pixels
+"""
+
+import numpy as np
+import logging
+from typing import Callable, List, Optional, Tuple
+from .detections import Detections
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+
+def make_tiles(x0: int, y0: int, x1: int, y1: int, tile_size: int, overlap: float) -> List[Box]:
+    """
+    Cover a region with overlapping square tiles
+    
+    Tiles are shifted inwards at the right/bottom edges so every tile has the
+    full size (unless the region itself is smaller).
+    
+    Args:
+        x0, y0, x1, y1: Region to cover
+        tile_size: Tile side in pixels
+        overlap: Fraction of the tile shared with its neighbour (0.0 - 0.9)
+    
+    Returns:
+        List of (x0, y0, x1, y1) tiles
+    """
+    stride = max(1, int(tile_size * (1.0 - overlap)))
+    
+    def _starts(lo: int, hi: int) -> List[int]:
+        if hi - lo <= tile_size:
+            return [lo]
+        starts = list(range(lo, hi - tile_size, stride))
+        starts.append(hi - tile_size)
+        return starts
+    
+    return [(tx, ty, min(tx + tile_size, x1), min(ty + tile_size, y1))
+            for ty in _starts(y0, y1) for tx in _starts(x0, x1)]
+
+
+def nms(detections: Detections, iou_threshold: float) -> Detections:
+    """
+    Class-aware non-maximum suppression (vectorized per kept box)
+    
+    Args:
+        detections: Merged detections from all tiles
+        iou_threshold: Boxes overlapping a higher-scoring box above this IoU are removed
+    
+    Returns:
+        Surviving detections, sorted by confidence
+    """
+    if len(detections) < 2:
+        return detections
+    
+    # Offset boxes per class so boxes of different classes never overlap
+    offsets = detections.cls.astype(np.float32)[:, None] * (detections.xyxy.max() + 1.0)
+    boxes = detections.xyxy + offsets
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-detections.conf)
+    
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    
+    return detections[np.array(keep, dtype=np.int64)]
+
+
+class TiledDetector:
+    """
+    Tiled / region-of-interest inference on top of a batch detection function
+    
+    ``full`` mode tiles the whole frame. ``focus`` mode only tiles a square
+    region around a focus point (the last target position) and relies on
+    the normal full-frame pass elsewhere. All tiles of a frame go through
+    the detector as one batch, and the boxes are merged with NMS.
+    """
+    
+    def __init__(self, config: dict, run_batch: Callable[[List[np.ndarray]], List[Detections]],
+                 iou_threshold: float = 0.45):
+        """
+        Initialize the tiled detector
+        
+        Args:
+            config: Configuration dictionary containing YOLO settings
+            run_batch: Function running detection on a list of images
+                (e.g. BirdDetector.detect_batch)
+            iou_threshold: IoU threshold for merging boxes across tiles
+        """
+        self.tiling_config = config.get('yolo', {}).get('tiling', {})
+        
+        # YAML reads an unquoted `off` as False
+        self.mode = self.tiling_config.get('mode', 'off') or 'off'
+        self.tile_size = self.tiling_config.get('tile_size', 640)
+        self.overlap = self.tiling_config.get('overlap', 0.2)
+        self.focus_size = self.tiling_config.get('focus_size', 1280)
+        self.include_full_frame = self.tiling_config.get('include_full_frame', True)
+        self.min_frame_width = self.tiling_config.get('min_frame_width', 1920)
+        self.run_batch = run_batch
+        self.iou_threshold = iou_threshold
+        
+        if self.mode not in ('off', 'full', 'focus'):
+            raise ValueError(f"Unknown tiling mode '{self.mode}', expected off/full/focus")
+        
+        # Statistics
+        self.tiles_run = 0
+        self.frames_tiled = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+    
+    def _focus_region(self, width: int, height: int, focus: Tuple[int, int]) -> Box:
+        """
+        Square region of ``focus_size`` centred on the focus point, clamped to the frame
+        """
+        size_x = min(self.focus_size, width)
+        size_y = min(self.focus_size, height)
+        x0 = int(np.clip(focus[0] - size_x // 2, 0, width - size_x))
+        y0 = int(np.clip(focus[1] - size_y // 2, 0, height - size_y))
+        return x0, y0, x0 + size_x, y0 + size_y
+    
+    def plan(self, width: int, height: int, focus: Optional[Tuple[int, int]] = None) -> List[Box]:
+        """
+        Get the tiles that would be run for a frame
+        
+        Args:
+            width: Frame width
+            height: Frame height
+            focus: Focus point for ``focus`` mode
+        
+        Returns:
+            List of tiles (empty if the frame should run untiled)
+        """
+        if not self.enabled or width < self.min_frame_width:
+            return []
+        if self.mode == 'full':
+            return make_tiles(0, 0, width, height, self.tile_size, self.overlap)
+        if focus is None:
+            return []
+        return make_tiles(*self._focus_region(width, height, focus), self.tile_size, self.overlap)
+    
+    def detect(self, frame: np.ndarray, focus: Optional[Tuple[int, int]] = None) -> Detections:
+        """
+        Detect birds using tiles (plus an optional full-frame pass)
+        
+        Args:
+            frame: Input frame (BGR format)
+            focus: Focus point for ``focus`` mode (e.g. the last target position)
+        
+        Returns:
+            Merged Detections in frame coordinates
+        """
+        height, width = frame.shape[:2]
+        tiles = self.plan(width, height, focus)
+        
+        images = []
+        if self.include_full_frame or not tiles:
+            images.append(frame)
+        # Tiles are views into the frame; no pixel data is copied here
+        images.extend(frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles)
+        
+        results = self.run_batch(images)
+        if not tiles:
+            return results[0]
+        
+        parts = []
+        if self.include_full_frame:
+            parts.append(results[0])
+        for (x0, y0, _, _), dets in zip(tiles, results[len(images) - len(tiles):]):
+            if len(dets):
+                shift = np.array([x0, y0, x0, y0], dtype=np.float32)
+                parts.append(Detections(dets.xyxy + shift, dets.conf, dets.cls, dets.names))
+        
+        self.tiles_run += len(tiles)
+        self.frames_tiled += 1
+        return nms(Detections.concatenate(parts), self.iou_threshold)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get tiling statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'mode': self.mode,
+            'frames_tiled': self.frames_tiled,
+            'tiles_run': self.tiles_run
+        }
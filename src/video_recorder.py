@@ -0,0 +1,292 @@
+"""
+Background Video Recorder
+Encodes frames off the processing thread through a bounded queue (OpenCV or ffmpeg pipe backend)
+"""
+
+import cv2
+import numpy as np
+import logging
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+from .metrics import METRICS
+from .frame_renderer import draw_fps
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class VideoRecorder:
+    """
+    Asynchronous video file writer
+    
+    write() only puts the frame into a bounded queue; a worker thread
+    encodes it. With the ``ffmpeg`` backend, raw BGR frames are piped to an
+    ffmpeg process, so encoding also runs outside the Python process and can
+    use any codec/preset (e.g. libx264 veryfast, or a hardware encoder).
+    When the queue is full, the drop policy decides which frame is lost:
+    ``drop_oldest`` (default), ``drop_newest``, or ``block`` the producer.
+    
+    With a ``render_fn``, frames are queued together with their tracking
+    result and the overlays are drawn on the worker thread, so an annotated
+    recording gets every frame (subject to the drop policy) instead of the
+    latest-only frames of a RenderWorker. Under load, set_stride(n) renders
+    only every n-th frame and repeats the previous one in between, so the
+    file keeps its timing.
+    """
+    
+    def __init__(self, output_path: str, width: int, height: int, fps: float,
+                 config: Optional[dict] = None,
+                 render_fn: Optional[Callable[[np.ndarray, Any], np.ndarray]] = None):
+        """
+        Initialize the recorder and open the output
+        
+        Args:
+            output_path: Output video file
+            width: Frame width
+            height: Frame height
+            fps: Frame rate written into the file
+            config: Configuration dictionary containing video.recording settings
+            render_fn: Function (frame, result) -> annotated frame applied on the
+                worker thread to frames written with a result (optional)
+        """
+        config = config or {}
+        self.recording_config = config.get('video', {}).get('recording', {})
+        
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.render_fn = render_fn
+        self.backend = self.recording_config.get('backend', 'opencv')
+        self.fourcc = self.recording_config.get('fourcc', 'mp4v')
+        self.codec = self.recording_config.get('codec', 'libx264')
+        self.preset = self.recording_config.get('preset', 'veryfast')
+        self.crf = self.recording_config.get('crf', 23)
+        self.ffmpeg_path = self.recording_config.get('ffmpeg_path', 'ffmpeg')
+        self.extra_args = list(self.recording_config.get('extra_args', []))
+        self.queue_size = max(1, int(self.recording_config.get('queue_size', 8)))
+        self.drop_policy = self.recording_config.get('drop_policy', 'drop_oldest')
+        if self.drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop_policy '{self.drop_policy}', expected one of {DROP_POLICIES}")
+        
+        self._writer = None
+        self._process: Optional[subprocess.Popen] = None
+        self._open()
+        
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._running = True
+        
+        # Statistics
+        self.frames_queued = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_repeated = 0
+        self.stride = 1
+        self._write_index = 0
+        self._last_frame: Optional[np.ndarray] = None
+        self.encode_lag = 0.0      # EMA of enqueue -> written, seconds
+        self.max_encode_lag = 0.0
+        
+        self._thread = threading.Thread(target=self._worker, name='VideoRecorder', daemon=True)
+        self._thread.start()
+    
+    def _ffmpeg_command(self) -> list:
+        command = [self.ffmpeg_path, '-loglevel', 'error', '-y',
+                   '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                   '-s', f'{self.width}x{self.height}', '-r', str(self.fps),
+                   '-i', '-', '-an', '-c:v', self.codec]
+        if self.preset:
+            command += ['-preset', str(self.preset)]
+        if self.crf is not None:
+            command += ['-crf', str(self.crf)]
+        return command + ['-pix_fmt', 'yuv420p'] + self.extra_args + [self.output_path]
+    
+    def _open(self):
+        """
+        Start the ffmpeg process or open a cv2.VideoWriter
+        """
+        if self.backend == 'ffmpeg':
+            if shutil.which(self.ffmpeg_path) is None:
+                logger.warning(f"ffmpeg not found at '{self.ffmpeg_path}', falling back to OpenCV writer")
+                self.backend = 'opencv'
+            else:
+                command = self._ffmpeg_command()
+                logger.info(f"Recording with ffmpeg: {' '.join(command)}")
+                self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+                return
+        
+        self._writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                       self.fps, (self.width, self.height))
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Failed to open video writer for {self.output_path}")
+        logger.info(f"Recording with OpenCV ({self.fourcc}) to {self.output_path}")
+    
+    def set_stride(self, stride: int):
+        """
+        Render only every n-th written frame (load shedding); 1 renders all
+        
+        Args:
+            stride: Frames between rendered ones; the others repeat the last frame
+        """
+        self.stride = max(1, int(stride))
+    
+    def write(self, frame: np.ndarray, result: Any = None, fps: Optional[float] = None) -> bool:
+        """
+        Queue a frame for encoding (does not wait for the encoder)
+        
+        The frame must not be modified by the caller afterwards.
+        
+        Args:
+            frame: BGR frame of the recorder's size
+            result: Tracking result rendered onto the frame with render_fn (optional)
+            fps: Loop rate drawn in the top-right corner with the overlays (optional)
+        
+        Returns:
+            False if this frame was dropped
+        """
+        index = self._write_index
+        self._write_index += 1
+        if self.stride > 1 and index % self.stride:
+            # Thinned: the worker repeats the previous frame, nothing is rendered or copied
+            frame = result = None
+        with self._cond:
+            if not self._running:
+                return False
+            if len(self._queue) >= self.queue_size:
+                if self.drop_policy == 'drop_newest':
+                    self._count_drop()
+                    return False
+                if self.drop_policy == 'drop_oldest':
+                    self._queue.popleft()
+                    self._count_drop()
+                else:
+                    while self._running and len(self._queue) >= self.queue_size:
+                        self._cond.wait()
+            self._queue.append((frame, result, fps, time.monotonic()))
+            self.frames_queued += 1
+            METRICS.set_gauge('recorder_queue_depth', len(self._queue))
+            self._cond.notify_all()
+        return True
+    
+    def _count_drop(self):
+        self.frames_dropped += 1
+        METRICS.inc('recorder_frames_dropped')
+    
+    def _worker(self):
+        """
+        Worker loop: encode queued frames in order
+        """
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                frame, result, fps, queued_at = self._queue.popleft()
+                METRICS.set_gauge('recorder_queue_depth', len(self._queue))
+                self._cond.notify_all()
+            
+            if frame is None:
+                frame = self._last_frame
+                if frame is None:
+                    continue
+                self.frames_repeated += 1
+            elif self.render_fn is not None and result is not None:
+                try:
+                    with METRICS.time('record_render'):
+                        frame = self.render_fn(frame, result)
+                        if fps is not None:
+                            draw_fps(frame, fps)
+                except Exception as e:
+                    logger.error(f"Recording render error: {e}")
+            if frame.shape[1] != self.width or frame.shape[0] != self.height:
+                frame = cv2.resize(frame, (self.width, self.height))
+            self._last_frame = frame
+            try:
+                with METRICS.time('encode'):
+                    if self._process is not None:
+                        self._process.stdin.write(np.ascontiguousarray(frame).data)
+                    else:
+                        self._writer.write(frame)
+            except (BrokenPipeError, OSError) as e:
+                logger.error(f"Recording stopped, encoder failed: {e}")
+                with self._cond:
+                    self._running = False
+                    self._queue.clear()
+                    self._cond.notify_all()
+                return
+            
+            lag = time.monotonic() - queued_at
+            self.encode_lag = lag if self.frames_written == 0 else 0.9 * self.encode_lag + 0.1 * lag
+            self.max_encode_lag = max(self.max_encode_lag, lag)
+            self.frames_written += 1
+    
+    def close(self, timeout: float = 10.0):
+        """
+        Encode the frames still queued and finalize the file
+        
+        If the queue has not drained within ``timeout``, the remaining frames
+        are dropped. If the frame being encoded does not finish either, the
+        worker is abandoned: the cv2 writer is left open under it (the file is
+        not finalized) and an ffmpeg encoder is killed.
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            with self._cond:
+                abandoned = len(self._queue)
+                self._queue.clear()
+                self._cond.notify_all()
+            self.frames_dropped += abandoned
+            logger.warning(f"Recording did not drain within {timeout:.0f}s, dropped {abandoned} queued frames")
+            self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.error(f"Recording encoder is stuck, abandoning {self.output_path} unfinalized")
+            if self._process is not None:
+                self._process.kill()
+            return
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            try:
+                self._process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get recording statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        with self._cond:
+            queue_depth = len(self._queue)
+        return {
+            'backend': self.backend,
+            'frames_queued': self.frames_queued,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'frames_repeated': self.frames_repeated,
+            'queue_depth': queue_depth,
+            'encode_lag': self.encode_lag,
+            'max_encode_lag': self.max_encode_lag
+        }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Chunk planning and resume checks for offline archive processing
+"""
+
+import json
+import sys
+import tempfile
+import cv2
+import numpy as np
+from pathlib import Path
+from src.archive_processor import plan_chunks, process_archive
+
+
+def write_video(path, frames=25):
+    """Small MJPG clip with ``frames`` frames"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (64, 48))
+    for index in range(frames):
+        writer.write(np.full((48, 64, 3), index * 8, np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_plan_chunks_ranges_and_names():
+    """Chunks cover the video without overlap; stride and format are part of the names"""
+    with tempfile.TemporaryDirectory() as directory:
+        video = write_video(Path(directory) / 'clip.avi')
+        chunks = plan_chunks([video], directory, chunk_frames=10, stride=2)
+        assert [(c.start, c.end) for c in chunks] == [(0, 10), (10, 20), (20, 25)]
+        assert Path(chunks[0].output).name == '00000000-00000010-s2.jsonl'
+        assert len({Path(c.output).parent for c in chunks}) == 1
+        
+        other = plan_chunks([video], directory, chunk_frames=10, stride=1, fmt='parquet')
+        assert not {c.output for c in chunks} & {c.output for c in other}
+        
+        whole = plan_chunks([video], directory, chunk_frames=0)
+        assert [(c.start, c.end) for c in whole] == [(0, -1)]
+        assert Path(whole[0].output).name == '00000000-end-s1.jsonl'
+        
+        assert plan_chunks([str(Path(directory) / 'missing.avi')], directory) == []
+
+
+def test_resume_skips_finished_chunks():
+    """A rerun with every result file present starts no worker and reports all chunks skipped"""
+    with tempfile.TemporaryDirectory() as directory:
+        video = write_video(Path(directory) / 'clip.avi')
+        output_dir = Path(directory) / 'out'
+        for chunk in plan_chunks([video], str(output_dir), chunk_frames=10):
+            Path(chunk.output).parent.mkdir(parents=True, exist_ok=True)
+            Path(chunk.output).touch()
+        
+        summary = process_archive({}, [video], output_dir=str(output_dir), workers=1, chunk_frames=10)
+        assert summary['chunks'] == 3 and summary['chunks_skipped'] == 3
+        assert summary['chunks_done'] == 0 and summary['chunks_failed'] == 0
+        with open(output_dir / '_summary.json') as f:
+            assert json.load(f)['chunks_skipped'] == 3
+
+
+if __name__ == '__main__':
+    test_plan_chunks_ranges_and_names()
+    test_resume_skips_finished_chunks()
+    print("✓ Archive processor tests passed")
+    sys.exit(0)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Hysteresis checks for the deadline-aware frame scheduler
+"""
+
+import sys
+import time
+from src.frame_scheduler import FrameScheduler
+
+
+def make_scheduler(idle=(), **settings):
+    """Enabled scheduler with a 100ms budget and short hysteresis windows"""
+    config = dict(enabled=True, budget=0.1, escalate_after=3, recover_after=5,
+                  recover_ratio=0.5, smoothing=1.0)
+    config.update(settings)
+    return FrameScheduler({'scheduler': config}, 30, idle=idle)
+
+
+def run(scheduler, latency, frames):
+    """Account frames that took ``latency`` seconds; returns how many changed the level"""
+    return sum(scheduler.end_frame(time.monotonic() - latency) for _ in range(frames))
+
+
+def test_escalates_after_sustained_overrun():
+    """The level rises only after escalate_after frames over budget, one level at a time"""
+    scheduler = make_scheduler()
+    run(scheduler, 0.2, 2)
+    assert scheduler.level == 0
+    run(scheduler, 0.01, 1)
+    run(scheduler, 0.2, 2)
+    assert scheduler.level == 0, "an on-time frame restarts the count"
+    run(scheduler, 0.2, 1)
+    assert scheduler.shedding == ('annotation',)
+    assert scheduler.annotate_every == 5 and scheduler.detect_every == 1
+    run(scheduler, 0.2, 6)
+    assert scheduler.shedding == ('annotation', 'recording', 'detection')
+    assert scheduler.record_every == 2 and scheduler.clip_scale == 0.5 and scheduler.detect_every == 2
+    run(scheduler, 0.2, 10)
+    assert scheduler.level == scheduler.max_level
+
+
+def test_recovers_only_well_under_budget():
+    """Latency between budget * recover_ratio and budget holds the level"""
+    scheduler = make_scheduler()
+    run(scheduler, 0.2, 6)
+    assert scheduler.level == 2
+    run(scheduler, 0.08, 20)
+    assert scheduler.level == 2, "dead band must not restore work"
+    run(scheduler, 0.01, 4)
+    assert scheduler.level == 2
+    run(scheduler, 0.01, 1)
+    assert scheduler.level == 1
+    run(scheduler, 0.01, 5)
+    assert scheduler.level == 0
+    assert scheduler.level_changes == 4
+
+
+def test_idle_work_has_no_level():
+    """Levels for work that is not running are skipped"""
+    scheduler = make_scheduler(idle={'annotation', 'recording'})
+    assert scheduler.levels == ('detection',)
+    assert run(scheduler, 0.2, 3) == 1
+    assert scheduler.detect_every == 2 and scheduler.annotate_every == 1 and scheduler.record_every == 1
+
+
+def test_disabled_only_counts_misses():
+    """The default scheduler never sheds"""
+    scheduler = FrameScheduler({'scheduler': {'budget': 0.1, 'escalate_after': 1}}, 30)
+    assert run(scheduler, 0.2, 20) == 0
+    assert scheduler.level == 0 and scheduler.deadline_misses == 20
+
+
+if __name__ == '__main__':
+    test_escalates_after_sustained_overrun()
+    test_recovers_only_well_under_budget()
+    test_idle_work_has_no_level()
+    test_disabled_only_counts_misses()
+    print("✓ Frame scheduler tests passed")
+    sys.exit(0)
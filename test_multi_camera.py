@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Resource cleanup when the multi-camera orchestrator fails to initialize
+"""
+
+import sys
+from unittest import mock
+from src import multi_camera
+from src.multi_camera import MultiCameraTracker
+
+CONFIG = {'cameras': [{'name': 'north'}, {'name': 'south'}]}
+
+
+class Recorder:
+    """Collects what was created and released"""
+    
+    def __init__(self, fail_warmup=False, fail_cameras=()):
+        self.fail_warmup = fail_warmup
+        self.fail_cameras = set(fail_cameras)
+        self.detectors = []
+        self.contexts = []
+        self.stores = []
+        self.queues = []
+    
+    def detector(self, config):
+        recorder = self
+        
+        class Detector:
+            max_batch_size = 4
+            
+            def warmup(self):
+                if recorder.fail_warmup:
+                    raise RuntimeError("warm-up failed")
+        
+        self.detectors.append(Detector())
+        return self.detectors[-1]
+    
+    def context(self, name, config, detector, inference_queue, event_store):
+        if name in self.fail_cameras:
+            raise OSError(f"{name} unreachable")
+        context = mock.Mock(name=name)
+        self.contexts.append(context)
+        return context
+    
+    def store(self, config):
+        self.stores.append(mock.Mock())
+        return self.stores[-1]
+    
+    def queue(self, detector, max_batch_size):
+        self.queues.append(mock.Mock())
+        return self.queues[-1]
+    
+    def patch(self):
+        return mock.patch.multiple(multi_camera, BirdDetector=self.detector, CameraContext=self.context,
+                                   EventStore=self.store, BatchInferenceQueue=self.queue)
+
+
+def build(recorder, config=CONFIG):
+    with recorder.patch():
+        return MultiCameraTracker(config)
+
+
+def test_duplicate_name_fails_before_loading_model():
+    """Camera names are checked before the model is loaded"""
+    recorder = Recorder()
+    try:
+        build(recorder, {'cameras': [{'name': 'north'}, {'name': 'north'}]})
+    except ValueError as e:
+        assert 'north' in str(e)
+    else:
+        raise AssertionError("duplicate camera names accepted")
+    assert recorder.detectors == [] and recorder.queues == []
+
+
+def test_warmup_failure_releases_everything():
+    """A failed warm-up stops the created cameras, the inference worker and the event writer"""
+    recorder = Recorder(fail_warmup=True)
+    try:
+        build(recorder)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("warm-up failure swallowed")
+    assert len(recorder.contexts) == 2
+    assert all(context.stop.called for context in recorder.contexts)
+    assert recorder.queues[0].close.called and recorder.stores[0].close.called
+
+
+def test_no_camera_releases_workers():
+    """Without any camera the shared workers are closed before raising"""
+    recorder = Recorder(fail_cameras={'north', 'south'})
+    try:
+        build(recorder)
+    except RuntimeError as e:
+        assert 'No camera' in str(e)
+    else:
+        raise AssertionError("started without cameras")
+    assert recorder.queues[0].close.called and recorder.stores[0].close.called
+
+
+def test_partial_failure_keeps_working_cameras():
+    """One unreachable camera does not tear down the others"""
+    recorder = Recorder(fail_cameras={'south'})
+    tracker = build(recorder)
+    assert list(tracker.cameras) == ['north']
+    assert not recorder.contexts[0].stop.called and not recorder.queues[0].close.called
+    tracker.stop()
+    assert recorder.contexts[0].stop.called and recorder.queues[0].close.called
+
+
+if __name__ == '__main__':
+    test_duplicate_name_fails_before_loading_model()
+    test_warmup_failure_releases_everything()
+    test_no_camera_releases_workers()
+    test_partial_failure_keeps_working_cameras()
+    print("✓ Multi-camera initialization tests passed")
+    sys.exit(0)
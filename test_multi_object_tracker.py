@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Track confirmation, retirement and default PTZ behaviour of the multi-object tracker
+"""
+
+import sys
+import numpy as np
+from src.bird_tracker import BirdTracker
+from src.detections import Detections
+from src.fake_ptz import FakePTZController
+from src.multi_object_tracker import MultiObjectTracker
+
+BIRD = np.array([[500, 100, 560, 150]], np.float32)
+
+
+def detections(boxes=BIRD, conf=0.9):
+    """Bird detections with one confidence for every box"""
+    boxes = np.asarray(boxes, np.float32).reshape(-1, 4)
+    return Detections(boxes, np.full(len(boxes), conf, np.float32),
+                      np.full(len(boxes), 14, np.int32), {14: 'bird'})
+
+
+class FixedDetector:
+    """Detector stand-in that reports the same bird on every frame"""
+    load_time = warmup_time = 0.0
+    iou_threshold = 0.45
+    img_size = 640
+    input_sizes = [640]
+    
+    def detect(self, frame):
+        return detections()
+
+
+def test_min_hits_confirms_track():
+    """A track is reported and locked only after min_hits matches"""
+    mot = MultiObjectTracker({'tracking': {'mot': {'enabled': True, 'min_hits': 3}}})
+    for frame in range(2):
+        assert mot.update(detections(BIRD + frame), frame) == []
+        assert mot.select_target() is None
+    confirmed = mot.update(detections(BIRD + 2), 2)
+    assert [t.track_id for t in confirmed] == [1]
+    assert mot.select_target().track_id == 1 and mot.locked_id == 1
+
+
+def test_max_age_retires_track():
+    """A track survives max_age missed updates and keeps its ID, then retires"""
+    mot = MultiObjectTracker({'tracking': {'mot': {'enabled': True, 'min_hits': 1, 'max_age': 3}}})
+    finished = []
+    mot.on_finish = finished.append
+    mot.update(detections(), 0.0)
+    for frame in range(1, 4):
+        mot.update(Detections.empty(), float(frame))
+    assert len(mot.tracks) == 1 and not finished
+    assert [t.track_id for t in mot.update(detections(), 4.0)] == [1], "re-found track keeps its ID"
+    for frame in range(5, 9):
+        mot.update(Detections.empty(), float(frame))
+    assert mot.tracks == [] and mot.select_target() is None
+    assert [t['track_id'] for t in finished] == [1]
+    assert finished[0]['last_seen'] == 4.0
+
+
+def test_default_moves_ptz_on_first_frame():
+    """With the default configuration the first detection already moves the camera"""
+    config = {'camera': {'ptz': {'status_poll': {'enabled': False}}}}
+    ptz = FakePTZController(config, simulated_latency=0.0)
+    tracker = BirdTracker(config, detector=FixedDetector(), ptz_controller=ptz)
+    try:
+        assert not tracker.mot.enabled
+        result = tracker.track(np.zeros((480, 640, 3), np.uint8))
+        assert result.target == (530, 125)
+        assert result.tracking_active and result.ptz_moves == 1
+    finally:
+        ptz.close()
+
+
+if __name__ == '__main__':
+    test_min_hits_confirms_track()
+    test_max_age_retires_track()
+    test_default_moves_ptz_on_first_frame()
+    print("✓ Multi-object tracker tests passed")
+    sys.exit(0)
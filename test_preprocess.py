@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Buffer reuse checks for the zero-copy letterbox preprocessor
+"""
+
+import sys
+import numpy as np
+from src.preprocess import PAD_VALUE, LetterboxPreprocessor
+
+
+def test_padding_survives_layout_change():
+    """Slots reused after a batch of another input shape keep clean padding"""
+    preprocessor = LetterboxPreprocessor(640, 4, rect=True)
+    hd = np.zeros((720, 1280, 3), np.uint8)
+    vga = np.full((480, 640, 3), 200, np.uint8)
+    
+    preprocessor.prepare([hd, hd])
+    preprocessor.prepare([vga])
+    blob, plans = preprocessor.prepare([hd, hd])
+    
+    pad = np.float32(PAD_VALUE / 255.0)
+    for index, plan in enumerate(plans):
+        assert plan.top > 0
+        assert np.allclose(blob[index, :, :plan.top], pad), f"slot {index} top padding is stale"
+        assert np.allclose(blob[index, :, plan.top + plan.resized[1]:], pad), \
+            f"slot {index} bottom padding is stale"
+
+
+def test_mixed_batch_matches_single_frames():
+    """Frames prepared in alternating layouts match a fresh preprocessor"""
+    preprocessor = LetterboxPreprocessor(640, 4, rect=True)
+    frames = [np.random.randint(0, 255, (720, 1280, 3), np.uint8) for _ in range(2)]
+    
+    preprocessor.prepare(frames)
+    preprocessor.prepare([np.full((480, 640, 3), 200, np.uint8)])
+    blob, _ = preprocessor.prepare(frames)
+    expected, _ = LetterboxPreprocessor(640, 4, rect=True).prepare(frames)
+    assert np.array_equal(blob, expected)
+
+
+if __name__ == '__main__':
+    test_padding_survives_layout_change()
+    test_mixed_batch_matches_single_frames()
+    print("✓ Preprocessor buffer tests passed")
+    sys.exit(0)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Timing checks for the asynchronous PTZ command executor
+"""
+
+import sys
+import time
+from src.ptz_executor import PTZExecutor
+
+
+def test_stop_deadline_starts_after_move_returns():
+    """A slow ContinuousMove does not eat into the move duration"""
+    events = []
+    
+    def send_move(pan, tilt):
+        time.sleep(0.15)
+        events.append(('move', time.monotonic()))
+    
+    def send_stop():
+        events.append(('stop', time.monotonic()))
+    
+    executor = PTZExecutor(send_move, send_stop)
+    try:
+        executor.submit_move(0.5, 0.0, 0.2)
+        deadline = time.monotonic() + 2.0
+        while len(events) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        executor.shutdown()
+    assert [name for name, _ in events] == ['move', 'stop']
+    moving = events[1][1] - events[0][1]
+    assert moving >= 0.19, f"camera moved only {moving:.3f}s of 0.2s"
+
+
+if __name__ == '__main__':
+    test_stop_deadline_starts_after_move_returns()
+    print("✓ PTZ executor tests passed")
+    sys.exit(0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Backpressure, thinning and shutdown checks for the background video recorder
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from src.video_recorder import VideoRecorder
+
+
+def make_recorder(directory, render_fn=None, **recording):
+    """OpenCV recorder for 64x48 frames"""
+    config = {'video': {'recording': dict(backend='opencv', **recording)}}
+    return VideoRecorder(str(Path(directory) / 'out.mp4'), 64, 48, 10.0, config, render_fn=render_fn)
+
+
+def frame(value=0):
+    return np.full((48, 64, 3), value, np.uint8)
+
+
+def test_full_queue_drops_oldest():
+    """A stalled encoder costs the oldest queued frames, never blocks the caller"""
+    gate = threading.Event()
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = make_recorder(directory, lambda f, r: (gate.wait(), f)[1], queue_size=2)
+        assert recorder.write(frame(), result=1)
+        while recorder.get_statistics()['queue_depth']:
+            time.sleep(0.001)   # until the worker holds the first frame in render_fn
+        assert all(recorder.write(frame(i), result=1) for i in range(1, 6))
+        stats = recorder.get_statistics()
+        assert stats['queue_depth'] == 2 and stats['frames_dropped'] == 3
+        gate.set()
+        recorder.close()
+        assert recorder.get_statistics()['frames_written'] == 3
+
+
+def test_stride_repeats_last_frame():
+    """With a stride, only every n-th frame is rendered and the file keeps every slot"""
+    rendered = []
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = make_recorder(directory, lambda f, r: (rendered.append(r), f)[1], drop_policy='block')
+        recorder.set_stride(3)
+        for index in range(9):
+            recorder.write(frame(index), result=index)
+        recorder.close()
+        stats = recorder.get_statistics()
+    assert rendered == [0, 3, 6]
+    assert stats['frames_written'] == 9 and stats['frames_repeated'] == 6
+
+
+def test_close_abandons_stuck_worker():
+    """close() neither hangs nor releases the writer while the worker is still encoding"""
+    gate = threading.Event()
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = make_recorder(directory, lambda f, r: (gate.wait(), f)[1])
+        for index in range(4):
+            recorder.write(frame(index), result=index)
+        recorder.close(timeout=0.05)
+        assert recorder._thread.is_alive()
+        assert recorder._writer is not None, "writer released under the worker"
+        assert recorder.get_statistics()['queue_depth'] == 0
+        gate.set()
+        recorder._thread.join(timeout=5.0)
+        assert not recorder._thread.is_alive()
+        recorder.close()
+
+
+if __name__ == '__main__':
+    test_full_queue_drops_oldest()
+    test_stride_repeats_last_frame()
+    test_close_abandons_stuck_worker()
+    print("✓ Video recorder tests passed")
+    sys.exit(0)